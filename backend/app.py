@@ -2,12 +2,25 @@ from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import time
 
 from routes.fetch import router as FetchRouter
 from routes.constraint_management import router as ConstraintManagementRouter
+from routes.replay import router as ReplayRouter
+from routes.admin import router as AdminRouter
 
 from routes.health import router as HealthRouter
+from config.config import get_settings
 from schemas.response import Response
+from services.metrics import (
+    MetricsRegistry,
+    TimedJSONResponse,
+    server_timing,
+    start_request,
+)
+from services.compression import CompressionService
+from services.profiling import LoopMonitor
+from services.recorder import RecorderService
 
 
 @asynccontextmanager
@@ -15,16 +28,30 @@ async def lifespan(app: FastAPI):
     """
     Lifespan event for the FastAPI application.
     """
+    recorder = RecorderService.get_instance()
+    recorder.start()
+    loop_monitor = LoopMonitor.get_instance()
+    loop_monitor.start()
     yield
+    await loop_monitor.stop()
+    recorder.stop()
 
 app = FastAPI(
     title="UTM Observer API",
     description="BR-UTM Observer Backend Service for managing for ecosystem interaction",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
 )
 
 
+@app.middleware("http")
+async def compression_middleware(request: Request, call_next):
+    response = await call_next(request)
+    return await CompressionService.get_instance().compress_response(
+        request, response)
+
+
 @app.middleware("http")
 async def catch_exceptions_middleware(request: Request, call_next):
     try:
@@ -38,17 +65,45 @@ async def catch_exceptions_middleware(request: Request, call_next):
             ).model_dump(mode="json")
         )
 
+
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    spans = start_request()
+    start = time.perf_counter()
+
+    response = await call_next(request)
+
+    total = time.perf_counter() - start
+    response.headers["Server-Timing"] = server_timing(spans, total)
+
+    route = request.scope.get("route")
+    MetricsRegistry.get_instance().observe(
+        "observer_request_duration_seconds",
+        total,
+        method=request.method,
+        path=route.path_format if route else "unmatched",
+        status=str(response.status_code),
+    )
+
+    return response
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
 app.include_router(FetchRouter, tags=[
                    "Fetch"], prefix="/fetch")
 app.include_router(ConstraintManagementRouter, tags=[
                    "Constraint Management"], prefix="/constraint_management")
+app.include_router(ReplayRouter, tags=[
+                   "Replay"], prefix="/replay")
+if get_settings().ADMIN_ENABLED:
+    app.include_router(AdminRouter, tags=[
+                       "Admin"], prefix="/admin")
 app.include_router(HealthRouter, tags=[
                    "Health"], prefix="/api")
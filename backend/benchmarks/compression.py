@@ -0,0 +1,80 @@
+"""
+CPU cost against bandwidth saved of the response compression.
+
+Run from the backend directory:
+
+    python -m benchmarks.compression --flights 2000 --intents 1000 \
+        --levels 1 4 6 9
+
+Compresses the JSON bodies of /fetch/flights and /fetch/volumes with every
+available codec and level. Prints one JSON object per payload, codec and
+level with the compression ratio, the median compression time and the
+link speed below which compressing is faster than sending the raw body.
+Bodies served again from the compressed body cache only cost the digest,
+reported as digest_ms.
+"""
+import argparse
+import hashlib
+import json
+import timeit
+import numpy as np
+
+from benchmarks.wire_format import _json, flights_payload, volumes_payload
+from services.compression import CODECS
+
+
+def _median_ms(function, repeat: int) -> float:
+    return float(np.median(
+        timeit.repeat(function, number=1, repeat=repeat)) * 1000)
+
+
+def measure(name: str, body: bytes, levels, repeat: int):
+    digest_ms = _median_ms(
+        lambda: hashlib.blake2b(body, digest_size=16).digest(), repeat)
+
+    for encoding, (compress, lowest, highest) in CODECS.items():
+        for level in sorted({min(max(level, lowest), highest)
+                             for level in levels}):
+            compressed = compress(body, level)
+            compress_ms = _median_ms(lambda: compress(body, level), repeat)
+            saved_bits = (len(body) - len(compressed)) * 8
+
+            yield {
+                "payload": name,
+                "encoding": encoding,
+                "level": level,
+                "raw_bytes": len(body),
+                "compressed_bytes": len(compressed),
+                "ratio": len(body) / len(compressed),
+                "compress_ms": compress_ms,
+                "digest_ms": digest_ms,
+                # Below this speed the bytes saved take longer to send than
+                # compressing them
+                "break_even_mbps": saved_bits / (compress_ms / 1000) / 1e6,
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flights", type=int, default=2000)
+    parser.add_argument("--intents", type=int, default=1000)
+    parser.add_argument("--levels", type=int, nargs="+",
+                        default=[1, 4, 6, 9])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bodies = {
+        "flights": _json(
+            "flights", flights_payload(args.flights, args.seed)),
+        "volumes": _json(
+            "volumes", volumes_payload(args.intents, args.seed)),
+    }
+
+    for name, body in bodies.items():
+        for result in measure(name, body, args.levels, args.repeat):
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+r"""
+End-to-end latency benchmark of /fetch/volumes and /fetch/flights.
+
+The observer app runs in-process behind an ASGI transport while the
+upstream DSS/USS APIs are served by the local simulator in a subprocess.
+Every combination of the swept parameters regenerates the simulated
+airspace, and each endpoint is then called --iterations times.
+
+Run from the backend directory:
+
+    python -m benchmarks.fetch_latency --references 20 200 --uss 1 4 \
+        --flights 100 1000 --latency-ms 0 50 --output results.jsonl
+
+One JSON object is written per configuration and endpoint with the p50,
+p95 and p99 latency, upstream calls per request, CPU time of the observer
+process and its peak RSS so far.
+
+With --replay the upstream traffic is served from an archive captured with
+UPSTREAM_RECORD_PATH instead of the simulator, and a single configuration
+is measured. BRUTM_BASE_URL must point to the host that was recorded.
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+import httpx
+import numpy as np
+
+# São José dos Campos, matching the simulator defaults
+AREA = {"north": -23.0, "south": -23.4, "east": -45.6, "west": -46.1}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return None
+
+
+def _volumes_body() -> dict:
+    vertices = [
+        {"lat": AREA["north"], "lng": AREA["west"]},
+        {"lat": AREA["north"], "lng": AREA["east"]},
+        {"lat": AREA["south"], "lng": AREA["east"]},
+        {"lat": AREA["south"], "lng": AREA["west"]},
+    ]
+    now = time.time()
+    return {
+        "volume": {
+            "outline_polygon": {"vertices": vertices},
+            "altitude_lower": {"value": 0, "reference": "W84", "units": "M"},
+            "altitude_upper": {"value": 3000, "reference": "W84", "units": "M"},
+        },
+        "time_start": {
+            "value": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)),
+            "format": "RFC3339",
+        },
+        "time_end": {
+            "value": time.strftime(
+                "%Y-%m-%dT%H:%M:%SZ", time.gmtime(now + 60)),
+            "format": "RFC3339",
+        },
+    }
+
+
+@contextlib.contextmanager
+def simulator(port: int):
+    env = {
+        **os.environ,
+        "SIM_BASE_URL": f"http://127.0.0.1:{port}",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "simulator.app:app",
+         "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/_sim/config")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+class SimulatorStats:
+    def __init__(self, upstream: httpx.AsyncClient):
+        self._upstream = upstream
+
+    async def reset(self) -> None:
+        await self._upstream.delete("/_sim/stats")
+
+    async def requests(self) -> dict:
+        return (await self._upstream.get("/_sim/stats")).json()["data"][
+            "requests"]
+
+
+class ReplayStats:
+    def __init__(self):
+        from services.transport import upstream_transport
+        self._transport = upstream_transport()
+
+    async def reset(self) -> None:
+        self._transport.reset()
+
+    async def requests(self) -> dict:
+        return dict(self._transport.requests)
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient,
+    stats,
+    method: str,
+    path: str,
+    body: dict,
+    iterations: int,
+) -> dict:
+    # Warm up tokens, connections and the in-memory engines
+    await client.request(method, path, json=body)
+    await stats.reset()
+
+    latencies = []
+    failures = 0
+    cpu_start = time.process_time()
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = await client.request(method, path, json=body)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            failures += 1
+
+    cpu = time.process_time() - cpu_start
+    requests = await stats.requests()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "endpoint": path,
+        "iterations": iterations,
+        "failures": failures,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "upstream_calls_per_request": sum(requests.values()) / iterations,
+        "upstream_calls": requests,
+        "cpu_ms_per_request": cpu * 1000 / iterations,
+        "peak_rss_mb": resource.getrusage(
+            resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    stats,
+    iterations: int,
+    output,
+    **record,
+) -> None:
+    for method, path, body in (
+        ("POST", "/fetch/volumes", _volumes_body()),
+        ("POST", "/fetch/flights", AREA),
+    ):
+        # The observer logs whole payloads to stdout
+        with open(os.devnull, "w") as devnull, \
+                contextlib.redirect_stdout(devnull):
+            result = await run_endpoint(
+                client, stats, method, path, body, iterations)
+
+        output.write(json.dumps({**record, **result}) + "\n")
+        output.flush()
+
+
+async def main(args: argparse.Namespace, upstream_url: str | None) -> None:
+    # Settings are read from the environment, the app must be imported
+    # only once the upstream is configured
+    if args.replay:
+        os.environ["UPSTREAM_REPLAY_PATH"] = args.replay
+    else:
+        os.environ["BRUTM_BASE_URL"] = upstream_url
+        os.environ["BRUTM_KEY"] = "benchmark"
+    from app import app
+
+    output = open(args.output, "a") if args.output else sys.stdout
+    revision = _git_revision()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://observer", timeout=None
+    ) as client:
+        if args.replay:
+            await measure(
+                client, ReplayStats(), args.iterations, output,
+                revision=revision, replay=args.replay,
+            )
+            return
+
+        async with httpx.AsyncClient(base_url=upstream_url) as upstream:
+            stats = SimulatorStats(upstream)
+
+            for references, uss, flights, latency in itertools.product(
+                args.references, args.uss, args.flights, args.latency_ms
+            ):
+                await upstream.put("/_sim/config", json={
+                    "OPERATIONAL_INTENTS": references - references // 5,
+                    "CONSTRAINTS": references // 5,
+                    "USS_COUNT": uss,
+                    "FLIGHTS": flights,
+                    "LATENCY_MS": latency,
+                    "SEED": args.seed,
+                })
+
+                await measure(
+                    client, stats, args.iterations, output,
+                    revision=revision,
+                    references=references,
+                    uss=uss,
+                    flights=flights,
+                    latency_ms=latency,
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--references", type=int, nargs="+", default=[20, 200],
+                        help="Operational intent and constraint references")
+    parser.add_argument("--uss", type=int, nargs="+", default=[1, 4],
+                        help="Number of USS origins")
+    parser.add_argument("--flights", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0, 50],
+                        help="Latency injected in every upstream response")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=None,
+                        help="Port of the simulator, a free one by default")
+    parser.add_argument("--output", default=None,
+                        help="Append the results to this file")
+    parser.add_argument("--replay", default=None,
+                        help="Serve the upstream traffic from this archive")
+    args = parser.parse_args()
+
+    if args.replay:
+        asyncio.run(main(args, None))
+    else:
+        with simulator(args.port or _free_port()) as upstream_url:
+            asyncio.run(main(args, upstream_url))
@@ -0,0 +1,70 @@
+"""
+Benchmark of the grid based proximity detector.
+
+Run from the backend directory:
+
+    python -m benchmarks.proximity --sizes 100 1000 5000 10000
+
+Prints one JSON object per size with the time spent in the detector and,
+for sizes up to --verify-limit, whether the result matches a brute force
+comparison of every pair.
+"""
+import argparse
+import json
+import time
+import numpy as np
+
+from services.proximity import find_close_pairs
+
+
+def brute_force(x, y, z, horizontal, vertical):
+    dxy = (x[:, None] - x[None, :]) ** 2 + (y[:, None] - y[None, :]) ** 2
+    dz = np.abs(z[:, None] - z[None, :])
+    close = (dxy <= horizontal ** 2) & (dz <= vertical)
+    i, j = np.nonzero(np.triu(close, k=1))
+    return set(zip(i.tolist(), j.tolist()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[100, 1000, 2000, 5000, 10000])
+    parser.add_argument("--area", type=float, default=20000,
+                        help="Side of the square area in meters")
+    parser.add_argument("--horizontal", type=float, default=50)
+    parser.add_argument("--vertical", type=float, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--verify-limit", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    for size in args.sizes:
+        x = rng.uniform(0, args.area, size)
+        y = rng.uniform(0, args.area, size)
+        z = rng.uniform(0, 120, size)
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            i, j = find_close_pairs(x, y, z, args.horizontal, args.vertical)
+            timings.append(time.perf_counter() - start)
+
+        result = {
+            "aircraft": size,
+            "pairs": int(i.size),
+            "p50_ms": float(np.percentile(timings, 50) * 1000),
+            "p95_ms": float(np.percentile(timings, 95) * 1000),
+        }
+
+        if size <= args.verify_limit:
+            expected = brute_force(x, y, z, args.horizontal, args.vertical)
+            result["matches_brute_force"] = \
+                expected == set(zip(i.tolist(), j.tolist()))
+
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
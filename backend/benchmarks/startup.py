@@ -0,0 +1,135 @@
+"""
+Cold start benchmark of the backend.
+
+Run from the backend directory:
+
+    python -m benchmarks.startup --runs 5
+
+Every run starts a fresh interpreter, so nothing is shared between runs.
+Prints one JSON object with the time to import the app, the time from
+launching uvicorn to the first answered health check, the modules that
+take longest to import and the cost of loading the settings.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import timeit
+import httpx
+import numpy as np
+
+IMPORT_APP = "import time; t = time.perf_counter(); import app; \
+print(time.perf_counter() - t)"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_time() -> float:
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_APP], stderr=subprocess.DEVNULL)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def first_response_time(timeout: float = 30) -> float:
+    """
+    Seconds from launching uvicorn to the first health check answered.
+    """
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app",
+         "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                response = httpx.get(
+                    f"http://127.0.0.1:{port}/api/healthy", timeout=1)
+                if response.status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError("The app did not answer the health check.")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def slowest_imports(limit: int) -> list:
+    """
+    Modules with the largest cumulative import time, from -X importtime.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        capture_output=True,
+        text=True,
+    )
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            modules.append((int(cumulative), name.strip()))
+        except ValueError:
+            continue
+
+    top_level = [
+        (cumulative, name) for cumulative, name in modules
+        if name != "app" and "." not in name
+    ]
+    top_level.sort(reverse=True)
+    return [
+        {"module": name, "ms": cumulative / 1000}
+        for cumulative, name in top_level[:limit]
+    ]
+
+
+def settings_cost(number: int = 200) -> dict:
+    from config.config import Settings, get_settings
+
+    return {
+        "settings_ms": timeit.timeit(Settings, number=number) / number * 1000,
+        "cached_settings_ms":
+            timeit.timeit(get_settings, number=number) / number * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--imports", type=int, default=10,
+                        help="Number of slowest top level imports to report")
+    args = parser.parse_args()
+
+    # The app needs the upstream settings, they are never contacted here
+    os.environ.setdefault("BRUTM_BASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("BRUTM_KEY", "benchmark")
+
+    imports = [import_time() for _ in range(args.runs)]
+    first_responses = [first_response_time() for _ in range(args.runs)]
+
+    print(json.dumps({
+        "runs": args.runs,
+        "import_ms_median": float(np.median(imports) * 1000),
+        "import_ms_min": float(np.min(imports) * 1000),
+        "first_response_ms_median": float(np.median(first_responses) * 1000),
+        "first_response_ms_min": float(np.min(first_responses) * 1000),
+        **settings_cost(),
+        "slowest_imports": slowest_imports(args.imports),
+    }))
+
+
+if __name__ == "__main__":
+    main()
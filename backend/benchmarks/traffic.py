@@ -0,0 +1,77 @@
+"""
+Stress test of the live flight pipeline with synthetic traffic.
+
+Run from the backend directory:
+
+    python -m benchmarks.traffic --sizes 1000 5000 20000 --ticks 10
+
+For every fleet size the traffic generator produces --ticks consecutive
+snapshots one second apart, which go through the same services as the
+/fetch/flights handler. Prints one JSON object per size with the mean time
+per tick of every stage.
+"""
+import argparse
+import json
+import time
+import numpy as np
+
+from mock.flight_data import TrafficGenerator
+from services.conformance import ConformanceService
+from services.geofence import GeofenceService
+from services.proximity import ProximityService
+from services.tracks import TrackStore
+
+STAGES = {
+    "conformance": lambda flights:
+        ConformanceService.get_instance().check(flights),
+    "geofence": lambda flights:
+        GeofenceService.get_instance().process(flights),
+    "proximity": lambda flights:
+        ProximityService.get_instance().process(flights),
+    "tracks": lambda flights:
+        TrackStore.get_instance().append_flights(flights),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 5000, 20000])
+    parser.add_argument("--ticks", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        generator = TrafficGenerator(size, args.seed)
+        timings = {name: [] for name in ("states", "models", *STAGES)}
+        start = time.time()
+
+        for tick in range(args.ticks):
+            t = start + tick
+
+            begin = time.perf_counter()
+            generator.states(t)
+            timings["states"].append(time.perf_counter() - begin)
+
+            begin = time.perf_counter()
+            flights = generator.flights(t=t)
+            timings["models"].append(time.perf_counter() - begin)
+
+            for name, stage in STAGES.items():
+                begin = time.perf_counter()
+                stage(flights)
+                timings[name].append(time.perf_counter() - begin)
+
+        print(json.dumps({
+            "flights": size,
+            "ticks": args.ticks,
+            "generator_bytes": generator.nbytes,
+            **{
+                f"{name}_ms": float(np.mean(values) * 1000)
+                for name, values in timings.items()
+            },
+        }))
+
+
+if __name__ == "__main__":
+    main()
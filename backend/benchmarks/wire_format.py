@@ -0,0 +1,120 @@
+"""
+Size and encode time of the JSON and columnar responses.
+
+Run from the backend directory:
+
+    python -m benchmarks.wire_format --flights 200 2000 10000 \
+        --intents 100 1000
+
+Flights come from the traffic generator and volumes from the simulator
+airspace, so no upstream is needed. Prints one JSON object per payload with
+the raw and gzip compressed sizes and the median encode time of both
+formats.
+"""
+import argparse
+import gzip
+import json
+import timeit
+import numpy as np
+
+from mock.flight_data import TrafficGenerator
+from schemas.common.base import Time
+from schemas.common.enums import TimeFormat
+from schemas.fetch import QueryVolumesResponseData
+from schemas.flights import QueryFlightsResponse
+from schemas.dss.remoteid import IdentificationServiceAreaDetails, IdentificationServiceAreaFull
+from services.wire import encode_flights, encode_volumes, read_columnar
+from simulator.airspace import Airspace
+from simulator.config import SimulatorSettings
+
+
+def _json(message: str, data) -> bytes:
+    # Same separators as the JSON responses of the API
+    return json.dumps(
+        {"message": message, "data": data.model_dump(mode="json")},
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _median_ms(encode, repeat: int) -> float:
+    return float(np.median(
+        timeit.repeat(encode, number=1, repeat=repeat)) * 1000)
+
+
+def compare(name: str, size: int, data, encode_columnar, repeat: int) -> dict:
+    encoded_json = _json(name, data)
+    encoded_columnar = encode_columnar(name, data)
+    read_columnar(encoded_columnar)
+
+    return {
+        "payload": name,
+        "size": size,
+        "json_bytes": len(encoded_json),
+        "json_gzip_bytes": len(gzip.compress(encoded_json)),
+        "json_encode_ms": _median_ms(lambda: _json(name, data), repeat),
+        "columnar_bytes": len(encoded_columnar),
+        "columnar_gzip_bytes": len(gzip.compress(encoded_columnar)),
+        "columnar_encode_ms": _median_ms(
+            lambda: encode_columnar(name, data), repeat),
+    }
+
+
+def flights_payload(size: int, seed: int) -> QueryFlightsResponse:
+    generator = TrafficGenerator(size, seed)
+    flights = generator.flights()
+
+    return QueryFlightsResponse(
+        flights=flights,
+        partial=False,
+        errors=[],
+        timestamp=Time(value=flights[0].current_state.timestamp.value,
+                       format=TimeFormat.RFC3339),
+    )
+
+
+def volumes_payload(intents: int, seed: int) -> QueryVolumesResponseData:
+    airspace = Airspace(SimulatorSettings(
+        SEED=seed,
+        OPERATIONAL_INTENTS=intents,
+        CONSTRAINTS=max(intents // 5, 1),
+        FLIGHTS=0,
+    ))
+
+    return QueryVolumesResponseData(
+        operational_intents=list(airspace.operational_intents.values()),
+        constraints=list(airspace.constraints.values()),
+        identification_service_areas=[
+            IdentificationServiceAreaFull(
+                reference=service_area,
+                details=IdentificationServiceAreaDetails(volumes=[extents]),
+            )
+            for service_area, extents in airspace.service_areas.values()
+        ],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flights", type=int, nargs="+",
+                        default=[200, 2000, 10000])
+    parser.add_argument("--intents", type=int, nargs="+",
+                        default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.flights:
+        print(json.dumps(compare(
+            "flights", size, flights_payload(size, args.seed),
+            encode_flights, args.repeat)))
+
+    for size in args.intents:
+        print(json.dumps(compare(
+            "volumes", size, volumes_payload(size, args.seed),
+            encode_volumes, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,109 @@
 import os
 
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
-from motor.motor_asyncio import AsyncIOMotorClient
 
 
 class Settings(BaseSettings):
     BRUTM_KEY: Optional[str] = None
     BRUTM_BASE_URL: Optional[str] = None
 
+    # Seconds an operational intent is kept for conformance monitoring
+    # after it was last seen in a volumes query
+    CONFORMANCE_INTENT_TTL: float = 60
+
+    # Seconds a constraint is kept in the geofence index after it was last
+    # seen in a volumes query, and a flight state after its last position
+    GEOFENCE_CONSTRAINT_TTL: float = 60
+    GEOFENCE_FLIGHT_TTL: float = 30
+
+    # Separation thresholds in meters for the proximity alerts, and seconds
+    # a conflict is kept after one of its flights stopped being reported
+    PROXIMITY_HORIZONTAL_M: float = 50
+    PROXIMITY_VERTICAL_M: float = 20
+    PROXIMITY_FLIGHT_TTL: float = 30
+
+    # Memory reserved for the live flight tracks, positions kept per flight
+    # and seconds without updates before a track is discarded
+    TRACK_MEMORY_MB: float = 32
+    TRACK_POINTS_PER_FLIGHT: int = 600
+    TRACK_IDLE_TIMEOUT: float = 120
+
+    # Seconds of recent positions requested with the live flights, merged
+    # into the tracks so fast aircraft keep a smooth path between polls
+    RECENT_POSITIONS_DURATION: float = 5
+
+    # Directory of the airspace recording, recording is disabled when unset.
+    # Segment duration in seconds and pending writes before dropping ticks
+    RECORDING_PATH: Optional[str] = None
+    RECORDING_SEGMENT_SECONDS: float = 3600
+    RECORDING_QUEUE_SIZE: int = 600
+
+    # Number of alerts kept in memory for the notification feed
+    ALERT_FEED_SIZE: int = 1000
+
+    # Archive where every upstream exchange is captured, and archive served
+    # instead of the network. Replayed responses are delayed by the recorded
+    # duration divided by the replay speed, 0 answers immediately
+    UPSTREAM_RECORD_PATH: Optional[str] = None
+    UPSTREAM_REPLAY_PATH: Optional[str] = None
+    UPSTREAM_REPLAY_SPEED: float = 1.0
+
+    # Event loop lag above which a stall is reported with the blocking
+    # stack, sampling interval of the monitor and stalls kept in memory
+    LOOP_LAG_THRESHOLD_MS: float = 100
+    LOOP_MONITOR_INTERVAL_MS: float = 20
+    LOOP_STALL_HISTORY: int = 100
+
+    # Whether the admin endpoints are served. They expose profiles, heap
+    # snapshots and object counts of the process, so they are off by default
+    ADMIN_ENABLED: bool = False
+
+    # Longest CPU profile that can be requested from the admin endpoint
+    PROFILE_MAX_SECONDS: float = 60
+
+    # Heap snapshots kept in memory by the allocation tracing endpoints
+    HEAP_SNAPSHOTS: int = 5
+
+    # Simplified volume details kept per entity version and resolution
+    SIMPLIFICATION_CACHE_SIZE: int = 2048
+
+    # Merged footprints kept per operational intent version and window
+    FOOTPRINT_CACHE_SIZE: int = 1024
+
+    # Zoom level from which live flights are sent individually, and side in
+    # screen pixels of the cells flights are clustered in below it
+    CLUSTER_MAX_ZOOM: float = 13
+    CLUSTER_CELL_PX: float = 64
+
+    # Smallest response body compressed, default level and level per route,
+    # clamped to the range of the negotiated codec, and compressed bodies
+    # kept for responses that did not change between polls
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_LEVEL: int = 5
+    COMPRESSION_LEVELS: Dict[str, int] = {
+        "/fetch/volumes": 6,
+        "/fetch/flights": 4,
+    }
+    COMPRESSION_CACHE_SIZE: int = 32
+
+    # USS detail requests in flight at once, details kept per entity
+    # version and references remembered by id for the detail endpoint.
+    # Flight details have no version and are reused for a few seconds only
+    VOLUME_DETAILS_CONCURRENCY: int = 16
+    DETAILS_CACHE_SIZE: int = 4096
+    DETAILS_REFERENCES_SIZE: int = 8192
+    FLIGHT_DETAILS_TTL: float = 5
+
     class Config:
         env_file = f".env.{os.getenv('ENV', 'dev')}"
         from_attributes = True
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Settings of the process, the environment file is only read once.
+    """
+    return Settings()
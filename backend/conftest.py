@@ -0,0 +1 @@
+# Makes the backend packages importable from the tests, as in the app
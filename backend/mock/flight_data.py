@@ -1,11 +1,12 @@
+from functools import lru_cache
 from pydantic import HttpUrl
-from schemas.common.geo import LatLngPoint, Volume4D
+from schemas.common.geo import LatLngPoint
 from schemas.dss.remoteid import IdentificationServiceArea
-from random import random, choice, randint
 from schemas.flights import (
-    Flight
+    Flight,
+    QueryFlightsRequest,
 )
-from uuid import UUID, uuid4
+from uuid import NAMESPACE_URL, uuid5
 from schemas.common.base import (
     Time
 )
@@ -17,121 +18,284 @@ from schemas.common.enums import (
     UAType,
     VerticalAccuracy
 )
-from uuid import UUID
-from datetime import datetime
-from random import random
-from typing import List
-from vnoise import Noise  # Perlin noise library
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+import numpy as np
 import time
 
 from schemas.uss.remoteid import UASID, OperatingArea, RIDAircraftPosition, RIDAircraftState, RIDAuthData, RIDFlight, RIDFlightDetails
+from services.cache import register_cache
+from services.spatial import EARTH_RADIUS_M
 
-# In-memory storage for flight data
-flight_data_store = {}
-
-# Base coordinates for smooth variations
-BASE_COORDS = [
-    {"lat": -23.208718442978252, "lng": -45.87002908222274, "alt": 650.0},
-    {"lat": -23.208718442978252, "lng": -45.87002908222274, "alt": 650.0},
-    {"lat": -23.208718442978252, "lng": -45.87002908222274, "alt": 650.0},
-    {"lat": -23.208718442978252, "lng": -45.87002908222274, "alt": 650.0},
-]
-
-# UUIDs for the flights
-FLIGHT_UUIDS = [
-    UUID("e814314a-d25a-4552-9248-1cbff8b0dbe1"),
-    UUID("81c9acfd-25af-4a1e-85d5-c3a7e5369ef2"),
-    UUID("f168c00b-c709-4621-b662-090669f06bb0"),
-    UUID("38183a90-bcf5-4624-b6db-2858328cdca9"),
-]
-
-
-def generate_flight_mock_data() -> List[Flight]:
-    global flight_data_store
-
-    # Time-based seed for smooth variations
-    noise = Noise()
-    t = time.time() * 0.05
-
-    flights = []
-    for i in range(0, randint(1, 4)):
-        base = BASE_COORDS[i]
-        uuid = FLIGHT_UUIDS[i]
-
-        # Generate smooth variations using Perlin noise
-        lat_variation = noise.noise1(t + i) * 0.005
-        lng_variation = noise.noise1(t + i + 10) * 0.005
-        alt_variation = noise.noise1(t + i + 20) * 15
-
-        # Updated position
-        position = RIDAircraftPosition(
-            lat=base["lat"] + lat_variation,
-            lng=base["lng"] + lng_variation,
-            alt=base["alt"] + alt_variation,
-            accuracy_h=HorizontalAccuracy.HAUnknown,
-            accuracy_v=VerticalAccuracy.VAUnknown,
-            extrapolated=False,
-            pressure_altitude=-1000.0,
+# Center of the generated traffic
+BASE_COORDS = {"lat": -23.208718442978252, "lng": -45.87002908222274, "alt": 650.0}
+
+# Kinematic envelope of the generated aircraft
+CRUISE_SPEED_MS = (5.0, 25.0)
+AMPLITUDE_M = (200.0, 2000.0)
+HEIGHT_AGL_M = (30.0, 120.0)
+CLIMB_AMPLITUDE_M = (2.0, 15.0)
+AIRCRAFT_TYPES = (UAType.Helicopter, UAType.Aeroplane, UAType.HybridLift)
+
+# Packed state of every generated aircraft at a given instant
+FLIGHT_STATE = np.dtype([
+    ("lat", "<f8"),
+    ("lng", "<f8"),
+    ("alt", "<f8"),
+    ("speed", "<f8"),
+    ("track", "<f8"),
+    ("vertical_speed", "<f8"),
+])
+
+
+class TrafficGenerator:
+    """
+    Synthetic traffic of `count` aircraft flying smooth closed trajectories.
+
+    Every aircraft follows a Lissajous curve around its own anchor point, so
+    position, speed and heading are analytic functions of time and the state
+    of the whole fleet at any instant is computed in a handful of NumPy
+    operations. Only the per aircraft parameters are kept, memory does not
+    grow with time or with the number of generated ticks, and Flight models
+    are only built for the aircraft that were requested.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        seed: int = 0,
+        lat: float = BASE_COORDS["lat"],
+        lng: float = BASE_COORDS["lng"],
+        alt: float = BASE_COORDS["alt"],
+        radius: float = 20000.0,
+    ):
+        rng = np.random.default_rng(seed)
+
+        self.count = count
+        self.seed = seed
+        self._lat0 = lat
+        self._lng0 = lng
+
+        # Anchors uniformly distributed over the disk
+        distance = radius * np.sqrt(rng.random(count))
+        bearing = rng.random(count) * 2 * np.pi
+        self._x0 = distance * np.sin(bearing)
+        self._y0 = distance * np.cos(bearing)
+
+        # Angular rates derived from the cruise speed, so the ground speed
+        # stays inside the envelope whatever the amplitude
+        speed = rng.uniform(*CRUISE_SPEED_MS, count)
+        self._ax = rng.uniform(*AMPLITUDE_M, count)
+        self._ay = self._ax * rng.uniform(0.3, 1.0, count)
+        ratio = rng.choice([1.0, 2.0], count)
+        self._wx = speed / np.hypot(self._ax, self._ay * ratio)
+        self._wy = self._wx * ratio
+        self._px = rng.random(count) * 2 * np.pi
+        self._py = rng.random(count) * 2 * np.pi
+
+        self._z0 = alt + rng.uniform(*HEIGHT_AGL_M, count)
+        self._az = rng.uniform(*CLIMB_AMPLITUDE_M, count)
+        self._wz = self._wx * rng.uniform(0.5, 2.0, count)
+        self._pz = rng.random(count) * 2 * np.pi
+
+        self._aircraft_types = rng.integers(
+            0, len(AIRCRAFT_TYPES), count, dtype=np.int8)
+
+        now = datetime.now(timezone.utc)
+        self._service_area = IdentificationServiceArea(
+            id=str(uuid5(NAMESPACE_URL, f"traffic/{seed}/isa")),
+            uss_base_url=HttpUrl("https://example.com/remoteid"),
+            owner="Example Owner",
+            version="1.0",
+            time_start=Time(value=now, format=TimeFormat.RFC3339),
+            time_end=Time(
+                value=now + timedelta(days=1), format=TimeFormat.RFC3339),
         )
 
-        # Current state
-        current_state = RIDAircraftState(
-            timestamp=Time(
-                value=datetime.now(),
-                format=TimeFormat.RFC3339,
-            ),
-            timestamp_accuracy=0.0,
-            operational_status=RIDOperationalStatus.Undeclared,
-            position=position,
-            track=0.0,
-            speed=0.0,
-            speed_accuracy=SpeedAccuracy.SAUnknown,
-            vertical_speed=0.0,
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            value.nbytes for value in vars(self).values()
+            if isinstance(value, np.ndarray)
         )
 
-        flight = Flight(
-            id=str(uuid),
-            aircraft_type=UAType.Ornithopter,
-            current_state=current_state,
-            operating_area=OperatingArea(
-                aircraft_count=1,
-                volumes=None
+    def flight_id(self, index: int) -> str:
+        return str(uuid5(NAMESPACE_URL, f"traffic/{self.seed}/{index}"))
+
+    def states(self, t: Optional[float] = None) -> np.ndarray:
+        """
+        Returns the FLIGHT_STATE of every aircraft at POSIX time `t`.
+        """
+        if t is None:
+            t = time.time()
+
+        phase_x = self._wx * t + self._px
+        phase_y = self._wy * t + self._py
+        phase_z = self._wz * t + self._pz
+
+        x = self._x0 + self._ax * np.sin(phase_x)
+        y = self._y0 + self._ay * np.sin(phase_y)
+        vx = self._ax * self._wx * np.cos(phase_x)
+        vy = self._ay * self._wy * np.cos(phase_y)
+
+        scale = 180.0 / (np.pi * EARTH_RADIUS_M)
+
+        states = np.empty(self.count, FLIGHT_STATE)
+        states["lat"] = self._lat0 + y * scale
+        states["lng"] = self._lng0 \
+            + x * scale / np.cos(np.radians(self._lat0))
+        states["alt"] = self._z0 + self._az * np.sin(phase_z)
+        states["speed"] = np.hypot(vx, vy)
+        states["track"] = np.degrees(np.arctan2(vx, vy)) % 360
+        states["vertical_speed"] = self._az * self._wz * np.cos(phase_z)
+        return states
+
+    def select(
+        self,
+        states: np.ndarray,
+        area: Optional[QueryFlightsRequest] = None,
+        limit: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Returns the indexes of the aircraft inside the area, at most `limit`.
+        """
+        mask = np.ones(self.count, dtype=bool)
+        if area is not None:
+            mask = (states["lat"] >= area.south) \
+                & (states["lat"] <= area.north) \
+                & (states["lng"] >= area.west) \
+                & (states["lng"] <= area.east)
+
+        return np.nonzero(mask)[0][:limit]
+
+    def rid_flights(
+        self,
+        area: Optional[QueryFlightsRequest] = None,
+        t: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[RIDFlight]:
+        """
+        Builds the RID flights inside the area at time `t`.
+        """
+        return [
+            RIDFlight(**fields)
+            for _, fields in self._flight_fields(area, t, limit)
+        ]
+
+    def flights(
+        self,
+        area: Optional[QueryFlightsRequest] = None,
+        t: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Flight]:
+        """
+        Builds the flights inside the area at time `t`, with the details and
+        service area the observer attaches to them.
+        """
+        return [
+            Flight(
+                **fields,
+                identification_service_area=self._service_area,
+                details=self.details(index),
+            )
+            for index, fields in self._flight_fields(area, t, limit)
+        ]
+
+    def details(self, index: int) -> RIDFlightDetails:
+        flight_id = self.flight_id(index)
+
+        return RIDFlightDetails(
+            id=flight_id,
+            uas_id=UASID(
+                registration_id=f"UA-{flight_id[:6].upper()}",
             ),
-            simulated=False,
-            recent_positions=[],
-            identification_service_area=IdentificationServiceArea(
-                id=str(uuid4()),
-                uss_base_url=HttpUrl("https://example.com/remoteid"),
-                owner="Example Owner",
-                version="1.0",
-                time_end=Time(
-                    value=datetime.now(),
-                    format=TimeFormat.RFC3339,
-                ),
-                time_start=Time(
-                    value=datetime.now(),
-                    format=TimeFormat.RFC3339,
-                ),
+            operator_id=f"Operator{index % 100:03d}",
+            operator_location=LatLngPoint(
+                lat=self._lat0 + self._y0[index] * 180.0
+                / (np.pi * EARTH_RADIUS_M),
+                lng=self._lng0 + self._x0[index] * 180.0
+                / (np.pi * EARTH_RADIUS_M * np.cos(np.radians(self._lat0))),
             ),
-            details=RIDFlightDetails(
-                id=str(uuid),
-                uas_id=UASID(
-                    registration_id=f"UA-{uuid.hex[:6].upper()}",
-                ),
-                operator_id="Operator123",
-                operator_location=LatLngPoint(
-                    lat=base["lat"],
-                    lng=base["lng"],
-                ),
-                auth_data=RIDAuthData(
-                    format=0,
-                    data="ExampleAuthData",
-                ),
-            )
+            auth_data=RIDAuthData(
+                format=0,
+                data="ExampleAuthData",
+            ),
+        )
+
+    def _flight_fields(
+        self,
+        area: Optional[QueryFlightsRequest],
+        t: Optional[float],
+        limit: Optional[int],
+    ) -> List[Tuple[int, dict]]:
+        if t is None:
+            t = time.time()
+
+        states = self.states(t)
+        indexes = self.select(states, area, limit)
+        timestamp = Time(
+            value=datetime.fromtimestamp(t, timezone.utc),
+            format=TimeFormat.RFC3339,
         )
 
-        # Store in memory
-        flight_data_store[uuid] = flight
-        flights.append(flight)
+        fields = []
+        for index, state in zip(indexes.tolist(), states[indexes].tolist()):
+            lat, lng, alt, speed, track, vertical_speed = state
+
+            position = RIDAircraftPosition(
+                lat=lat,
+                lng=lng,
+                alt=alt,
+                accuracy_h=HorizontalAccuracy.HAUnknown,
+                accuracy_v=VerticalAccuracy.VAUnknown,
+                extrapolated=False,
+                pressure_altitude=-1000.0,
+            )
+
+            current_state = RIDAircraftState(
+                timestamp=timestamp,
+                timestamp_accuracy=0.0,
+                operational_status=RIDOperationalStatus.Airborne,
+                position=position,
+                track=track,
+                speed=speed,
+                speed_accuracy=SpeedAccuracy.SAUnknown,
+                vertical_speed=vertical_speed,
+            )
+
+            fields.append((index, {
+                "id": self.flight_id(index),
+                "aircraft_type": AIRCRAFT_TYPES[self._aircraft_types[index]],
+                "current_state": current_state,
+                "operating_area": OperatingArea(
+                    aircraft_count=1,
+                    volumes=None
+                ),
+                "simulated": True,
+                "recent_positions": [],
+            }))
+
+        return fields
+
+
+@lru_cache(maxsize=8)
+def get_traffic_generator(count: int, seed: int = 0) -> TrafficGenerator:
+    return TrafficGenerator(count, seed)
+
+
+register_cache(
+    "mock.traffic_generators",
+    lambda: get_traffic_generator.cache_info().currsize,
+    lambda: get_traffic_generator,
+)
+
 
-    return flights
+def generate_flight_mock_data(
+    count: int = 4,
+    area: Optional[QueryFlightsRequest] = None,
+    seed: int = 0,
+) -> List[Flight]:
+    return get_traffic_generator(count, seed).flights(area)
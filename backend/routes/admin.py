@@ -0,0 +1,331 @@
+import tracemalloc
+from http import HTTPStatus
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from fastapi import Response as RawResponse
+from datetime import datetime, timezone
+
+from schemas.common.base import Time
+from schemas.common.enums import TimeFormat
+from schemas.profiling import (
+    AllocationSite,
+    CacheSize,
+    HeapSnapshot,
+    HeapStatus,
+    LoopStall,
+    LoopStatus,
+    ObjectCount,
+)
+from schemas.response import Response, ResponseError
+from services.cache import CacheRegistry
+from services.metrics import TimedRoute
+from services.profiling import HeapService, LoopMonitor, ProfilerService
+
+router = APIRouter(route_class=TimedRoute)
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+
+def _time(timestamp: float) -> Time:
+    return Time(
+        value=datetime.fromtimestamp(timestamp, timezone.utc),
+        format=TimeFormat.RFC3339,
+    )
+
+
+def _require_tracing() -> None:
+    if not tracemalloc.is_tracing():
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT.value,
+            detail=ResponseError(
+                message="Allocation tracing is not running.",
+            ).model_dump(mode="json"),
+        )
+
+
+def _snapshot(snapshot_id: int) -> tracemalloc.Snapshot:
+    snapshot = HeapService.get_instance().get_snapshot(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND.value,
+            detail=ResponseError(
+                message=f"Heap snapshot {snapshot_id} not found.",
+            ).model_dump(mode="json"),
+        )
+    return snapshot
+
+
+def _heap_snapshot(
+    snapshot_id: int, timestamp: float, snapshot: tracemalloc.Snapshot
+) -> HeapSnapshot:
+    return HeapSnapshot(
+        id=snapshot_id,
+        timestamp=_time(timestamp),
+        traced_bytes=sum(trace.size for trace in snapshot.traces),
+        blocks=len(snapshot.traces),
+    )
+
+
+@router.get(
+    "/profile",
+    response_description="CPU profile of the event loop",
+    status_code=HTTPStatus.OK.value,
+)
+async def get_profile(
+    seconds: float = Query(10, gt=0),
+    sort: Literal["cumulative", "tottime", "calls"] = Query("cumulative"),
+    limit: int = Query(50, gt=0),
+    format: Literal["text", "pstats"] = Query("text"),
+):
+    """
+    Profiles the process for the given number of seconds and returns the
+    report as text, or the raw stats to open with pstats or snakeviz.
+    """
+    profiler = ProfilerService.get_instance()
+
+    if seconds > profiler.max_seconds:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST.value,
+            detail=ResponseError(
+                message=f"Profiles are limited to {profiler.max_seconds} \
+seconds.",
+            ).model_dump(mode="json"),
+        )
+
+    if profiler.running:
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT.value,
+            detail=ResponseError(
+                message="A profile is already being captured.",
+            ).model_dump(mode="json"),
+        )
+
+    stats = await profiler.profile(seconds)
+
+    if format == "pstats":
+        return RawResponse(
+            content=profiler.to_pstats(stats),
+            media_type="application/octet-stream",
+            headers={
+                "Content-Disposition": "attachment; filename=profile.pstats",
+            },
+        )
+
+    return PlainTextResponse(profiler.to_text(stats, sort, limit))
+
+
+@router.get(
+    "/loop",
+    response_description="Event loop lag and recent stalls",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_loop_status(limit: int = Query(10, ge=0)):
+    monitor = LoopMonitor.get_instance()
+    stalls = list(monitor.stalls)[-limit:] if limit else []
+
+    return Response(
+        message="Event loop status requested",
+        data=LoopStatus(
+            running=monitor.running,
+            threshold_ms=monitor.threshold * 1000,
+            interval_ms=monitor.interval * 1000,
+            last_lag_ms=monitor.last_lag * 1000,
+            max_lag_ms=monitor.max_lag * 1000,
+            stalls=monitor.stall_count,
+            recent_stalls=[
+                LoopStall(
+                    timestamp=_time(timestamp),
+                    duration_ms=duration * 1000,
+                    stack=stack,
+                )
+                for timestamp, duration, stack in reversed(stalls)
+            ],
+        ),
+    )
+
+
+def _heap_status() -> HeapStatus:
+    traced, peak = tracemalloc.get_traced_memory()
+
+    return HeapStatus(
+        tracing=tracemalloc.is_tracing(),
+        frames=tracemalloc.get_traceback_limit(),
+        traced_bytes=traced,
+        peak_bytes=peak,
+        snapshots=[
+            _heap_snapshot(*entry)
+            for entry in HeapService.get_instance().snapshots
+        ],
+    )
+
+
+@router.get(
+    "/heap",
+    response_description="State of the allocation tracing",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_heap_status():
+    return Response(
+        message="Allocation tracing status requested",
+        data=_heap_status(),
+    )
+
+
+@router.post(
+    "/heap/start",
+    response_description="Start tracing allocations",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def start_heap_tracing(frames: int = Query(10, gt=0, le=100)):
+    """
+    Starts tracing allocations keeping `frames` frames per traceback.
+    Tracing slows the process down and uses memory of its own.
+    """
+    HeapService.get_instance().start(frames)
+
+    return Response(
+        message="Allocation tracing started",
+        data=_heap_status(),
+    )
+
+
+@router.post(
+    "/heap/stop",
+    response_description="Stop tracing allocations",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def stop_heap_tracing():
+    HeapService.get_instance().stop()
+
+    return Response(
+        message="Allocation tracing stopped",
+        data=_heap_status(),
+    )
+
+
+@router.post(
+    "/heap/snapshots",
+    response_description="Take a heap snapshot",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def take_heap_snapshot():
+    _require_tracing()
+
+    return Response(
+        message="Heap snapshot taken",
+        data=_heap_snapshot(*HeapService.get_instance().take_snapshot()),
+    )
+
+
+@router.get(
+    "/heap/top",
+    response_description="Top allocation sites of a snapshot",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_heap_top(
+    snapshot: int | None = Query(None),
+    group_by: GroupBy = Query("lineno"),
+    limit: int = Query(20, gt=0),
+):
+    """
+    Top allocation sites of the given snapshot, or of a new one.
+    """
+    heap = HeapService.get_instance()
+
+    if snapshot is None:
+        _require_tracing()
+        _, _, current = heap.take_snapshot()
+    else:
+        current = _snapshot(snapshot)
+
+    return Response(
+        message="Top allocation sites requested",
+        data=[
+            AllocationSite(
+                traceback=[str(frame) for frame in statistic.traceback],
+                size_bytes=statistic.size,
+                count=statistic.count,
+            )
+            for statistic in heap.top(current, group_by, limit)
+        ],
+    )
+
+
+@router.get(
+    "/heap/diff",
+    response_description="Allocation growth between two snapshots",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_heap_diff(
+    base: int = Query(),
+    current: int | None = Query(None),
+    group_by: GroupBy = Query("lineno"),
+    limit: int = Query(20, gt=0),
+):
+    """
+    Allocation sites that grew the most from the `base` snapshot to the
+    `current` one, or to a new snapshot.
+    """
+    heap = HeapService.get_instance()
+    base_snapshot = _snapshot(base)
+
+    if current is None:
+        _require_tracing()
+        _, _, current_snapshot = heap.take_snapshot()
+    else:
+        current_snapshot = _snapshot(current)
+
+    return Response(
+        message="Heap snapshot comparison requested",
+        data=[
+            AllocationSite(
+                traceback=[str(frame) for frame in statistic.traceback],
+                size_bytes=statistic.size,
+                count=statistic.count,
+                size_diff_bytes=statistic.size_diff,
+                count_diff=statistic.count_diff,
+            )
+            for statistic in heap.diff(
+                base_snapshot, current_snapshot, group_by, limit)
+        ],
+    )
+
+
+@router.get(
+    "/heap/objects",
+    response_description="Live model and client instances by type",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_heap_objects(limit: int = Query(50, gt=0)):
+    return Response(
+        message="Live objects requested",
+        data=[
+            ObjectCount(type=name, count=count)
+            for name, count in HeapService.object_counts(limit)
+        ],
+    )
+
+
+@router.get(
+    "/caches",
+    response_description="Entries and memory of the internal caches",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_caches():
+    return Response(
+        message="Cache sizes requested",
+        data=[
+            CacheSize(name=name, entries=entries, bytes=size)
+            for name, entries, size in CacheRegistry.get_instance().report()
+        ],
+    )
@@ -21,14 +21,14 @@ from services.uss.operational_intents import USSOperationalIntentsService
 from services.uss.constraints import USSConstraintsService
 from services.flights import FlightsService
 from services.geoawareness import GeoawarenessService
+from services.metrics import TimedRoute
 from services.dss.remoteid import DSSRemoteIDService
 from services.uss.remoteid import USSRemoteIDService
 from schemas.uss.common import OperationalIntent
 from schemas.fetch import QueryVolumesResponse, QueryVolumesResponseData
 
-from mock.flight_data import generate_flight_mock_data
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.put(
@@ -1,35 +1,72 @@
 # backend-ec/routes/fetch.py
 
+import asyncio
+import json
 from http import HTTPStatus
-from typing import List
-from fastapi import APIRouter, Body
-from pydantic import HttpUrl
-from datetime import datetime
-from pprint import pprint
-
-from schemas.common.geo import Volume3D, Volume4D
+from typing import Annotated, AsyncIterator, Dict, List
+from fastapi import APIRouter, BackgroundTasks, Body, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from datetime import datetime, timezone
+
+from config.config import get_settings
+from schemas.common.geo import Volume3D, Volume4D, encode_outlines
 from schemas.common.base import Time
-from schemas.common.enums import TimeFormat
+from schemas.common.enums import GeometryEncoding, TimeFormat, VolumeKind
 from schemas.dss.common import ConstraintReference, OperationalIntentReference
 from schemas.dss.constraints import QueryConstraintReferenceParameters, QueryConstraintReferencesResponse
 from schemas.dss.operational_intents import QueryOperationalIntentReferenceParameters, QueryOperationalIntentReferenceResponse
-from schemas.dss.remoteid import IdentificationServiceArea, IdentificationServiceAreaDetails, IdentificationServiceAreaFull, SearchIdentificationServiceAreasResponse
-from schemas.flights import QueryFlightsRequest, QueryFlightsResponse
+from schemas.dss.remoteid import IdentificationServiceArea, IdentificationServiceAreaFull, SearchIdentificationServiceAreasResponse
+from schemas.conformance import FlightConformance
+from schemas.flights import Flight, FlightsAreaResult, QueryFlightsBatchRequest, QueryFlightsBatchResponse, QueryFlightsRequest, QueryFlightsResponse
 from schemas.response import Response
+from schemas.tracks import FlightTrail
 from schemas.uss.constraints import Constraint
+from services.alerts import AlertFeed
+from services.cache import register_cache
+from services.clustering import cluster_flights
+from services.filters import (
+    filter_by_altitude,
+    filter_constraint_references,
+    filter_operational_intent_references,
+    filter_service_areas,
+    wants,
+)
+from services.conformance import ConformanceService
+from services.details import FLIGHT, DetailsService
 from services.dss.constraints import DSSConstraintsService
 from services.dss.operational_intents import DSSOperationalIntentsService
-from services.uss.operational_intents import USSOperationalIntentsService
-from services.uss.constraints import USSConstraintsService
-from services.flights import FlightsService
+from services.flights import FlightsService, resolve_flights
+from services.footprints import FootprintService
+from services.geofence import GeofenceService
+from services.metrics import TimedJSONResponse, TimedRoute
 from services.dss.remoteid import DSSRemoteIDService
-from services.uss.remoteid import USSRemoteIDService
+from services.proximity import ProximityService
+from services.recorder import RecorderService
+from services.simplification import SimplificationService
+from services.tracks import TrackStore, optional_values
+from services.wire import ColumnarResponse, accepts_columnar
 from schemas.uss.common import OperationalIntent
-from schemas.fetch import QueryVolumesResponse, QueryVolumesResponseData
+from schemas.fetch import NDJSON_MEDIA_TYPE, QueryDetailsRequest, QueryDetailsResponseData, QueryVolumeReferencesResponseData, QueryVolumesBatchRequest, QueryVolumesBatchResponseData, QueryVolumesParameters, QueryVolumesResponse, QueryVolumesResponseData, VolumeFilters, VolumesAreaResult, VolumesStreamTrailer
+
+
+router = APIRouter(route_class=TimedRoute)
 
-from mock.flight_data import generate_flight_mock_data
 
-router = APIRouter()
+async def _fetch_details(fetch, references: List, name: str) -> List:
+    results = await asyncio.gather(
+        *[fetch(reference) for reference in references],
+        return_exceptions=True,
+    )
+
+    details = []
+    for reference, result in zip(references, results):
+        if isinstance(result, Exception):
+            print(f"Error fetching {name} details: {reference.id}")
+            print(result)
+            continue
+        details.append(result)
+    return details
 
 
 async def get_operational_intents_volume(
@@ -38,40 +75,11 @@ async def get_operational_intents_volume(
     """
     Extracts the volumes from a list of operational intent references.
     """
-    operational_intents: List[OperationalIntent] = []
-
-    for operational_intent_reference in operational_intent_references:
-        try:
-            if not operational_intent_reference.uss_base_url:
-                continue
-
-            uss_operational_intents_service = USSOperationalIntentsService(
-                base_url=HttpUrl(operational_intent_reference.uss_base_url),
-            )
-
-            if not operational_intent_reference.id:
-                print(
-                    f"Operational intent reference \
-                    {operational_intent_reference.id} has no ID.")
-                continue
-
-            operational_intent_response = \
-                await uss_operational_intents_service\
-                .get_operational_intent_details(
-                    operational_intent_reference.id
-                )
-
-            operational_intents.append(
-                operational_intent_response.operational_intent)
-
-        except Exception as e:
-            print(
-                f"Error fetching operational intent details: \
-                {operational_intent_reference.id}")
-            print(e)
-            continue
-
-    return operational_intents
+    return await _fetch_details(
+        DetailsService.get_instance().operational_intent,
+        operational_intent_references,
+        "operational intent",
+    )
 
 
 async def get_constraints_volume(
@@ -80,35 +88,11 @@ async def get_constraints_volume(
     """
     Extracts the volumes from a list of constraint references.
     """
-    constraints: List[Constraint] = []
-
-    for constraint_reference in constraint_references:
-        try:
-            if not constraint_reference.uss_base_url:
-                continue
-
-            uss_constraints_service = USSConstraintsService(
-                base_url=HttpUrl(constraint_reference.uss_base_url),
-            )
-
-            if not constraint_reference.id:
-                print(
-                    f"Constraint reference {constraint_reference.id} \
-                    has no ID.")
-                continue
-
-            constraint_response = await uss_constraints_service\
-                .get_constraint_details(constraint_reference.id)
-
-            constraints.append(constraint_response.constraint)
-
-        except Exception as e:
-            print(f"-> ERROR fetching constraint details: \
-            {constraint_reference.id}")
-            print(e)
-            continue
-
-    return constraints
+    return await _fetch_details(
+        DetailsService.get_instance().constraint,
+        constraint_references,
+        "constraint",
+    )
 
 
 async def get_identification_service_areas_volume(
@@ -117,39 +101,16 @@ async def get_identification_service_areas_volume(
     """
     Extracts the identification service areas from a list of service areas.
     """
-    identification_service_areas: List[IdentificationServiceAreaFull] = []
-
-    for service_area in service_areas:
-        try:
-            if not service_area.uss_base_url:
-                continue
-
-            uss_remoteid_service = USSRemoteIDService(
-                base_url=HttpUrl(service_area.uss_base_url),
-            )
-
-            if not service_area.id:
-                print(f"Service area {service_area.id} has no ID.")
-                continue
-
-            service_area_response = await uss_remoteid_service\
-                .get_identification_service_area_details(service_area.id)
-
-            identification_service_area = IdentificationServiceAreaFull(
-                reference=service_area,
-                details=IdentificationServiceAreaDetails(
-                    volumes=[service_area_response.extents]
-                ),
-            )
-
-            identification_service_areas.append(identification_service_area)
+    return await _fetch_details(
+        DetailsService.get_instance().identification_service_area,
+        service_areas,
+        "service area",
+    )
 
-        except Exception as e:
-            print(e)
-            print(f"Error fetching service area details: {service_area.id}")
-            continue
 
-    return identification_service_areas
+def _has_outline(area_of_interest: Volume4D) -> bool:
+    # Identification service areas can only be searched within a polygon
+    return "outline_polygon" in area_of_interest.volume.model_dump(mode="json")
 
 
 # Basic caching system for dss possible errors
@@ -163,6 +124,18 @@ last_query_identification_service_areas: SearchIdentificationServiceAreasRespons
     service_areas=[],
 )
 
+register_cache(
+    "fetch.last_queries",
+    lambda: len(last_query_constraints.constraint_references)
+    + len(last_query_operational_intents.operational_intent_references)
+    + len(last_query_identification_service_areas.service_areas),
+    lambda: (
+        last_query_constraints,
+        last_query_operational_intents,
+        last_query_identification_service_areas,
+    ),
+)
+
 
 @router.post(
     "/volumes",
@@ -172,11 +145,125 @@ last_query_identification_service_areas: SearchIdentificationServiceAreasRespons
     status_code=HTTPStatus.OK.value,
 )
 async def query_volumes(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    filters: Annotated[QueryVolumesParameters, Query()],
     area_of_interest: Volume4D = Body(),
 ):
+    if filters.references_only:
+        return await query_volume_references(area_of_interest, filters)
+
+    references = {
+        VolumeKind.CONSTRAINT:
+            await query_constraint_references(area_of_interest),
+        VolumeKind.OPERATIONAL_INTENT:
+            await query_operational_intent_references(area_of_interest),
+    }
+
+    # The monitoring is fed every volume in the area once the response is
+    # sent, only the details matching the filters are fetched for it
+    background_tasks.add_task(refresh_monitoring, references)
+
+    constraints = await query_constraints_volume(
+        references[VolumeKind.CONSTRAINT], filters)
+    operational_intents = await query_operational_intents_volume(
+        references[VolumeKind.OPERATIONAL_INTENT], filters)
+
+    identification_service_areas = []
+
+    if wants(filters, VolumeKind.IDENTIFICATION_SERVICE_AREA) and \
+            _has_outline(area_of_interest):
+        identification_service_areas = \
+            await query_identification_service_areas_volume(
+                area_of_interest, filters)
+
+    # Only the response is aggregated and simplified, the monitoring keeps
+    # every segment at full precision
+    simplification_service = SimplificationService.get_instance()
+    if filters.aggregate:
+        # Merging the segments of new intents is CPU bound, off the loop
+        operational_intents = await asyncio.to_thread(
+            FootprintService.get_instance().aggregate,
+            operational_intents,
+            area_of_interest.time_start,
+            area_of_interest.time_end,
+            filters.zoom,
+            filters.tolerance,
+        )
+    else:
+        operational_intents = simplification_service.simplify(
+            operational_intents, filters.zoom, filters.tolerance)
+    constraints = simplification_service.simplify(
+        constraints, filters.zoom, filters.tolerance)
+    identification_service_areas = simplification_service.simplify(
+        identification_service_areas, filters.zoom, filters.tolerance)
+
+    response_data = QueryVolumesResponseData(
+        operational_intents=operational_intents,
+        constraints=constraints,
+        identification_service_areas=identification_service_areas,
+    )
+
+    response = QueryVolumesResponse(
+        message="Query requested successfully",
+        data=response_data,
+    )
+
+    if accepts_columnar(request):
+        return ColumnarResponse(response)
+    if filters.geometry != GeometryEncoding.VERTICES:
+        return TimedJSONResponse(encode_outlines(
+            response.model_dump(mode="json"),
+            filters.geometry,
+            filters.precision,
+        ))
+    return response
+
+
+async def query_volume_references(
+    area_of_interest: Volume4D,
+    filters: QueryVolumesParameters,
+):
+    """
+    Only the DSS references, without requesting any USS. The monitoring
+    keeps the volumes of the last full query.
+    """
+    operational_intent_references = []
+    if wants(filters, VolumeKind.OPERATIONAL_INTENT):
+        operational_intent_references = filter_operational_intent_references(
+            await query_operational_intent_references(area_of_interest),
+            filters,
+        )
+
+    constraint_references = []
+    if wants(filters, VolumeKind.CONSTRAINT):
+        constraint_references = filter_constraint_references(
+            await query_constraint_references(area_of_interest), filters)
+
+    service_areas = []
+    if wants(filters, VolumeKind.IDENTIFICATION_SERVICE_AREA) and \
+            _has_outline(area_of_interest):
+        service_areas = await query_service_areas(area_of_interest, filters)
+
+    return Response(
+        message="Query requested successfully",
+        data=QueryVolumeReferencesResponseData(
+            operational_intent_references=operational_intent_references,
+            constraint_references=constraint_references,
+            service_areas=service_areas,
+        ),
+    )
+
+
+async def query_constraint_references(
+    area_of_interest: Volume4D,
+    errors: List[str] | None = None,
+) -> List[ConstraintReference]:
+    """
+    Every constraint reference in the area, the geofence monitoring needs
+    all of them so the volume filters are applied by the callers.
+    """
     global last_query_constraints
-    global last_query_operational_intents
-    global last_query_identification_service_areas
 
     dss_constraints_service = DSSConstraintsService()
     try:
@@ -191,18 +278,42 @@ async def query_volumes(
         last_query_constraints = query_constraints
     except Exception as e:
         query_constraints = last_query_constraints
+        if errors is not None:
+            errors.append(f"Constraint references: {e}")
         print("Error querying constraints:", e)
         print("Using last query constraints.")
-        print(query_constraints.model_dump(mode="json"))
 
-    print("===== Querying constraints: =====")
-    pprint(query_constraints)
-    print("===================================")
+    constraint_references = query_constraints.constraint_references
+    DetailsService.get_instance().remember(
+        VolumeKind.CONSTRAINT.value, constraint_references)
+    return constraint_references
+
+
+async def query_constraints_volume(
+    constraint_references: List[ConstraintReference],
+    filters: VolumeFilters,
+) -> List[Constraint]:
+    if not wants(filters, VolumeKind.CONSTRAINT):
+        return []
 
     constraints = await get_constraints_volume(
-        query_constraints.constraint_references
+        filter_constraint_references(constraint_references, filters)
     )
 
+    return filter_by_altitude(constraints, filters)
+
+
+async def query_operational_intent_references(
+    area_of_interest: Volume4D,
+    errors: List[str] | None = None,
+) -> List[OperationalIntentReference]:
+    """
+    Every operational intent reference in the area, the conformance
+    monitoring needs all of them so the volume filters are applied by the
+    callers.
+    """
+    global last_query_operational_intents
+
     dss_operational_intents_service = DSSOperationalIntentsService()
 
     try:
@@ -217,60 +328,437 @@ async def query_volumes(
         last_query_operational_intents = query_operational_intents
     except Exception as e:
         query_operational_intents = last_query_operational_intents
+        if errors is not None:
+            errors.append(f"Operational intent references: {e}")
         print("Error querying operational intents:", e)
         print("Using last query operational intents.")
-        print(query_operational_intents.model_dump(mode="json"))
 
-    print("=== Querying Operational Intents ===")
-    print(query_operational_intents)
+    operational_intent_references = \
+        query_operational_intents.operational_intent_references
+    DetailsService.get_instance().remember(
+        VolumeKind.OPERATIONAL_INTENT.value, operational_intent_references)
+    return operational_intent_references
+
+
+async def query_operational_intents_volume(
+    operational_intent_references: List[OperationalIntentReference],
+    filters: VolumeFilters,
+) -> List[OperationalIntent]:
+    if not wants(filters, VolumeKind.OPERATIONAL_INTENT):
+        return []
 
     operational_intents = await get_operational_intents_volume(
-        query_operational_intents.operational_intent_references
+        filter_operational_intent_references(
+            operational_intent_references, filters)
     )
 
-    identification_service_areas = []
+    return filter_by_altitude(operational_intents, filters)
 
-    if "outline_polygon" in area_of_interest.volume.model_dump(mode="json"):
-        dss_remoteid_service = DSSRemoteIDService()
-        try:
-            query_identification_service_areas = await dss_remoteid_service\
-                .search_identification_service_areas(
-                    area=",".join(
-                        [f"{vertice.lat},{vertice.lng}" for vertice in area_of_interest.volume.outline_polygon.vertices]),
-                    earliest_time=area_of_interest.time_start.value.isoformat(
-                        'T').replace("+00:00", "") + 'Z',
-                    latest_time=area_of_interest.time_end.value.isoformat(
-                        'T').replace("+00:00", "") + 'Z',
-                )
-            last_query_identification_service_areas = query_identification_service_areas
-        except Exception as e:
-            query_identification_service_areas = last_query_identification_service_areas
-            print("Error querying identification service areas:", e)
-            print("Using last query identification service areas.")
-            print(query_identification_service_areas.model_dump(mode="json"))
-
-        print("===== Querying identification service areas: =====")
-        pprint(query_identification_service_areas)
-        print("===================================================")
-
-        identification_service_areas = await get_identification_service_areas_volume(
-            query_identification_service_areas.service_areas
-        )
 
-    response_data = QueryVolumesResponseData(
-        operational_intents=operational_intents,
-        constraints=constraints,
-        identification_service_areas=identification_service_areas,
+async def refresh_monitoring(references: Dict[VolumeKind, List]) -> None:
+    """
+    Feeds the monitoring and the recording every operational intent and
+    constraint of the queried references, whatever the filters of the
+    viewer. Runs once the response is sent, the details already fetched
+    for the response are served from the DetailsService cache.
+    """
+    operational_intents, constraints = await asyncio.gather(
+        get_operational_intents_volume(
+            references.get(VolumeKind.OPERATIONAL_INTENT, [])),
+        get_constraints_volume(references.get(VolumeKind.CONSTRAINT, [])),
+    )
+
+    GeofenceService.get_instance().update_constraints(constraints)
+    conformance_service = ConformanceService.get_instance()
+    conformance_service.update_operational_intents(operational_intents)
+    RecorderService.get_instance().record_volumes(
+        operational_intents, constraints)
+
+    await conformance_service.refresh_telemetry()
+
+
+async def query_service_areas(
+    area_of_interest: Volume4D,
+    filters: VolumeFilters,
+    errors: List[str] | None = None,
+) -> List[IdentificationServiceArea]:
+    global last_query_identification_service_areas
+
+    dss_remoteid_service = DSSRemoteIDService()
+    try:
+        query_identification_service_areas = await dss_remoteid_service\
+            .search_identification_service_areas(
+                area=",".join(
+                    [f"{vertice.lat},{vertice.lng}" for vertice in area_of_interest.volume.outline_polygon.vertices]),
+                earliest_time=area_of_interest.time_start.value.isoformat(
+                    'T').replace("+00:00", "") + 'Z',
+                latest_time=area_of_interest.time_end.value.isoformat(
+                    'T').replace("+00:00", "") + 'Z',
+            )
+        last_query_identification_service_areas = query_identification_service_areas
+    except Exception as e:
+        query_identification_service_areas = last_query_identification_service_areas
+        if errors is not None:
+            errors.append(f"Identification service areas: {e}")
+        print("Error querying identification service areas:", e)
+        print("Using last query identification service areas.")
+
+    service_areas = filter_service_areas(
+        query_identification_service_areas.service_areas, filters)
+    DetailsService.get_instance().remember(
+        VolumeKind.IDENTIFICATION_SERVICE_AREA.value, service_areas)
+    return service_areas
+
+
+async def query_identification_service_areas_volume(
+    area_of_interest: Volume4D,
+    filters: VolumeFilters,
+) -> List[IdentificationServiceAreaFull]:
+    return await query_identification_service_areas_details(
+        await query_service_areas(area_of_interest, filters), filters)
+
+
+async def query_identification_service_areas_details(
+    service_areas: List[IdentificationServiceArea],
+    filters: VolumeFilters,
+) -> List[IdentificationServiceAreaFull]:
+    identification_service_areas = await get_identification_service_areas_volume(
+        service_areas
+    )
+
+    return filter_by_altitude(identification_service_areas, filters)
+
+
+def _record(kind: str, data) -> str:
+    return json.dumps(
+        {"kind": kind, "data": data},
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ) + "\n"
+
+
+async def stream_volumes(
+    area_of_interest: Volume4D,
+    filters: QueryVolumesParameters,
+    monitored: Dict[VolumeKind, List],
+) -> AsyncIterator[str]:
+    """
+    Yields a record per entity as soon as its USS details arrive, then a
+    trailer with the errors and whether the result is complete. Every
+    operational intent and constraint reference of the area is added to
+    `monitored` for the monitoring refresh.
+    """
+    errors: List[str] = []
+
+    queries = {
+        VolumeKind.OPERATIONAL_INTENT: query_operational_intent_references(
+            area_of_interest, errors),
+        VolumeKind.CONSTRAINT: query_constraint_references(
+            area_of_interest, errors),
+    }
+    if wants(filters, VolumeKind.IDENTIFICATION_SERVICE_AREA) and \
+            _has_outline(area_of_interest):
+        queries[VolumeKind.IDENTIFICATION_SERVICE_AREA] = query_service_areas(
+            area_of_interest, filters, errors)
+
+    references = dict(zip(queries, await asyncio.gather(*queries.values())))
+    monitored.update(references)
+
+    # Only the details matching the filters are fetched for the stream
+    references[VolumeKind.OPERATIONAL_INTENT] = \
+        filter_operational_intent_references(
+            references[VolumeKind.OPERATIONAL_INTENT], filters) \
+        if wants(filters, VolumeKind.OPERATIONAL_INTENT) else []
+    references[VolumeKind.CONSTRAINT] = filter_constraint_references(
+        references[VolumeKind.CONSTRAINT], filters) \
+        if wants(filters, VolumeKind.CONSTRAINT) else []
+
+    details_service = DetailsService.get_instance()
+    fetchers = {
+        VolumeKind.OPERATIONAL_INTENT: details_service.operational_intent,
+        VolumeKind.CONSTRAINT: details_service.constraint,
+        VolumeKind.IDENTIFICATION_SERVICE_AREA:
+            details_service.identification_service_area,
+    }
+    pending = {
+        asyncio.ensure_future(fetchers[kind](reference)): (kind, reference)
+        for kind, kind_references in references.items()
+        for reference in kind_references
+    }
+
+    counts = {kind: 0 for kind in VolumeKind}
+    simplification_service = SimplificationService.get_instance()
+    footprint_service = FootprintService.get_instance()
+
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                kind, reference = pending.pop(task)
+                try:
+                    entity = task.result()
+                except Exception as e:
+                    print(f"Error fetching {kind.value} details: "
+                          f"{reference.id}")
+                    print(e)
+                    errors.append(f"{kind.value} {reference.id}: {e}")
+                    continue
+
+                if not filter_by_altitude([entity], filters):
+                    continue
+                counts[kind] += 1
+
+                if kind == VolumeKind.OPERATIONAL_INTENT and filters.aggregate:
+                    [entity] = await asyncio.to_thread(
+                        footprint_service.aggregate,
+                        [entity],
+                        area_of_interest.time_start,
+                        area_of_interest.time_end,
+                        filters.zoom,
+                        filters.tolerance,
+                    )
+                else:
+                    [entity] = simplification_service.simplify(
+                        [entity], filters.zoom, filters.tolerance)
+
+                yield _record(kind.value, encode_outlines(
+                    entity.model_dump(mode="json"),
+                    filters.geometry,
+                    filters.precision,
+                ))
+    finally:
+        # The client went away, no one is waiting for the other details
+        for task in pending:
+            task.cancel()
+
+    yield _record("trailer", VolumesStreamTrailer(
+        complete=not errors,
+        errors=errors,
+        operational_intents=counts[VolumeKind.OPERATIONAL_INTENT],
+        constraints=counts[VolumeKind.CONSTRAINT],
+        identification_service_areas=counts[
+            VolumeKind.IDENTIFICATION_SERVICE_AREA],
+    ).model_dump(mode="json"))
+
+
+@router.post(
+    "/volumes/stream",
+    response_description="Stream the constraints and operational intents \
+    existing in an area as newline-delimited JSON",
+    status_code=HTTPStatus.OK.value,
+)
+async def stream_query_volumes(
+    filters: Annotated[QueryVolumesParameters, Query()],
+    area_of_interest: Volume4D = Body(),
+):
+    # Same filters and response options as /volumes, except the columnar
+    # encoding. The monitoring refresh runs once the stream is over
+    monitored: Dict[VolumeKind, List] = {}
+    return StreamingResponse(
+        stream_volumes(area_of_interest, filters, monitored),
+        media_type=NDJSON_MEDIA_TYPE,
+        background=BackgroundTask(refresh_monitoring, monitored),
     )
 
-    print(response_data.model_dump(mode="json"))
 
-    return QueryVolumesResponse(
+@router.post(
+    "/volumes/batch",
+    response_description="Query constraints and operational intents \
+    existing in several areas",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def query_volumes_batch(
+    background_tasks: BackgroundTasks,
+    filters: Annotated[QueryVolumesParameters, Query()],
+    request: QueryVolumesBatchRequest = Body(),
+):
+    kinds = {
+        VolumeKind.OPERATIONAL_INTENT: query_operational_intents_volume,
+        VolumeKind.CONSTRAINT: query_constraints_volume,
+        VolumeKind.IDENTIFICATION_SERVICE_AREA:
+            query_identification_service_areas_details,
+    }
+
+    async def area_references(area_of_interest: Volume4D):
+        queries = {
+            VolumeKind.OPERATIONAL_INTENT:
+                query_operational_intent_references(area_of_interest),
+            VolumeKind.CONSTRAINT:
+                query_constraint_references(area_of_interest),
+        }
+        if wants(filters, VolumeKind.IDENTIFICATION_SERVICE_AREA) and \
+                _has_outline(area_of_interest):
+            queries[VolumeKind.IDENTIFICATION_SERVICE_AREA] = \
+                query_service_areas(area_of_interest, filters)
+        return dict(zip(queries, await asyncio.gather(*queries.values())))
+
+    areas_references = await asyncio.gather(
+        *[area_references(area) for area in request.areas])
+
+    # A reference found in several areas is only requested once
+    unique_references = {kind: {} for kind in kinds}
+    for references in areas_references:
+        for kind, kind_references in references.items():
+            for reference in kind_references:
+                unique_references[kind].setdefault(str(reference.id), reference)
+
+    unique_references = {
+        kind: list(kind_references.values())
+        for kind, kind_references in unique_references.items()
+    }
+
+    # The monitoring is fed every volume of the areas once the response is
+    # sent, only the details matching the filters are fetched for it
+    background_tasks.add_task(refresh_monitoring, unique_references)
+
+    details = await asyncio.gather(*[
+        fetch_details(unique_references[kind], filters)
+        for kind, fetch_details in kinds.items()
+    ])
+    entities = dict(zip(kinds, details))
+    operational_intents = entities[VolumeKind.OPERATIONAL_INTENT]
+
+    # Footprints are merged over the union of the queried windows, so the
+    # entity shared by several areas stays the same
+    simplification_service = SimplificationService.get_instance()
+    if filters.aggregate:
+        entities[VolumeKind.OPERATIONAL_INTENT] = await asyncio.to_thread(
+            FootprintService.get_instance().aggregate,
+            operational_intents,
+            min((area.time_start for area in request.areas
+                 if area.time_start), key=lambda time: time.value,
+                default=None),
+            max((area.time_end for area in request.areas
+                 if area.time_end), key=lambda time: time.value,
+                default=None),
+            filters.zoom,
+            filters.tolerance,
+        )
+    else:
+        entities[VolumeKind.OPERATIONAL_INTENT] = \
+            simplification_service.simplify(
+                operational_intents, filters.zoom, filters.tolerance)
+    for kind in (VolumeKind.CONSTRAINT,
+                 VolumeKind.IDENTIFICATION_SERVICE_AREA):
+        entities[kind] = simplification_service.simplify(
+            entities[kind], filters.zoom, filters.tolerance)
+
+    by_id = {
+        kind: {str(entity.reference.id): entity for entity in kind_entities}
+        for kind, kind_entities in entities.items()
+    }
+
+    def area_ids(references, kind: VolumeKind) -> List[str]:
+        return [
+            entity_id for entity_id in dict.fromkeys(
+                str(reference.id) for reference in references.get(kind, []))
+            if entity_id in by_id[kind]
+        ]
+
+    response = Response(
         message="Query requested successfully",
-        data=response_data,
+        data=QueryVolumesBatchResponseData(
+            operational_intents=by_id[VolumeKind.OPERATIONAL_INTENT],
+            constraints=by_id[VolumeKind.CONSTRAINT],
+            identification_service_areas=by_id[
+                VolumeKind.IDENTIFICATION_SERVICE_AREA],
+            areas=[
+                VolumesAreaResult(
+                    operational_intents=area_ids(
+                        references, VolumeKind.OPERATIONAL_INTENT),
+                    constraints=area_ids(references, VolumeKind.CONSTRAINT),
+                    identification_service_areas=area_ids(
+                        references, VolumeKind.IDENTIFICATION_SERVICE_AREA),
+                )
+                for references in areas_references
+            ],
+        ),
+    )
+
+    if filters.geometry != GeometryEncoding.VERTICES:
+        return TimedJSONResponse(encode_outlines(
+            response.model_dump(mode="json"),
+            filters.geometry,
+            filters.precision,
+        ))
+    return response
+
+
+@router.post(
+    "/details",
+    response_description="Details of operational intents, constraints and \
+    flights by id",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def query_details(
+    request: QueryDetailsRequest = Body(),
+):
+    # Only references returned by a previous query of the volumes or the
+    # flights are known, other ids are reported in the errors
+    details_service = DetailsService.get_instance()
+    (operational_intents, operational_intent_errors), \
+        (constraints, constraint_errors), \
+        (flights, flight_errors) = await asyncio.gather(
+            details_service.batch(
+                VolumeKind.OPERATIONAL_INTENT.value,
+                request.operational_intents),
+            details_service.batch(
+                VolumeKind.CONSTRAINT.value, request.constraints),
+            details_service.batch(FLIGHT, request.flights),
+        )
+
+    return Response(
+        message="Details requested successfully",
+        data=QueryDetailsResponseData(
+            operational_intents=operational_intents,
+            constraints=constraints,
+            flights=flights,
+            errors=operational_intent_errors + constraint_errors
+            + flight_errors,
+        ),
     )
 
 
+def monitor_flights(flights: List[Flight]) -> List[FlightConformance]:
+    """
+    Runs the live monitoring over the flights, returns their conformance.
+    """
+    conformance = ConformanceService.get_instance().check(flights)
+    GeofenceService.get_instance().process(flights)
+    ProximityService.get_instance().process(flights)
+    TrackStore.get_instance().append_flights(flights)
+    RecorderService.get_instance().record_flights(flights)
+    return conformance
+
+
+def attach_positions(
+    flights: List[Flight], positions_since: Dict[str, datetime]
+) -> None:
+    """
+    Replaces the recent positions reported by the USSs with the positions
+    merged into the tracks after the last current state the client
+    received, by flight id, so clients only receive the new points. The
+    cursors are USS timestamps, slow polls or a skewed server clock lose
+    no point. Flights without a cursor only send their current state.
+    """
+    track_store = TrackStore.get_instance()
+    for flight in flights:
+        flight.recent_positions = []
+        since = positions_since.get(flight.id)
+        if since is None or not flight.current_state:
+            continue
+        flight.recent_positions = track_store.positions_since(
+            flight.id,
+            since.timestamp(),
+            until=flight.current_state.timestamp.value.timestamp(),
+        )
+
+
 @router.post(
     "/flights",
     response_description="Query live flights",
@@ -278,11 +766,23 @@ async def query_volumes(
     status_code=HTTPStatus.OK.value,
 )
 async def query_flights(
-        area: QueryFlightsRequest
+        request: Request,
+        area: QueryFlightsRequest,
+        zoom: float | None = Query(None, ge=0, le=24),
+        details: bool = Query(True),
 ):
     flights_service = FlightsService()
 
-    res = await flights_service.query_flights(area)
+    res = await flights_service.query_flights(area, details=details)
+    res.conformance = monitor_flights(res.flights)
+    attach_positions(res.flights, area.positions_since)
+
+    # The monitoring above always sees every flight, only the response is
+    # clustered when the viewer is zoomed out
+    settings = get_settings()
+    if zoom is not None and zoom < settings.CLUSTER_MAX_ZOOM:
+        res.flights, res.clusters = cluster_flights(
+            res.flights, zoom, settings.CLUSTER_CELL_PX)
     # res.flights += generate_flight_mock_data()
     # res = QueryFlightsResponse(
     #     flights=generate_flight_mock_data(),
@@ -294,7 +794,170 @@ async def query_flights(
     #     )
     # )
 
-    return Response(
+    response = Response(
         message="Live flight data requested",
         data=res,
     )
+
+    if accepts_columnar(request):
+        return ColumnarResponse(response)
+    return response
+
+
+@router.post(
+    "/flights/batch",
+    response_description="Query live flights in several areas",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def query_flights_batch(
+        request: QueryFlightsBatchRequest = Body(),
+        zoom: float | None = Query(None, ge=0, le=24),
+        details: bool = Query(True),
+):
+    flights_service = FlightsService()
+
+    responses = await asyncio.gather(*[
+        flights_service.query_flights(area, details=False)
+        for area in request.areas
+    ])
+
+    reports = [flight for res in responses for flight in res.flights]
+
+    if details:
+        # A flight seen in several areas is only detailed once
+        unique: Dict[str, Flight] = {}
+        for flight in reports:
+            unique.setdefault(flight.id, flight)
+
+        details_service = DetailsService.get_instance()
+        results = await asyncio.gather(*[
+            details_service.flight(flight.id, flight.identification_service_area)
+            for flight in unique.values()
+        ], return_exceptions=True)
+
+        flight_details = {}
+        for flight, result in zip(unique.values(), results):
+            if isinstance(result, Exception):
+                print("Error fetching details for flight:", flight.id)
+                print(result)
+                continue
+            flight_details[flight.id] = result
+
+        for flight in reports:
+            flight.details = flight_details.get(flight.id, flight.details)
+
+    # Resolved again across the areas, now that the registration ids of
+    # the flights are known
+    resolved, aliases = resolve_flights(reports)
+    flights = {flight.id: flight for flight in resolved}
+
+    conformance = monitor_flights(resolved)
+    attach_positions(resolved, request.positions_since)
+
+    settings = get_settings()
+    areas = []
+    for res in responses:
+        area_flights = [
+            flights[flight_id] for flight_id
+            in dict.fromkeys(aliases[flight.id] for flight in res.flights)
+        ]
+
+        clusters = None
+        if zoom is not None and zoom < settings.CLUSTER_MAX_ZOOM:
+            area_flights, clusters = cluster_flights(
+                area_flights, zoom, settings.CLUSTER_CELL_PX)
+
+        areas.append(FlightsAreaResult(
+            flights=[flight.id for flight in area_flights],
+            clusters=clusters,
+        ))
+
+    # Clustered flights are only sent within their clusters
+    sent = {flight_id for area in areas for flight_id in area.flights}
+
+    return Response(
+        message="Live flight data requested",
+        data=QueryFlightsBatchResponse(
+            flights={
+                flight_id: flight for flight_id, flight in flights.items()
+                if flight_id in sent
+            },
+            areas=areas,
+            timestamp=Time(
+                value=datetime.now(timezone.utc),
+                format=TimeFormat.RFC3339,
+            ),
+            conformance=conformance,
+        ),
+    )
+
+
+@router.get(
+    "/conformance",
+    response_description="Last conformance evaluation of live flights",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_conformance():
+    return Response(
+        message="Conformance report requested",
+        data=ConformanceService.get_instance().last_report,
+    )
+
+
+@router.get(
+    "/alerts",
+    response_description="Alerts raised by the live monitoring",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_alerts(
+    since: int = Query(0, ge=0),
+):
+    return Response(
+        message="Alerts requested",
+        data=AlertFeed.get_instance().since(since),
+    )
+
+
+@router.get(
+    "/proximity",
+    response_description="Live aircraft pairs below the separation thresholds",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_proximity():
+    return Response(
+        message="Proximity conflicts requested",
+        data=ProximityService.get_instance().pairs,
+    )
+
+
+@router.get(
+    "/flights/{flight_id}/trail",
+    response_description="Recent positions of a live flight",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_flight_trail(
+    flight_id: str,
+    since: datetime | None = Query(None),
+):
+    points = TrackStore.get_instance().trail(
+        flight_id,
+        since=since.timestamp() if since else None,
+    )
+
+    return Response(
+        message="Flight trail requested",
+        data=FlightTrail(
+            flight_id=flight_id,
+            t=points["t"].tolist(),
+            lat=points["lat"].tolist(),
+            lng=points["lng"].tolist(),
+            alt=optional_values(points["alt"]),
+            speed=optional_values(points["speed"]),
+            track=optional_values(points["track"]),
+        ),
+    )
@@ -1,7 +1,9 @@
 
 from http import HTTPStatus
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 from schemas.response import Response
+from services.metrics import MetricsRegistry
 
 router = APIRouter()
 
@@ -14,3 +16,19 @@ async def health_check():
     return Response(
         message="OK",
     )
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def metrics():
+    """
+    Request, span and upstream latency histograms, upstream error counts
+    and cache hit ratios in the Prometheus text format.
+    """
+    return PlainTextResponse(
+        MetricsRegistry.get_instance().render(),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,104 @@
+from http import HTTPStatus
+from fastapi import APIRouter, Query
+from datetime import datetime, timezone
+
+from schemas.common.base import Time
+from schemas.common.enums import TimeFormat
+from schemas.replay import RecordingSegment, ReplayFlights, ReplayVolumeChange
+from schemas.response import Response
+from services.metrics import TimedRoute
+from services.recorder import RecordingReader
+from services.tracks import optional_values
+
+router = APIRouter(route_class=TimedRoute)
+
+# The handlers are plain functions, run in the threadpool by FastAPI, as
+# reading the memory mapped segments would block the event loop
+
+
+def _time(timestamp: float) -> Time:
+    return Time(
+        value=datetime.fromtimestamp(timestamp, timezone.utc),
+        format=TimeFormat.RFC3339,
+    )
+
+
+@router.get(
+    "/segments",
+    response_description="Segments of the airspace recording",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+def get_segments():
+    reader = RecordingReader()
+
+    return Response(
+        message="Recording segments requested",
+        data=[
+            RecordingSegment(
+                name=name,
+                time_start=_time(start),
+                time_end=_time(end),
+                ticks=ticks,
+                volume_changes=events,
+            )
+            for name, start, end, ticks, events in reader.segments()
+        ],
+    )
+
+
+@router.get(
+    "/flights",
+    response_description="Recorded flight positions in a time window",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+def get_replay_flights(
+    start: datetime = Query(),
+    end: datetime = Query(),
+    limit: int = Query(200000, gt=0),
+):
+    reader = RecordingReader()
+
+    records, flight_ids, truncated = reader.flights(
+        start.timestamp(), end.timestamp(), limit)
+
+    return Response(
+        message="Recorded flights requested",
+        data=ReplayFlights(
+            flight_ids=flight_ids,
+            flight=records["flight"].tolist(),
+            t=records["t"].tolist(),
+            lat=records["lat"].tolist(),
+            lng=records["lng"].tolist(),
+            alt=optional_values(records["alt"]),
+            speed=optional_values(records["speed"]),
+            track=optional_values(records["track"]),
+            truncated=truncated,
+        ),
+    )
+
+
+@router.get(
+    "/volumes",
+    response_description="Recorded volume changes in a time window",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+def get_replay_volumes(
+    start: datetime = Query(),
+    end: datetime = Query(),
+):
+    reader = RecordingReader()
+
+    return Response(
+        message="Recorded volumes requested",
+        data=[
+            ReplayVolumeChange(
+                timestamp=_time(t),
+                kind=event["kind"],
+                data=event["data"],
+            )
+            for t, event in reader.volumes(start.timestamp(), end.timestamp())
+        ],
+    )
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+
+from schemas.common.base import Time
+from schemas.common.enums import AlertType
+
+
+class Alert(BaseModel):
+    """
+    Airspace event raised by the live monitoring of flights. The sequence
+    number increases monotonically and is used as a cursor by the clients.
+    """
+    seq: int
+    type: AlertType
+    timestamp: Time
+    message: str
+    flight_id: Optional[str] = None
+    other_flight_id: Optional[str] = None
+    constraint_id: Optional[UUID] = None
+    geozone: Optional[str] = None
+
+
+class ProximityPair(BaseModel):
+    """
+    Two live aircraft closer than the configured separation thresholds.
+    Distances are in meters.
+    """
+    flight_id: str
+    other_flight_id: str
+    horizontal_distance: float
+    vertical_distance: Optional[float] = None
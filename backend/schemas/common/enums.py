@@ -217,3 +217,26 @@ class UAType(str, Enum):
     TetheredPoweredAircraft = "TetheredPoweredAircraft"
     GroundObstacle = "GroundObstacle"
     Other = "Other"
+
+
+class ConformanceStatus(str, Enum):
+    CONFORMING = "Conforming"
+    NONCONFORMING = "Nonconforming"
+
+
+class AlertType(str, Enum):
+    GEOFENCE_ENTER = "GeofenceEnter"
+    GEOFENCE_EXIT = "GeofenceExit"
+    PROXIMITY = "Proximity"
+    PROXIMITY_CLEARED = "ProximityCleared"
+
+
+class GeometryEncoding(str, Enum):
+    VERTICES = "vertices"
+    POLYLINE = "polyline"
+
+
+class VolumeKind(str, Enum):
+    OPERATIONAL_INTENT = "operational_intent"
+    CONSTRAINT = "constraint"
+    IDENTIFICATION_SERVICE_AREA = "identification_service_area"
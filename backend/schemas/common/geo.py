@@ -1,14 +1,20 @@
 from __future__ import annotations
 from typing import List, Optional, Any
 from pydantic import BaseModel, Field, model_validator
+import numpy as np
 from .base import Time
 from .enums import (
     RadiusUnits,
     AltitudeReference,
     AltitudeUnits,
+    GeometryEncoding,
     PositionAccuracyHorizontal,
     PositionAccuracyVertical,
 )
+from .polyline import encode_polyline
+
+# Decimal digits kept by the polyline encoding by default
+DEFAULT_PRECISION = 6
 
 
 class Radius(BaseModel):
@@ -112,3 +118,47 @@ class GeoZone(BaseModel):
     u_space_class: Optional[str] = None
     message: Optional[str] = None
     additional_properties: Optional[dict] = Field(default=None)
+
+
+def encode_outlines(
+    document: Any,
+    encoding: GeometryEncoding,
+    precision: int = DEFAULT_PRECISION,
+) -> Any:
+    """
+    Rewrites the polygon outlines of a dumped document in place. With the
+    polyline encoding the vertices of every outline_polygon are replaced by
+    {"encoding": "polyline", "precision": precision, "points": ...}.
+
+    Applied to the dumped document rather than as a model serializer, which
+    would slow down the default serialization of every Polygon.
+    """
+    if encoding == GeometryEncoding.VERTICES:
+        return document
+
+    pending = [document]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        polygon = node.get("outline_polygon")
+        if isinstance(polygon, dict) and "vertices" in polygon:
+            vertices = polygon.pop("vertices")
+            polygon["encoding"] = encoding.value
+            polygon["precision"] = precision
+            polygon["points"] = encode_polyline(
+                np.array([vertex["lat"] for vertex in vertices]),
+                np.array([vertex["lng"] for vertex in vertices]),
+                precision,
+            )
+
+        pending.extend(
+            value for value in node.values()
+            if isinstance(value, (dict, list))
+        )
+
+    return document
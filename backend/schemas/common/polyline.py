@@ -0,0 +1,64 @@
+from typing import Tuple
+import numpy as np
+
+# Offset making every 5 bit chunk a printable character
+CHUNK_OFFSET = 63
+CONTINUATION = 0x20
+
+# Chunks needed by the largest zigzag value of a 64 bit delta
+MAX_CHUNKS = 13
+
+
+def encode_polyline(
+    lat: np.ndarray, lng: np.ndarray, precision: int = 6
+) -> str:
+    """
+    Encoded polyline of the points, with coordinates quantized to
+    `precision` decimal digits. Each coordinate is the zigzag varint of its
+    delta from the previous point, in 5 bit chunks offset into printable
+    ASCII, as in the Google polyline format.
+    """
+    if len(lat) == 0:
+        return ""
+
+    factor = 10 ** precision
+    quantized = np.rint(
+        np.column_stack([lat, lng]) * factor).astype(np.int64)
+    delta = np.diff(
+        quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+
+    zigzag = ((delta << 1) ^ (delta >> 63)).astype(np.uint64)
+
+    shifts = np.arange(MAX_CHUNKS, dtype=np.uint64) * np.uint64(5)
+    chunks = (zigzag[:, None] >> shifts) & np.uint64(0x1F)
+    remaining = (zigzag[:, None] >> (shifts + np.uint64(5))) > 0
+
+    # A chunk is written when it or a previous one still has bits left
+    written = np.ones_like(remaining)
+    written[:, 1:] = remaining[:, :-1]
+
+    characters = chunks + CHUNK_OFFSET + np.where(remaining, CONTINUATION, 0)
+    return characters[written].astype(np.uint8).tobytes().decode("ascii")
+
+
+def decode_polyline(
+    encoded: str, precision: int = 6
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inverse of encode_polyline, returns the quantized latitudes and
+    longitudes.
+    """
+    values = []
+    value = shift = 0
+    for character in encoded.encode("ascii"):
+        chunk = character - CHUNK_OFFSET
+        value |= (chunk & 0x1F) << shift
+        shift += 5
+        if chunk < CONTINUATION:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+
+    coordinates = np.cumsum(
+        np.array(values, dtype=np.int64).reshape(-1, 2), axis=0)
+    coordinates = coordinates / 10 ** precision
+    return coordinates[:, 0], coordinates[:, 1]
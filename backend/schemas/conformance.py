@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from uuid import UUID
+
+from schemas.common.base import Time
+from schemas.common.enums import ConformanceStatus
+
+
+class FlightConformance(BaseModel):
+    """
+    Conformance of a live aircraft against the operational intents of its
+    provider. Positions obtained through the operational intent telemetry
+    have no flight id.
+    """
+    flight_id: Optional[str] = None
+    status: ConformanceStatus
+    operational_intent_id: Optional[UUID] = None
+
+
+class ConformanceReport(BaseModel):
+    """
+    Result of the last conformance evaluation.
+    """
+    timestamp: Time
+    flights: List[FlightConformance] = []
@@ -1,11 +1,18 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+from uuid import UUID
 
-from schemas.common.geo import Volume4D
-from schemas.dss.remoteid import IdentificationServiceAreaFull
+from schemas.common.enums import FlightType, GeometryEncoding, OperationalIntentState, VolumeKind
+from schemas.common.geo import DEFAULT_PRECISION, Volume4D
+from schemas.dss.common import ConstraintReference, OperationalIntentReference
+from schemas.dss.remoteid import IdentificationServiceArea, IdentificationServiceAreaFull
+from schemas.uss.remoteid import RIDFlightDetails
 from .response import Response
 from .uss.common import OperationalIntent, Constraint
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 
 class QueryVolumesResponseData(BaseModel):
     """
@@ -21,3 +28,110 @@ class QueryVolumesResponse(Response):
     Response model for the query_volumes endpoint.
     """
     data: QueryVolumesResponseData
+
+
+class QueryVolumeReferencesResponseData(BaseModel):
+    """
+    Data of the query_volumes endpoint in references-only mode.
+    """
+    operational_intent_references: List[OperationalIntentReference]
+    constraint_references: List[ConstraintReference]
+    service_areas: List[IdentificationServiceArea]
+
+
+class QueryDetailsRequest(BaseModel):
+    """
+    Ids of the entities whose details are requested, as returned by
+    query_volumes and query_flights.
+    """
+    operational_intents: List[UUID] = []
+    constraints: List[UUID] = []
+    flights: List[str] = []
+
+
+class QueryDetailsResponseData(BaseModel):
+    """
+    Data of the query_details endpoint, with an error per id that is
+    unknown or whose details could not be fetched.
+    """
+    operational_intents: List[OperationalIntent]
+    constraints: List[Constraint]
+    flights: List[RIDFlightDetails]
+    errors: List[str]
+
+
+class VolumeFilters(BaseModel):
+    """
+    Predicates applied by the query_volumes endpoint. The DSS reference
+    fields are checked before fetching details from the USSs, the altitude
+    band once the volumes are known. The monitoring is refreshed apart with
+    every volume in the area. Unset predicates match everything.
+    """
+    kinds: Optional[List[VolumeKind]] = None
+    managers: Optional[List[str]] = None
+    states: Optional[List[OperationalIntentState]] = None
+    flight_types: Optional[List[FlightType]] = None
+    active_from: Optional[datetime] = None
+    active_until: Optional[datetime] = None
+    altitude_lower: Optional[float] = None
+    altitude_upper: Optional[float] = None
+
+
+class QueryVolumesParameters(VolumeFilters):
+    """
+    Query parameters of the query_volumes endpoint. Outlines are simplified
+    for a map zoom level or a tolerance in meters, which takes precedence.
+    With `aggregate`, the overlapping segments of each operational intent
+    in the queried window are merged into footprints. Polygon outlines are
+    sent as encoded polylines of `precision` decimal digits when `geometry`
+    is "polyline". With `references_only`, only the DSS references are
+    returned and the altitude band is not applied, details are requested
+    on demand from the query_details endpoint.
+    """
+    zoom: Optional[float] = Field(default=None, ge=0, le=24)
+    tolerance: Optional[float] = Field(default=None, gt=0)
+    aggregate: bool = False
+    geometry: GeometryEncoding = GeometryEncoding.VERTICES
+    precision: int = Field(default=DEFAULT_PRECISION, ge=0, le=9)
+    references_only: bool = False
+
+
+class VolumesStreamTrailer(BaseModel):
+    """
+    Last record of the query_volumes stream, after one record per entity.
+    Incomplete when a DSS query fell back to its previous result or the
+    details of a reference could not be fetched.
+    """
+    complete: bool
+    errors: List[str]
+    operational_intents: int
+    constraints: int
+    identification_service_areas: int
+
+
+class QueryVolumesBatchRequest(BaseModel):
+    """
+    Areas queried at once by the query_volumes_batch endpoint.
+    """
+    areas: List[Volume4D] = Field(min_length=1)
+
+
+class VolumesAreaResult(BaseModel):
+    """
+    Ids of the entities found in one of the queried areas.
+    """
+    operational_intents: List[str]
+    constraints: List[str]
+    identification_service_areas: List[str]
+
+
+class QueryVolumesBatchResponseData(BaseModel):
+    """
+    Data of the query_volumes_batch endpoint. Every entity is sent once,
+    by id, and the result of each area in the order of the request refers
+    to them.
+    """
+    operational_intents: Dict[str, OperationalIntent]
+    constraints: Dict[str, Constraint]
+    identification_service_areas: Dict[str, IdentificationServiceAreaFull]
+    areas: List[VolumesAreaResult]
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
 
 from schemas.common.base import Time
+from schemas.conformance import FlightConformance
 from schemas.dss.remoteid import IdentificationServiceArea
 from schemas.uss.remoteid import RIDFlight, RIDFlightDetails
 from .response import Response
@@ -10,6 +12,8 @@ from .uss.common import OperationalIntent, Constraint
 class Flight(RIDFlight):
     identification_service_area: IdentificationServiceArea
     details: Optional[RIDFlightDetails]
+    # Providers that reported the flight, when merged from several reports
+    sources: List[str] = []
 
 class QueryFlightsRequest(BaseModel):
     """
@@ -19,6 +23,23 @@ class QueryFlightsRequest(BaseModel):
     east: float
     south: float
     west: float
+    # Timestamp of the last current state received per flight id, echoed
+    # back by the client. Only read by the query_flights endpoint
+    positions_since: Dict[str, datetime] = {}
+
+
+class FlightCluster(BaseModel):
+    """
+    Live flights binned into the same map cell at a zoomed-out view.
+    """
+    count: int
+    lat: float
+    lng: float
+    north: float
+    east: float
+    south: float
+    west: float
+    provider: str
 
 
 class QueryFlightsResponse(BaseModel):
@@ -29,3 +50,35 @@ class QueryFlightsResponse(BaseModel):
     partial: bool
     errors: List[str]
     timestamp: Time
+    conformance: List[FlightConformance] = []
+    clusters: Optional[List[FlightCluster]] = None
+
+
+class QueryFlightsBatchRequest(BaseModel):
+    """
+    Areas queried at once by the query_flights_batch endpoint, and the
+    timestamp of the last current state received per flight id.
+    """
+    areas: List[QueryFlightsRequest] = Field(min_length=1)
+    positions_since: Dict[str, datetime] = {}
+
+
+class FlightsAreaResult(BaseModel):
+    """
+    Ids of the live flights found in one of the queried areas, and their
+    clusters at a zoomed-out view.
+    """
+    flights: List[str]
+    clusters: Optional[List[FlightCluster]] = None
+
+
+class QueryFlightsBatchResponse(BaseModel):
+    """
+    Response model for the query_flights_batch endpoint. Every flight is
+    sent once, by id, and the result of each area in the order of the
+    request refers to them.
+    """
+    flights: Dict[str, Flight]
+    areas: List[FlightsAreaResult]
+    timestamp: Time
+    conformance: List[FlightConformance] = []
@@ -0,0 +1,77 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+from schemas.common.base import Time
+
+
+class LoopStall(BaseModel):
+    """
+    A period in which the event loop did not run other tasks, with the
+    stack that was executing while it was blocked.
+    """
+    timestamp: Time
+    duration_ms: float
+    stack: List[str]
+
+
+class LoopStatus(BaseModel):
+    """
+    State of the event loop lag monitor.
+    """
+    running: bool
+    threshold_ms: float
+    interval_ms: float
+    last_lag_ms: float
+    max_lag_ms: float
+    stalls: int
+    recent_stalls: List[LoopStall]
+
+
+class HeapSnapshot(BaseModel):
+    """
+    A tracemalloc snapshot kept for comparisons.
+    """
+    id: int
+    timestamp: Time
+    traced_bytes: int
+    blocks: int
+
+
+class HeapStatus(BaseModel):
+    """
+    State of the allocation tracing.
+    """
+    tracing: bool
+    frames: int
+    traced_bytes: int
+    peak_bytes: int
+    snapshots: List[HeapSnapshot]
+
+
+class AllocationSite(BaseModel):
+    """
+    Memory allocated from a source location or traceback, and its change
+    from the base snapshot when comparing two snapshots.
+    """
+    traceback: List[str]
+    size_bytes: int
+    count: int
+    size_diff_bytes: Optional[int] = None
+    count_diff: Optional[int] = None
+
+
+class ObjectCount(BaseModel):
+    """
+    Live instances of a model or client type.
+    """
+    type: str
+    count: int
+
+
+class CacheSize(BaseModel):
+    """
+    Entries and approximate memory held by an internal cache.
+    """
+    name: str
+    entries: int
+    bytes: int
@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from typing import Any, List
+
+from schemas.common.base import Time
+
+
+class RecordingSegment(BaseModel):
+    """
+    A segment file set of the airspace recording.
+    """
+    name: str
+    time_start: Time
+    time_end: Time
+    ticks: int
+    volume_changes: int
+
+
+class ReplayFlights(BaseModel):
+    """
+    Recorded flight positions in columnar form. `flight` holds indexes into
+    `flight_ids`, timestamps are POSIX seconds.
+    """
+    flight_ids: List[str] = []
+    flight: List[int] = []
+    t: List[float] = []
+    lat: List[float] = []
+    lng: List[float] = []
+    alt: List[float | None] = []
+    speed: List[float | None] = []
+    track: List[float | None] = []
+    truncated: bool = False
+
+
+class ReplayVolumeChange(BaseModel):
+    """
+    An operational intent or constraint recorded when it was first seen or
+    when its OVN changed.
+    """
+    timestamp: Time
+    kind: str
+    data: Any
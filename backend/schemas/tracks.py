@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class FlightTrail(BaseModel):
+    """
+    Recent positions of a live flight in columnar form, ordered by time.
+    Timestamps are POSIX seconds, altitudes in meters, speed in meters per
+    second and track in degrees.
+    """
+    flight_id: str
+    t: List[float] = []
+    lat: List[float] = []
+    lng: List[float] = []
+    alt: List[float | None] = []
+    speed: List[float | None] = []
+    track: List[float | None] = []
@@ -0,0 +1,60 @@
+from collections import deque
+from typing import List
+from datetime import datetime, timezone
+from threading import Lock
+
+from config.config import get_settings
+from schemas.alerts import Alert
+from schemas.common.base import Time
+from schemas.common.enums import AlertType, TimeFormat
+from services.cache import register_cache
+
+
+class AlertFeed:
+    """
+    Bounded in-memory feed of the alerts raised by the live monitoring.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        settings = get_settings()
+
+        self._alerts: deque[Alert] = deque(maxlen=settings.ALERT_FEED_SIZE)
+        self._seq = 0
+
+        register_cache("alerts", lambda: len(self), lambda: self._alerts)
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def publish(self, type: AlertType, message: str, **fields) -> Alert:
+        self._seq += 1
+
+        alert = Alert(
+            seq=self._seq,
+            type=type,
+            timestamp=Time(
+                value=datetime.now(timezone.utc),
+                format=TimeFormat.RFC3339,
+            ),
+            message=message,
+            **fields,
+        )
+        self._alerts.append(alert)
+
+        return alert
+
+    def since(self, seq: int = 0) -> List[Alert]:
+        """
+        Returns the alerts published after the given sequence number.
+        """
+        return [alert for alert in self._alerts if alert.seq > seq]
@@ -0,0 +1,121 @@
+import gc
+import sys
+from collections import OrderedDict
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+from threading import Lock
+
+from services.metrics import MetricsRegistry
+
+# Shared by the whole process, never accounted to a cache
+_SKIPPED_TYPES = (
+    type, ModuleType, FunctionType, BuiltinFunctionType, MethodType,
+)
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Approximates the memory held by an object and everything it references,
+    counting shared objects once.
+    """
+    seen = set()
+    pending = [obj]
+    size = 0
+
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED_TYPES):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        pending.extend(gc.get_referents(current))
+
+    return size
+
+
+class CacheRegistry:
+    """
+    Names and measures every in-memory cache of the process, so eviction
+    limits can be sized from what the caches actually hold.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        self._caches: Dict[str, Tuple[Callable[[], int], Callable[[], Any]]] = {}
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def register(
+        self,
+        name: str,
+        entries: Callable[[], int],
+        contents: Callable[[], Any],
+    ) -> None:
+        """
+        Registers a cache by the number of entries it holds and the objects
+        making up its contents.
+        """
+        self._caches[name] = (entries, contents)
+
+    def report(self) -> List[Tuple[str, int, int]]:
+        """
+        Returns (name, entries, bytes) for every registered cache.
+        """
+        return [
+            (name, entries(), deep_sizeof(contents()))
+            for name, (entries, contents) in sorted(self._caches.items())
+        ]
+
+
+def register_cache(
+    name: str,
+    entries: Callable[[], int],
+    contents: Callable[[], Any],
+) -> None:
+    CacheRegistry.get_instance().register(name, entries, contents)
+
+
+class LRUCache:
+    """
+    Bounded mapping evicting the least recently used entries. Registers
+    itself in the cache registry and reports its hits and misses.
+    """
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self._size = size
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._entries_lock = Lock()
+
+        register_cache(name, lambda: len(self), lambda: self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._entries_lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+
+        MetricsRegistry.get_instance().cache_lookup(
+            self.name, value is not None)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._entries_lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._entries_lock:
+            self._entries.clear()
@@ -1,13 +1,17 @@
 import httpx
 import jwt
+import time
 from typing import Any
 from http import HTTPStatus
 from fastapi import HTTPException
 from datetime import datetime
 from threading import Lock
-from config.config import Settings
-from schemas.common.enums import Authority
+from config.config import get_settings
+from schemas.common.enums import Audition, Authority
 from schemas.response import ResponseError
+from services.cache import register_cache
+from services.metrics import MetricsRegistry, record_span
+from services.transport import upstream_transport
 
 
 class AuthAsyncClient(httpx.AsyncClient):
@@ -16,6 +20,7 @@ class AuthAsyncClient(httpx.AsyncClient):
     """
 
     def __init__(self, aud: str, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("transport", upstream_transport())
         super().__init__(*args, **kwargs)
         self._aud = aud
 
@@ -31,6 +36,9 @@ class AuthAsyncClient(httpx.AsyncClient):
             raise ValueError("Authority must be provided in the request for \
             authentication.")
 
+        upstream = "dss" if self._aud == Audition.DSS.value else "uss"
+        start = time.perf_counter()
+
         try:
             res = await super().request(
                 method,
@@ -42,8 +50,20 @@ class AuthAsyncClient(httpx.AsyncClient):
                 **kwargs
             )
 
+            elapsed = time.perf_counter() - start
+            record_span(upstream, elapsed)
+            MetricsRegistry.get_instance().observe(
+                "observer_upstream_request_duration_seconds",
+                elapsed,
+                upstream=self._aud,
+                method=method,
+            )
+            if res.status_code >= 400:
+                self._count_error(str(res.status_code))
+
             return res
         except ConnectionRefusedError as e:
+            self._count_error(type(e).__name__)
             raise HTTPException(
                 status_code=HTTPStatus.SERVICE_UNAVAILABLE.value,
                 detail=ResponseError(
@@ -52,6 +72,7 @@ class AuthAsyncClient(httpx.AsyncClient):
                 ).model_dump(mode="json"),
             )
         except httpx.RequestError as e:
+            self._count_error(type(e).__name__)
             raise HTTPException(
                 status_code=HTTPStatus.INTERNAL_SERVER_ERROR.value,
                 detail=ResponseError(
@@ -60,6 +81,13 @@ class AuthAsyncClient(httpx.AsyncClient):
                 ).model_dump(mode="json"),
             )
 
+    def _count_error(self, reason: str) -> None:
+        MetricsRegistry.get_instance().increment(
+            "observer_upstream_errors_total",
+            upstream=self._aud,
+            reason=reason,
+        )
+
 
 class ServiceTokenMiddleware(httpx.Auth):
     def __init__(self, aud: str, scope: Authority) -> None:
@@ -94,14 +122,20 @@ class ServiceTokenMiddleware(httpx.Auth):
             yield request
 
 
+# Token sent to replayed upstreams, which do not check it
+REPLAY_TOKEN = "replay"
+
+
 class AuthService:
     _instance = None
     _lock = Lock()
 
     def __init__(self):
-        settings = Settings()
+        settings = get_settings()
 
         self._tokens = {}
+        # Token exchanges are not recorded, a replay never requests one
+        self._replay = bool(settings.UPSTREAM_REPLAY_PATH)
         self._base_url = settings.BRUTM_BASE_URL
         self._auth_key = settings.BRUTM_KEY
 
@@ -110,7 +144,16 @@ class AuthService:
                 "AUTH_URL and AUTH_KEY must be set in the environment \
                 variables.")
 
-        self._client = httpx.AsyncClient(base_url=self._base_url)
+        self._client = httpx.AsyncClient(
+            base_url=self._base_url,
+            transport=upstream_transport(),
+        )
+
+        register_cache(
+            "auth.tokens",
+            lambda: sum(len(scopes) for scopes in self._tokens.values()),
+            lambda: self._tokens,
+        )
 
     @classmethod
     def get_instance(cls):
@@ -125,9 +168,13 @@ class AuthService:
         aud: str,
         scope: Authority = Authority.CONSTRAINT_PROCESSING,
     ) -> str:
-        if aud not in self._tokens \
-                or scope not in self._tokens[aud] \
-                or not self._is_token_valid(self._tokens[aud][scope]):
+        cached = aud in self._tokens \
+            and scope in self._tokens[aud] \
+            and (self._replay
+                 or self._is_token_valid(self._tokens[aud][scope]))
+        MetricsRegistry.get_instance().cache_lookup("tokens", cached)
+
+        if not cached:
             await self.refresh_token(aud=aud, scope=scope)
 
         return self._tokens[aud][scope]
@@ -137,18 +184,37 @@ class AuthService:
         aud: str,
         scope: Authority = Authority.CONSTRAINT_PROCESSING
     ):
+        if self._replay:
+            self._tokens.setdefault(aud, {})[scope] = REPLAY_TOKEN
+            return
+
         params = {
             "intended_audience": aud,
             "scope": scope.value,
             "apikey": self._auth_key,
         }
 
+        start = time.perf_counter()
         response = await self._client.get(
             "/token",
             params=params,
         )
+        elapsed = time.perf_counter() - start
+
+        record_span("token", elapsed)
+        MetricsRegistry.get_instance().observe(
+            "observer_upstream_request_duration_seconds",
+            elapsed,
+            upstream="auth",
+            method="GET",
+        )
 
         if response.status_code != 200:
+            MetricsRegistry.get_instance().increment(
+                "observer_upstream_errors_total",
+                upstream="auth",
+                reason=str(response.status_code),
+            )
             raise HTTPException(
                 status_code=response.status_code,
                 detail=ResponseError(
@@ -0,0 +1,95 @@
+from typing import List, Tuple
+import numpy as np
+
+from schemas.flights import Flight, FlightCluster
+
+# Side of a web mercator tile in pixels
+TILE_PX = 256
+
+# Latitude limits of the web mercator projection
+MAX_LAT = 85.0511
+
+
+def to_pixels(
+    lat: np.ndarray, lng: np.ndarray, zoom: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Projects lat/lng degrees into web mercator pixels at a zoom level.
+    """
+    world = TILE_PX * 2 ** zoom
+    phi = np.radians(np.clip(lat, -MAX_LAT, MAX_LAT))
+    x = (lng + 180.0) / 360.0 * world
+    y = (1.0 - np.log(np.tan(phi) + 1.0 / np.cos(phi)) / np.pi) / 2.0 * world
+    return x, y
+
+
+def cluster_flights(
+    flights: List[Flight],
+    zoom: float,
+    cell_px: float,
+) -> Tuple[List[Flight], List[FlightCluster]]:
+    """
+    Bins the flights into square cells of `cell_px` screen pixels at the
+    zoom level. Returns the flights alone in their cell and a cluster for
+    every cell with more than one flight, with the provider reporting most
+    of its flights.
+    """
+    located = [flight for flight in flights if flight.current_state]
+    if not located:
+        return flights, []
+
+    lat = np.array([f.current_state.position.lat for f in located])
+    lng = np.array([f.current_state.position.lng for f in located])
+    providers, provider = np.unique(
+        [f.identification_service_area.owner for f in located],
+        return_inverse=True,
+    )
+
+    x, y = to_pixels(lat, lng, zoom)
+    column = np.floor(x / cell_px).astype(np.int64)
+    row = np.floor(y / cell_px).astype(np.int64)
+    _, cell = np.unique(
+        np.stack([column, row], axis=1), axis=0, return_inverse=True)
+    cell = cell.ravel()
+
+    cells = cell.max() + 1
+    count = np.bincount(cell, minlength=cells)
+
+    north = np.full(cells, -np.inf)
+    south = np.full(cells, np.inf)
+    east = np.full(cells, -np.inf)
+    west = np.full(cells, np.inf)
+    np.maximum.at(north, cell, lat)
+    np.minimum.at(south, cell, lat)
+    np.maximum.at(east, cell, lng)
+    np.minimum.at(west, cell, lng)
+
+    center_lat = np.bincount(cell, weights=lat, minlength=cells) / count
+    center_lng = np.bincount(cell, weights=lng, minlength=cells) / count
+
+    per_provider = np.zeros((cells, len(providers)), dtype=np.int64)
+    np.add.at(per_provider, (cell, provider), 1)
+    dominant = per_provider.argmax(axis=1)
+
+    alone = count[cell] == 1
+    singles = [
+        flight for flight, single in zip(located, alone.tolist()) if single
+    ]
+    # Flights without a position cannot be placed in a cell
+    singles += [flight for flight in flights if not flight.current_state]
+
+    clusters = [
+        FlightCluster(
+            count=int(count[i]),
+            lat=float(center_lat[i]),
+            lng=float(center_lng[i]),
+            north=float(north[i]),
+            east=float(east[i]),
+            south=float(south[i]),
+            west=float(west[i]),
+            provider=str(providers[dominant[i]]),
+        )
+        for i in np.flatnonzero(count > 1).tolist()
+    ]
+
+    return singles, clusters
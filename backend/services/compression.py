@@ -0,0 +1,164 @@
+import gzip
+import hashlib
+from typing import Callable, Dict, List, Tuple
+from threading import Lock
+from fastapi import Request
+from fastapi import Response as RawResponse
+
+from config.config import get_settings
+from services.cache import LRUCache
+from services.metrics import MetricsRegistry, span
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content codings by server preference, with their compression function
+# and range of levels. brotli and zstandard are optional dependencies
+CODECS: Dict[str, Tuple[Callable[[bytes, int], bytes], int, int]] = {}
+if zstandard is not None:
+    CODECS["zstd"] = (
+        lambda data, level:
+            zstandard.ZstdCompressor(level=level).compress(data),
+        1, 22,
+    )
+if brotli is not None:
+    CODECS["br"] = (
+        lambda data, level: brotli.compress(data, quality=level),
+        0, 11,
+    )
+CODECS["gzip"] = (
+    lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+    1, 9,
+)
+
+# Statuses without a body worth compressing
+SKIPPED_STATUSES = (204, 206, 304)
+
+
+def accepted_encodings(header: str) -> List[str]:
+    """
+    Content codings of an Accept-Encoding header with a non-zero quality,
+    "*" standing for any of the supported ones.
+    """
+    encodings = []
+    for item in header.split(","):
+        name, _, parameters = item.strip().partition(";")
+        quality = 1.0
+        parameter = parameters.strip()
+        if parameter.startswith("q="):
+            try:
+                quality = float(parameter[2:])
+            except ValueError:
+                quality = 0
+        if name and quality > 0:
+            encodings.append(name.strip().lower())
+    return encodings
+
+
+def negotiate(header: str) -> str | None:
+    accepted = accepted_encodings(header)
+    for encoding in CODECS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+class CompressionService:
+    """
+    Content-negotiated compression of the API responses.
+
+    Bodies under COMPRESSION_MIN_BYTES and streamed responses are sent as
+    they are. The level is chosen per route from COMPRESSION_LEVELS and
+    clamped to the range of the codec. Compressed bodies are kept by digest
+    of the uncompressed body, so a hot response that did not change since
+    the last poll is only compressed once.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        settings = get_settings()
+
+        self._min_bytes = settings.COMPRESSION_MIN_BYTES
+        self._level = settings.COMPRESSION_LEVEL
+        self._levels = settings.COMPRESSION_LEVELS
+        self._bodies = LRUCache(
+            "compression.bodies", settings.COMPRESSION_CACHE_SIZE)
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def level(self, path: str, encoding: str) -> int:
+        _, lowest, highest = CODECS[encoding]
+        level = self._levels.get(path, self._level)
+        return min(max(level, lowest), highest)
+
+    def compress(self, body: bytes, encoding: str, level: int) -> bytes:
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding, level)
+
+        compressed = self._bodies.get(key)
+        if compressed is None:
+            with span("compress"):
+                compress, _, _ = CODECS[encoding]
+                compressed = compress(body, level)
+            self._bodies.put(key, compressed)
+
+        metrics = MetricsRegistry.get_instance()
+        metrics.increment("observer_compression_input_bytes_total",
+                          len(body), encoding=encoding)
+        metrics.increment("observer_compression_output_bytes_total",
+                          len(compressed), encoding=encoding)
+        return compressed
+
+    async def compress_response(
+        self, request: Request, response: RawResponse
+    ) -> RawResponse:
+        """
+        Returns the response compressed with the preferred coding accepted
+        by the client, or unchanged.
+        """
+        length = response.headers.get("content-length")
+        if length is None \
+                or int(length) < self._min_bytes \
+                or "content-encoding" in response.headers \
+                or response.status_code in SKIPPED_STATUSES:
+            return response
+
+        encoding = negotiate(request.headers.get("accept-encoding", ""))
+        if encoding is None:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+
+        route = request.scope.get("route")
+        path = route.path_format if route else request.url.path
+        compressed = self.compress(body, encoding, self.level(path, encoding))
+
+        vary = response.headers.get("vary")
+        compressed_response = RawResponse(
+            content=compressed,
+            status_code=response.status_code,
+            background=response.background,
+        )
+        compressed_response.raw_headers = [
+            (name, value) for name, value in response.raw_headers
+            if name not in (b"content-length", b"vary")
+        ] + [
+            (b"content-encoding", encoding.encode("latin-1")),
+            (b"vary", (f"{vary}, Accept-Encoding" if vary
+                       else "Accept-Encoding").encode("latin-1")),
+            (b"content-length", str(len(compressed)).encode("latin-1")),
+        ]
+        return compressed_response
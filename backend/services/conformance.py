@@ -0,0 +1,321 @@
+import asyncio
+import time
+from typing import Dict, List, Tuple
+from uuid import UUID
+from datetime import datetime, timezone
+from threading import Lock
+from urllib.parse import urlparse
+from pydantic import HttpUrl
+import numpy as np
+
+from config.config import get_settings
+from services.cache import register_cache
+from schemas.common.base import Time
+from schemas.common.enums import (
+    ConformanceStatus,
+    OperationalIntentState,
+    TimeFormat,
+)
+from schemas.common.geo import Volume4D
+from schemas.conformance import ConformanceReport, FlightConformance
+from schemas.flights import Flight
+from schemas.uss.common import OperationalIntent
+from schemas.uss.telemetry import VehicleTelemetry
+from services.details import DetailsService
+from services.spatial import VolumeIndex, to_timestamp
+from services.uss.operational_intents import USSOperationalIntentsService
+
+OFF_NOMINAL_STATES = (
+    OperationalIntentState.NONCONFORMING,
+    OperationalIntentState.CONTINGENT,
+)
+
+
+def _host(url: str | HttpUrl | None) -> str | None:
+    if not url:
+        return None
+    return urlparse(str(url)).hostname
+
+
+class ConformanceService:
+    """
+    Matches live aircraft positions against the 4D volumes of the
+    operational intents managed by the same USS.
+
+    A flight is monitored when its provider (ISA owner or USS host) has at
+    least one operational intent volume active at evaluation time. A
+    monitored flight outside every active volume of its provider is flagged
+    as nonconforming. Operational intents in an off-nominal state also have
+    their telemetry checked against their own volumes.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        settings = get_settings()
+
+        self._ttl = settings.CONFORMANCE_INTENT_TTL
+        self._operational_intents: Dict[UUID, OperationalIntent] = {}
+        self._last_seen: Dict[UUID, float] = {}
+        self._telemetry: Dict[UUID, VehicleTelemetry] = {}
+
+        self._index: VolumeIndex | None = None
+        self._volume_intent = np.zeros(0, dtype=np.int64)
+        self._intent_ids: List[UUID] = []
+        self._intent_manager = np.zeros(0, dtype=np.int64)
+        self._intent_host = np.zeros(0, dtype=np.int64)
+        self._providers: Dict[str, int] = {}
+
+        self._last_report: ConformanceReport | None = None
+
+        register_cache(
+            "conformance.operational_intents",
+            lambda: len(self._operational_intents),
+            lambda: (self._operational_intents, self._last_seen,
+                     self._index, self._intent_ids),
+        )
+        register_cache(
+            "conformance.telemetry",
+            lambda: len(self._telemetry),
+            lambda: self._telemetry,
+        )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def last_report(self) -> ConformanceReport | None:
+        return self._last_report
+
+    def update_operational_intents(
+        self, operational_intents: List[OperationalIntent]
+    ) -> None:
+        """
+        Upserts the operational intents returned by a volumes query and
+        drops the ones that were not seen within the configured TTL.
+        """
+        now = time.time()
+
+        for operational_intent in operational_intents:
+            entity_id = operational_intent.reference.id
+            if entity_id is None:
+                continue
+            self._operational_intents[entity_id] = operational_intent
+            self._last_seen[entity_id] = now
+
+        for entity_id, last_seen in list(self._last_seen.items()):
+            if now - last_seen > self._ttl:
+                del self._last_seen[entity_id]
+                self._operational_intents.pop(entity_id, None)
+                self._telemetry.pop(entity_id, None)
+
+        self._index = None
+
+    async def refresh_telemetry(self) -> None:
+        """
+        Requests the telemetry of every off-nominal operational intent.
+        """
+        off_nominal = [
+            operational_intent
+            for operational_intent in self._operational_intents.values()
+            if operational_intent.reference.state in OFF_NOMINAL_STATES
+            and operational_intent.reference.uss_base_url
+        ]
+
+        # Services shared per USS, a client per request would build a new
+        # SSL context on the event loop and never be closed
+        details_service = DetailsService.get_instance()
+
+        async def fetch(operational_intent: OperationalIntent):
+            reference = operational_intent.reference
+            uss_operational_intents_service = details_service.service(
+                USSOperationalIntentsService, reference)
+            return await uss_operational_intents_service\
+                .get_operational_intent_telemetry(reference.id)
+
+        results = await asyncio.gather(
+            *[fetch(operational_intent) for operational_intent in off_nominal],
+            return_exceptions=True,
+        )
+
+        self._telemetry = {}
+        for operational_intent, result in zip(off_nominal, results):
+            if isinstance(result, BaseException):
+                print(
+                    f"Error fetching operational intent telemetry: \
+                    {operational_intent.reference.id}")
+                print(result)
+                continue
+            if result.telemetry and result.telemetry.position:
+                self._telemetry[operational_intent.reference.id] = \
+                    result.telemetry
+
+    def check(self, flights: List[Flight]) -> List[FlightConformance]:
+        """
+        Evaluates the conformance of the given flights and of the
+        off-nominal operational intent telemetry.
+        """
+        if self._index is None:
+            self._build_index()
+
+        results = self._check_flights(flights) + self._check_telemetry()
+
+        self._last_report = ConformanceReport(
+            timestamp=Time(
+                value=datetime.now(timezone.utc),
+                format=TimeFormat.RFC3339,
+            ),
+            flights=results,
+        )
+
+        return results
+
+    def _provider(self, key: str | None) -> int:
+        if not key:
+            return -1
+        return self._providers.setdefault(key, len(self._providers))
+
+    def _build_index(self) -> None:
+        # Rebuilt with the index, providers that left are forgotten
+        self._providers = {}
+
+        volumes: List[Volume4D] = []
+        volume_intent: List[int] = []
+        managers: List[int] = []
+        hosts: List[int] = []
+
+        self._intent_ids = list(self._operational_intents.keys())
+
+        for row, entity_id in enumerate(self._intent_ids):
+            operational_intent = self._operational_intents[entity_id]
+            reference = operational_intent.reference
+            details = operational_intent.details
+
+            managers.append(self._provider(reference.manager))
+            hosts.append(self._provider(_host(reference.uss_base_url)))
+
+            intent_volumes = list(details.volumes)
+            if reference.state in OFF_NOMINAL_STATES:
+                intent_volumes += details.off_nominal_volumes or []
+
+            volumes += intent_volumes
+            volume_intent += [row] * len(intent_volumes)
+
+        self._index = VolumeIndex(volumes)
+        self._volume_intent = np.array(volume_intent, dtype=np.int64)
+        self._intent_manager = np.array(managers, dtype=np.int64)
+        self._intent_host = np.array(hosts, dtype=np.int64)
+
+    def _flight_arrays(
+        self, flights: List[Flight]
+    ) -> Tuple[np.ndarray, ...]:
+        count = len(flights)
+        lat = np.empty(count)
+        lng = np.empty(count)
+        alt = np.empty(count)
+        t = np.empty(count)
+        owner = np.empty(count, dtype=np.int64)
+        host = np.empty(count, dtype=np.int64)
+
+        now = time.time()
+        for i, flight in enumerate(flights):
+            state = flight.current_state
+            position = state.position
+            lat[i] = position.lat
+            lng[i] = position.lng
+            alt[i] = np.nan if position.alt is None else position.alt
+            t[i] = to_timestamp(state.timestamp.value, now)
+
+            service_area = flight.identification_service_area
+            owner[i] = self._providers.get(service_area.owner, -1)
+            host[i] = self._providers.get(
+                _host(service_area.uss_base_url), -1)
+
+        return lat, lng, alt, t, owner, host
+
+    def _check_flights(self, flights: List[Flight]) -> List[FlightConformance]:
+        flights = [flight for flight in flights if flight.current_state]
+        if not flights or self._index.size == 0:
+            return []
+
+        lat, lng, alt, t, owner, host = self._flight_arrays(flights)
+
+        # Flights whose provider has an operational intent active right now
+        now = time.time()
+        intent = self._volume_intent
+        active = intent[
+            (self._index.time_start <= now) & (self._index.time_end >= now)
+        ]
+        monitored = np.isin(owner, self._intent_manager[active]) \
+            & (owner >= 0)
+        monitored |= np.isin(host, self._intent_host[active]) & (host >= 0)
+
+        point, volume = self._index.contains(lat, lng, alt, t)
+        row = intent[volume]
+        match = ((owner[point] == self._intent_manager[row]) & (owner[point] >= 0)) \
+            | ((host[point] == self._intent_host[row]) & (host[point] >= 0))
+        point = point[match]
+        row = row[match]
+
+        matched = np.full(len(flights), -1, dtype=np.int64)
+        matched[point] = row
+
+        results: List[FlightConformance] = []
+        for i in np.nonzero(monitored)[0]:
+            if matched[i] >= 0:
+                results.append(FlightConformance(
+                    flight_id=flights[i].id,
+                    status=ConformanceStatus.CONFORMING,
+                    operational_intent_id=self._intent_ids[matched[i]],
+                ))
+            else:
+                results.append(FlightConformance(
+                    flight_id=flights[i].id,
+                    status=ConformanceStatus.NONCONFORMING,
+                ))
+
+        return results
+
+    def _check_telemetry(self) -> List[FlightConformance]:
+        rows = {
+            entity_id: row for row, entity_id in enumerate(self._intent_ids)
+        }
+        telemetry = [
+            (entity_id, item) for entity_id, item in self._telemetry.items()
+            if entity_id in rows
+            and item.position.latitude is not None
+            and item.position.longitude is not None
+        ]
+        if not telemetry:
+            return []
+
+        lat = np.array([item.position.latitude for _, item in telemetry])
+        lng = np.array([item.position.longitude for _, item in telemetry])
+        alt = np.array([
+            item.position.altitude.value
+            if item.position.altitude else np.nan
+            for _, item in telemetry
+        ])
+        t = np.array([
+            to_timestamp(item.time_measured.value, time.time())
+            for _, item in telemetry
+        ])
+        expected = np.array([rows[entity_id] for entity_id, _ in telemetry])
+
+        point, volume = self._index.contains(lat, lng, alt, t)
+        inside = np.zeros(len(telemetry), dtype=bool)
+        inside[point[self._volume_intent[volume] == expected[point]]] = True
+
+        return [
+            FlightConformance(
+                status=ConformanceStatus.CONFORMING
+                if inside[i] else ConformanceStatus.NONCONFORMING,
+                operational_intent_id=entity_id,
+            )
+            for i, (entity_id, _) in enumerate(telemetry)
+        ]
@@ -0,0 +1,237 @@
+import asyncio
+import time
+from typing import Dict, List, Tuple
+from threading import Lock
+from pydantic import HttpUrl
+
+from config.config import get_settings
+from schemas.common.enums import VolumeKind
+from schemas.dss.common import ConstraintReference, OperationalIntentReference
+from schemas.dss.remoteid import (
+    IdentificationServiceArea,
+    IdentificationServiceAreaDetails,
+    IdentificationServiceAreaFull,
+)
+from schemas.uss.common import OperationalIntent
+from schemas.uss.constraints import Constraint
+from schemas.uss.remoteid import RIDFlightDetails
+from services.cache import LRUCache
+from services.uss.constraints import USSConstraintsService
+from services.uss.operational_intents import USSOperationalIntentsService
+from services.uss.remoteid import USSRemoteIDService
+
+# Kind of the flight references, alongside the VolumeKind values
+FLIGHT = "flight"
+
+
+class DetailsService:
+    """
+    Fetches the details of single DSS references from their managing USS.
+
+    Requests in flight are bounded by VOLUME_DETAILS_CONCURRENCY across
+    every caller, so a large area cannot open a connection per reference.
+    The USS services are kept per base URL, their clients reuse the
+    connections instead of building a new SSL context per request.
+    References without a USS base URL or an ID raise ValueError.
+
+    Details are cached per entity and version. Flights have no version,
+    their details are reused for FLIGHT_DETAILS_TTL seconds. Concurrent
+    requests for the same details share a single USS request.
+    The references seen by the last queries are remembered by id, so the
+    details of an entity can be requested later with its id alone.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        settings = get_settings()
+
+        self._semaphore = asyncio.Semaphore(
+            settings.VOLUME_DETAILS_CONCURRENCY)
+        self._flight_ttl = settings.FLIGHT_DETAILS_TTL
+        self._pending: Dict[Tuple, asyncio.Task] = {}
+        self._services: Dict[Tuple[type, str], object] = {}
+        self._references = LRUCache(
+            "details.references", settings.DETAILS_REFERENCES_SIZE)
+        self._details = LRUCache(
+            "details.entities", settings.DETAILS_CACHE_SIZE)
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def service(self, service_class: type, reference):
+        """
+        USS service of the given class for the base URL of a reference,
+        shared by every caller.
+        """
+        if not reference.uss_base_url:
+            raise ValueError(f"Reference {reference.id} has no USS base URL.")
+        if not reference.id:
+            raise ValueError("Reference has no ID.")
+
+        key = (service_class, reference.uss_base_url)
+        service = self._services.get(key)
+        if service is None:
+            service = service_class(base_url=HttpUrl(reference.uss_base_url))
+            self._services[key] = service
+        return service
+
+    def remember(self, kind: str, references: List) -> None:
+        """
+        Keeps the references by id for the later detail requests.
+        """
+        for reference in references:
+            if reference.id:
+                self._references.put((kind, str(reference.id)), reference)
+
+    def remember_flight(
+        self, flight_id: str, service_area: IdentificationServiceArea
+    ) -> None:
+        self._references.put((FLIGHT, flight_id), service_area)
+
+    async def _cached(self, key: Tuple, fetch, ttl: float | None = None):
+        cached = self._details.get(key) if key[-1] else None
+        if cached is not None:
+            details, fetched_at = cached
+            if ttl is None or time.monotonic() - fetched_at < ttl:
+                return details
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, fetch))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+
+        # A caller going away does not cancel the request of the others
+        return await asyncio.shield(task)
+
+    def _done(self, key: Tuple, task: asyncio.Task) -> None:
+        self._pending.pop(key, None)
+        # Errors reach the callers, retrieved here when all of them left
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, key: Tuple, fetch):
+        async with self._semaphore:
+            details = await fetch()
+        if key[-1]:
+            self._details.put(key, (details, time.monotonic()))
+        return details
+
+    async def operational_intent(
+        self, reference: OperationalIntentReference
+    ) -> OperationalIntent:
+        service = self.service(USSOperationalIntentsService, reference)
+        self.remember(VolumeKind.OPERATIONAL_INTENT.value, [reference])
+
+        async def fetch():
+            response = await service.get_operational_intent_details(
+                reference.id)
+            return response.operational_intent
+
+        return await self._cached((
+            VolumeKind.OPERATIONAL_INTENT.value,
+            str(reference.id),
+            reference.ovn or reference.version,
+        ), fetch)
+
+    async def constraint(
+        self, reference: ConstraintReference
+    ) -> Constraint:
+        service = self.service(USSConstraintsService, reference)
+        self.remember(VolumeKind.CONSTRAINT.value, [reference])
+
+        async def fetch():
+            response = await service.get_constraint_details(reference.id)
+            return response.constraint
+
+        return await self._cached((
+            VolumeKind.CONSTRAINT.value,
+            str(reference.id),
+            reference.ovn or reference.version,
+        ), fetch)
+
+    async def identification_service_area(
+        self, service_area: IdentificationServiceArea
+    ) -> IdentificationServiceAreaFull:
+        service = self.service(USSRemoteIDService, service_area)
+        self.remember(
+            VolumeKind.IDENTIFICATION_SERVICE_AREA.value, [service_area])
+
+        async def fetch():
+            response = await service.get_identification_service_area_details(
+                service_area.id)
+            return IdentificationServiceAreaFull(
+                reference=service_area,
+                details=IdentificationServiceAreaDetails(
+                    volumes=[response.extents]
+                ),
+            )
+
+        return await self._cached((
+            VolumeKind.IDENTIFICATION_SERVICE_AREA.value,
+            str(service_area.id),
+            service_area.version,
+        ), fetch)
+
+    async def flight(
+        self, flight_id: str, service_area: IdentificationServiceArea
+    ) -> RIDFlightDetails:
+        service = self.service(USSRemoteIDService, service_area)
+        self.remember_flight(flight_id, service_area)
+
+        async def fetch():
+            response = await service.get_flight_details(flight_id)
+            return response.details
+
+        # Flights have no version, their details expire instead
+        return await self._cached(
+            (FLIGHT, flight_id, True), fetch, ttl=self._flight_ttl)
+
+    async def batch(self, kind: str, ids: List[str]) -> Tuple[List, List[str]]:
+        """
+        Details of the remembered references of a kind, fetched
+        concurrently. Returns the details found and an error per id that
+        is unknown or failed.
+        """
+        fetchers = {
+            VolumeKind.OPERATIONAL_INTENT.value: self.operational_intent,
+            VolumeKind.CONSTRAINT.value: self.constraint,
+            VolumeKind.IDENTIFICATION_SERVICE_AREA.value:
+                self.identification_service_area,
+        }
+
+        def fetch(entity_id: str, reference):
+            if kind == FLIGHT:
+                return self.flight(entity_id, reference)
+            return fetchers[kind](reference)
+
+        errors: List[str] = []
+        requests = []
+        for entity_id in dict.fromkeys(str(entity_id) for entity_id in ids):
+            reference = self._references.get((kind, entity_id))
+            if reference is None:
+                errors.append(f"{kind} {entity_id}: unknown reference")
+                continue
+            requests.append((entity_id, reference))
+
+        results = await asyncio.gather(
+            *[fetch(entity_id, reference) for entity_id, reference in requests],
+            return_exceptions=True,
+        )
+
+        details = []
+        for (entity_id, _), result in zip(requests, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching {kind} details: {entity_id}")
+                print(result)
+                errors.append(f"{kind} {entity_id}: {result}")
+                continue
+            details.append(result)
+
+        return details, errors
@@ -8,7 +8,7 @@ from schemas.dss.constraints import (
 )
 from schemas.common.enums import Audition, Authority
 from services.client import AuthAsyncClient
-from config.config import Settings
+from config.config import get_settings
 
 
 RESOURCE_PATH = "/dss/v1/constraint_references"
@@ -16,7 +16,7 @@ RESOURCE_PATH = "/dss/v1/constraint_references"
 
 class DSSConstraintsService:
     def __init__(self):
-        settings = Settings()
+        settings = get_settings()
         self.client = AuthAsyncClient(
             base_url=settings.BRUTM_BASE_URL, aud=Audition.DSS.value)
 
@@ -8,8 +8,7 @@ from schemas.dss.operational_intents import (
 )
 from schemas.common.enums import Audition, Authority
 from services.client import AuthAsyncClient
-from config.config import Settings
-from pprint import pprint
+from config.config import get_settings
 
 
 RESOURCE_PATH = "/dss/v1/operational_intent_references"
@@ -17,7 +16,7 @@ RESOURCE_PATH = "/dss/v1/operational_intent_references"
 
 class DSSOperationalIntentsService:
     def __init__(self):
-        settings = Settings()
+        settings = get_settings()
         self.client = AuthAsyncClient(
             base_url=settings.BRUTM_BASE_URL, aud=Audition.DSS.value)
 
@@ -37,8 +36,6 @@ class DSSOperationalIntentsService:
                 {response.text}"
             )
 
-        pprint(response.json())
-
         return QueryOperationalIntentReferenceResponse\
             .model_validate(response.json())
 
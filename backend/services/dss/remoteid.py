@@ -1,5 +1,5 @@
 from uuid import UUID
-from config.config import Settings
+from config.config import get_settings
 from services.client import AuthAsyncClient
 from schemas.common.enums import Audition, RIDAuthority
 from schemas.dss.remoteid import (
@@ -24,7 +24,7 @@ SUBSCRIPTIONS_PATH = "/rid/v2/dss/subscriptions"
 
 class DSSRemoteIDService:
     def __init__(self):
-        settings = Settings()
+        settings = get_settings()
         self.client = AuthAsyncClient(
             base_url=settings.BRUTM_BASE_URL, aud=Audition.DSS.value
         )
@@ -0,0 +1,129 @@
+from typing import List, TypeVar
+from datetime import datetime
+
+from schemas.common.base import Time
+from schemas.common.enums import VolumeKind
+from schemas.common.geo import Volume4D
+from schemas.dss.common import ConstraintReference, OperationalIntentReference
+from schemas.dss.remoteid import IdentificationServiceArea
+from schemas.fetch import VolumeFilters
+from services.metrics import MetricsRegistry
+
+T = TypeVar("T")
+
+
+def wants(filters: VolumeFilters, kind: VolumeKind) -> bool:
+    """
+    Whether the volumes of this kind were requested at all.
+    """
+    return not filters.kinds or kind in filters.kinds
+
+
+def _active(
+    filters: VolumeFilters,
+    time_start: Time | None,
+    time_end: Time | None,
+) -> bool:
+    """
+    Whether [time_start, time_end] overlaps the requested active window.
+    Unknown bounds are treated as open.
+    """
+    start = time_start.value if time_start else None
+    end = time_end.value if time_end else None
+
+    if filters.active_until and start and _after(start, filters.active_until):
+        return False
+    if filters.active_from and end and _after(filters.active_from, end):
+        return False
+    return True
+
+
+def _after(first: datetime, second: datetime) -> bool:
+    # The DSS answers with aware datetimes, query parameters may be naive
+    if (first.tzinfo is None) != (second.tzinfo is None):
+        return first.replace(tzinfo=None) > second.replace(tzinfo=None)
+    return first > second
+
+
+def _count_skipped(kind: VolumeKind, total: int, kept: int) -> None:
+    if total > kept:
+        MetricsRegistry.get_instance().increment(
+            "observer_filtered_references_total", total - kept, kind=kind.value)
+
+
+def filter_operational_intent_references(
+    references: List[OperationalIntentReference],
+    filters: VolumeFilters,
+) -> List[OperationalIntentReference]:
+    kept = [
+        reference for reference in references
+        if (not filters.managers or reference.manager in filters.managers)
+        and (not filters.states or reference.state in filters.states)
+        and (
+            not filters.flight_types
+            or reference.flight_type in filters.flight_types
+        )
+        and _active(filters, reference.time_start, reference.time_end)
+    ]
+    _count_skipped(VolumeKind.OPERATIONAL_INTENT, len(references), len(kept))
+    return kept
+
+
+def filter_constraint_references(
+    references: List[ConstraintReference],
+    filters: VolumeFilters,
+) -> List[ConstraintReference]:
+    kept = [
+        reference for reference in references
+        if (not filters.managers or reference.manager in filters.managers)
+        and _active(filters, reference.time_start, reference.time_end)
+    ]
+    _count_skipped(VolumeKind.CONSTRAINT, len(references), len(kept))
+    return kept
+
+
+def filter_service_areas(
+    service_areas: List[IdentificationServiceArea],
+    filters: VolumeFilters,
+) -> List[IdentificationServiceArea]:
+    kept = [
+        service_area for service_area in service_areas
+        if (not filters.managers or service_area.owner in filters.managers)
+        and _active(filters, service_area.time_start, service_area.time_end)
+    ]
+    _count_skipped(
+        VolumeKind.IDENTIFICATION_SERVICE_AREA, len(service_areas), len(kept))
+    return kept
+
+
+def in_altitude_band(volumes: List[Volume4D], filters: VolumeFilters) -> bool:
+    """
+    Whether any of the volumes overlaps the requested altitude band.
+    """
+    if filters.altitude_lower is None and filters.altitude_upper is None:
+        return True
+
+    for volume in volumes:
+        lower = volume.volume.altitude_lower.value
+        upper = volume.volume.altitude_upper.value
+        if filters.altitude_upper is not None \
+                and lower > filters.altitude_upper:
+            continue
+        if filters.altitude_lower is not None \
+                and upper < filters.altitude_lower:
+            continue
+        return True
+
+    return False
+
+
+def filter_by_altitude(entities: List[T], filters: VolumeFilters) -> List[T]:
+    """
+    Keeps the operational intents, constraints or service areas with a
+    volume in the requested altitude band.
+    """
+    return [
+        entity for entity in entities
+        if in_altitude_band(entity.details.volumes, filters)
+    ]
+
@@ -1,12 +1,15 @@
-from typing import List
+from typing import Dict, List, Tuple
 from datetime import time
 from uuid import UUID
 from schemas.common.base import Time
 from schemas.common.enums import Audition, Authority, TimeFormat
-from config.config import Settings
+from config.config import get_settings
 from httpx import AsyncClient
 from schemas.dss.remoteid import SearchIdentificationServiceAreasResponse
+from services.details import DetailsService
 from services.dss.remoteid import DSSRemoteIDService
+from services.metrics import MetricsRegistry
+from services.transport import upstream_transport
 from services.uss.remoteid import USSRemoteIDService
 from datetime import datetime, timedelta, timezone
 from pprint import pprint
@@ -20,9 +23,101 @@ from schemas.flights import (
 RESOURCES_PATH = "/dasa-dp/api/telemetry"
 
 
+def _timestamp(flight: Flight) -> datetime | None:
+    return flight.current_state.timestamp.value \
+        if flight.current_state else None
+
+
+def _fresher(flight: Flight, other: Flight) -> bool:
+    timestamp, other_timestamp = _timestamp(flight), _timestamp(other)
+    if timestamp is None:
+        return False
+    return other_timestamp is None or timestamp > other_timestamp
+
+
+def resolve_flights(
+    flights: List[Flight]
+) -> Tuple[List[Flight], Dict[str, str]]:
+    """
+    Merges the reports of the same aircraft, sent through overlapping ISAs
+    of a USS or by several providers. Reports are of the same aircraft when
+    they share the flight id or the registration id of the UAS. The
+    freshest report is kept, with the providers of every report in its
+    sources.
+
+    Single pass over an index of the identity keys, reports bridging two
+    aircraft already seen join them. Returns the merged flights in the
+    order they were first reported and the id kept for every reported id.
+    """
+    index: Dict[Tuple[str, str], int] = {}
+    parent: List[int] = []
+    kept: List[Flight] = []
+    sources: List[Dict[str, None]] = []
+
+    def find(group: int) -> int:
+        while parent[group] != group:
+            parent[group] = parent[parent[group]]
+            group = parent[group]
+        return group
+
+    def merge(group: int, flight: Flight) -> None:
+        current = kept[group]
+        fresher = flight if _fresher(flight, current) else current
+        other = current if fresher is flight else flight
+        if fresher.details is None:
+            fresher.details = other.details
+        kept[group] = fresher
+
+    groups = []
+    for flight in flights:
+        keys = [("id", flight.id)]
+        registration_id = flight.details.uas_id.registration_id \
+            if flight.details and flight.details.uas_id else None
+        if registration_id:
+            keys.append(("registration_id", registration_id))
+
+        matched = sorted({find(index[key]) for key in keys if key in index})
+        if matched:
+            group = matched[0]
+            merge(group, flight)
+            for other in matched[1:]:
+                parent[other] = group
+                merge(group, kept[other])
+                sources[group].update(sources[other])
+        else:
+            group = len(kept)
+            parent.append(group)
+            kept.append(flight)
+            sources.append({})
+
+        # Reports merged by a previous resolution keep their sources
+        sources[group].update(dict.fromkeys(flight.sources))
+        sources[group][flight.identification_service_area.owner] = None
+        for key in keys:
+            index[key] = group
+        groups.append(group)
+
+    merged: Dict[int, Flight] = {}
+    for group in range(len(kept)):
+        if find(group) == group:
+            kept[group].sources = list(sources[group])
+            merged[group] = kept[group]
+
+    duplicates = len(flights) - len(merged)
+    if duplicates:
+        MetricsRegistry.get_instance().increment(
+            "observer_duplicate_flights_total", duplicates)
+
+    aliases = {
+        flight.id: merged[find(group)].id
+        for flight, group in zip(flights, groups)
+    }
+    return list(merged.values()), aliases
+
+
 class FlightsService:
     def __init__(self):
-        settings = Settings()
+        settings = get_settings()
 
         base_url = settings.BRUTM_BASE_URL
 
@@ -32,13 +127,19 @@ class FlightsService:
 
         self.client = AsyncClient(
             base_url=base_url,
+            transport=upstream_transport(),
         )
 
     async def query_flights(
-        self, params: QueryFlightsRequest
+        self, params: QueryFlightsRequest, details: bool = True
     ) -> QueryFlightsResponse:
+        """
+        Live flights of the ISAs intersecting the area. Without `details`
+        the flight details are not requested, they can be fetched on demand
+        through the DetailsService which remembers every flight.
+        """
 
-        settings = Settings()
+        settings = get_settings()
         apikey = settings.BRUTM_KEY
 
         if not apikey:
@@ -86,6 +187,7 @@ class FlightsService:
         # Get Flights by ISA
         flights: List[Flight] = []
         errors = []
+        details_service = DetailsService.get_instance()
 
         for isa in isas.service_areas:
             print("Trying to query flights for ISA: ", isa.uss_base_url)
@@ -98,16 +200,20 @@ class FlightsService:
                 flight_response = await ussClient.search_flights(
                     view=query_params["lat1"] + "," + query_params["lng1"] + "," +
                     query_params["lat3"] + "," + query_params["lng3"],
-                    recent_positions_duration=0
+                    recent_positions_duration=settings.RECENT_POSITIONS_DURATION
                 )
 
                 if not flight_response.flights:
                     continue
 
                 for flight in flight_response.flights:
-                    details_response = None
+                    details_service.remember_flight(flight.id, isa)
+
+                    flight_details = None
                     try:
-                        details_response = await ussClient.get_flight_details(flight.id)
+                        if details:
+                            flight_details = await details_service.flight(
+                                flight.id, isa)
                     except Exception:
                         print("Error fetching isa details in url:", 
                               isa.uss_base_url, "for flight:", flight.id)
@@ -120,7 +226,7 @@ class FlightsService:
                         simulated=flight.simulated,
                         recent_positions=flight.recent_positions,
                         identification_service_area=isa,
-                        details=details_response.details if details_response else None,
+                        details=flight_details,
                     )
 
                     flights.append(flight_obj)
@@ -133,6 +239,8 @@ class FlightsService:
                     "service_area": isa.uss_base_url
                 })
 
+        flights, _ = resolve_flights(flights)
+
         return QueryFlightsResponse(
             flights=flights,
             partial=False,
@@ -0,0 +1,406 @@
+from typing import Dict, List, Tuple
+from datetime import datetime
+from threading import Lock
+import numpy as np
+
+from config.config import get_settings
+from schemas.common.base import Time
+from schemas.common.geo import LatLngPoint, Polygon, Volume3D, Volume4D
+from schemas.uss.common import OperationalIntent
+from services.cache import LRUCache
+from services.simplification import (
+    simplified_indices,
+    simplify_volume,
+    zoom_level,
+)
+from services.spatial import (
+    from_local_xy,
+    to_local_xy,
+    to_timestamp,
+    VolumeIndex,
+)
+
+# Cells along the longest side of the raster of an operational intent
+GRID_CELLS = 256
+
+# Smallest cell in meters, finer outlines are not worth sending
+MIN_CELL_M = 1.0
+
+# Simplification tolerance of the traced outlines in cells, removes the
+# staircase left by the raster
+OUTLINE_TOLERANCE_CELLS = 1.5
+
+Vertex = Tuple[int, int]
+
+
+def _groups(masks: np.ndarray) -> List[List[int]]:
+    """
+    Connected components of the segments whose rasters overlap.
+    """
+    cells = masks.astype(np.float32)
+    overlaps = (cells @ cells.T) > 0
+
+    groups = []
+    seen = np.zeros(len(masks), dtype=bool)
+    for first in range(len(masks)):
+        if seen[first]:
+            continue
+        seen[first] = True
+        group, pending = [], [first]
+        while pending:
+            segment = pending.pop()
+            group.append(segment)
+            neighbours = np.flatnonzero(overlaps[segment] & ~seen)
+            seen[neighbours] = True
+            pending.extend(neighbours.tolist())
+        groups.append(sorted(group))
+
+    return groups
+
+
+def _boundary_edges(mask: np.ndarray) -> Dict[Vertex, List[Vertex]]:
+    """
+    Directed cell edges between filled and empty cells, with the filled
+    cell on the left. Vertex (j, i) is the lower left corner of cell (i, j).
+    """
+    padded = np.pad(mask, 1)
+    filled = padded[1:-1, 1:-1]
+    rows, cols = np.nonzero(filled & ~padded[:-2, 1:-1])
+    bottom = [((j, i), (j + 1, i)) for i, j in zip(rows, cols)]
+    rows, cols = np.nonzero(filled & ~padded[2:, 1:-1])
+    top = [((j + 1, i + 1), (j, i + 1)) for i, j in zip(rows, cols)]
+    rows, cols = np.nonzero(filled & ~padded[1:-1, 2:])
+    right = [((j + 1, i), (j + 1, i + 1)) for i, j in zip(rows, cols)]
+    rows, cols = np.nonzero(filled & ~padded[1:-1, :-2])
+    left = [((j, i + 1), (j, i)) for i, j in zip(rows, cols)]
+
+    edges: Dict[Vertex, List[Vertex]] = {}
+    for start, end in bottom + top + right + left:
+        edges.setdefault((int(start[0]), int(start[1])), []).append(
+            (int(end[0]), int(end[1])))
+    return edges
+
+
+def trace_outlines(mask: np.ndarray) -> List[np.ndarray]:
+    """
+    Outer rings of the filled regions of a boolean raster, as (column, row)
+    corner coordinates. Holes are filled, since a Polygon has no interior
+    rings, and regions touching at a corner get separate rings.
+    """
+    edges = _boundary_edges(mask)
+    rings = []
+
+    while edges:
+        start = next(iter(edges))
+        ring = [start]
+        current = edges[start].pop()
+        direction = (current[0] - start[0], current[1] - start[1])
+        if not edges[start]:
+            del edges[start]
+
+        while current != start:
+            ring.append(current)
+            candidates = edges[current]
+
+            # At a corner shared by two regions keep following the same
+            # region, which is the leftmost turn
+            def turn(end: Vertex) -> int:
+                dx, dy = end[0] - current[0], end[1] - current[1]
+                return direction[0] * dy - direction[1] * dx
+
+            following = max(candidates, key=turn)
+            candidates.remove(following)
+            if not candidates:
+                del edges[current]
+
+            direction = (following[0] - current[0], following[1] - current[1])
+            current = following
+
+        ring = np.array(ring, dtype=float)
+        x, y = ring[:, 0], ring[:, 1]
+        area = np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y) / 2
+
+        # Counterclockwise rings are outer boundaries, the others are holes
+        if area > 0:
+            rings.append(ring)
+
+    return rings
+
+
+def _rasterize(
+    volume4d: Volume4D,
+    mask: np.ndarray,
+    cell: float,
+    x0: float,
+    y0: float,
+    lat0: float,
+    lng0: float,
+) -> None:
+    """
+    Fills the cells of `mask` whose center is inside the outline. Only the
+    rows of the outline bounding box are scanned, polygon rows are filled
+    between their even-odd edge crossings.
+    """
+    volume = volume4d.volume
+    rows, columns = mask.shape
+
+    polygon = volume.outline_polygon
+    circle = volume.outline_circle
+    if polygon is not None:
+        x, y = to_local_xy(
+            np.array([vertex.lat for vertex in polygon.vertices]),
+            np.array([vertex.lng for vertex in polygon.vertices]),
+            lat0, lng0,
+        )
+        y_min, y_max = y.min(), y.max()
+    elif circle is not None and circle.center is not None \
+            and circle.radius is not None:
+        center_x, center_y = to_local_xy(
+            circle.center.lat, circle.center.lng, lat0, lng0)
+        radius = circle.radius.value
+        y_min, y_max = center_y - radius, center_y + radius
+    else:
+        return
+
+    first = max(int(np.floor((y_min - y0) / cell)), 0)
+    last = min(int(np.ceil((y_max - y0) / cell)), rows)
+    if last <= first:
+        return
+
+    centers_y = y0 + (np.arange(first, last) + 0.5) * cell
+
+    if polygon is None:
+        centers_x = x0 + (np.arange(columns) + 0.5) * cell
+        mask[first:last] |= (centers_x[None, :] - center_x) ** 2 \
+            + (centers_y[:, None] - center_y) ** 2 <= radius ** 2
+        return
+
+    x1, y1 = x, y
+    x2, y2 = np.roll(x, -1), np.roll(y, -1)
+    row, edge = np.nonzero(
+        (y1 > centers_y[:, None]) != (y2 > centers_y[:, None]))
+    crossing = x1[edge] + (centers_y[row] - y1[edge]) \
+        * (x2[edge] - x1[edge]) / (y2[edge] - y1[edge])
+
+    # Every crossing toggles the cells of its row whose center is past it
+    column = np.clip(
+        np.floor((crossing - x0) / cell - 0.5).astype(np.int64) + 1,
+        0, columns,
+    )
+    toggles = np.bincount(
+        row * (columns + 1) + column,
+        minlength=(last - first) * (columns + 1),
+    ).reshape(last - first, columns + 1)
+    mask[first:last] |= np.cumsum(toggles[:, :columns], axis=1) % 2 == 1
+
+
+def _merge_group(
+    volumes: List[Volume4D],
+    mask: np.ndarray,
+    cell: float,
+    x0: float,
+    y0: float,
+    lat0: float,
+    lng0: float,
+) -> List[Volume4D]:
+    lower = min(volumes, key=lambda volume: volume.volume.altitude_lower.value)
+    upper = max(volumes, key=lambda volume: volume.volume.altitude_upper.value)
+    time_start = min(
+        volumes,
+        key=lambda volume: to_timestamp(volume.time_start.value, -np.inf),
+    )
+    time_end = max(
+        volumes,
+        key=lambda volume: to_timestamp(volume.time_end.value, np.inf),
+    )
+
+    footprints = []
+    for ring in trace_outlines(mask):
+        # Simplified in meters, only the kept corners become vertices
+        x = x0 + ring[:, 0] * cell
+        y = y0 + ring[:, 1] * cell
+        kept = simplified_indices(x, y, cell * OUTLINE_TOLERANCE_CELLS)
+        if kept is not None:
+            x, y = x[kept], y[kept]
+
+        lat, lng = from_local_xy(x, y, lat0, lng0)
+        outline = Polygon(vertices=[
+            LatLngPoint(lat=float(vertex_lat), lng=float(vertex_lng))
+            for vertex_lat, vertex_lng in zip(lat, lng)
+        ])
+
+        footprints.append(Volume4D(
+            volume=Volume3D(
+                outline_polygon=outline,
+                altitude_lower=lower.volume.altitude_lower,
+                altitude_upper=upper.volume.altitude_upper,
+            ),
+            time_start=time_start.time_start,
+            time_end=time_end.time_end,
+        ))
+
+    return footprints
+
+
+def merge_volumes(volumes: List[Volume4D]) -> List[Volume4D]:
+    """
+    Unions the overlapping volumes into footprint polygons, bounded by the
+    lowest floor, highest ceiling and the time span of the merged volumes.
+
+    The outlines are rasterized on a grid of at most GRID_CELLS cells per
+    side, so the footprints are exact up to a cell. Volumes overlapping no
+    other volume are returned unchanged.
+    """
+    if len(volumes) < 2:
+        return volumes
+
+    index = VolumeIndex(volumes)
+    valid = np.isfinite(index.min_lat)
+    if not valid.any():
+        return volumes
+
+    lat0 = float((index.min_lat[valid].min() + index.max_lat[valid].max()) / 2)
+    lng0 = float((index.min_lng[valid].min() + index.max_lng[valid].max()) / 2)
+    x_min, y_min = to_local_xy(
+        index.min_lat[valid].min(), index.min_lng[valid].min(), lat0, lng0)
+    x_max, y_max = to_local_xy(
+        index.max_lat[valid].max(), index.max_lng[valid].max(), lat0, lng0)
+
+    cell = max(float(max(x_max - x_min, y_max - y_min)) / GRID_CELLS,
+               MIN_CELL_M)
+    x0, y0 = float(x_min) - cell, float(y_min) - cell
+    columns = int(np.ceil((x_max - x_min) / cell)) + 2
+    rows = int(np.ceil((y_max - y_min) / cell)) + 2
+
+    masks = np.zeros((len(volumes), rows, columns), dtype=bool)
+    for volume, mask in zip(volumes, masks):
+        _rasterize(volume, mask, cell, x0, y0, lat0, lng0)
+    masks = masks.reshape(len(volumes), rows * columns)
+
+    merged: List[Volume4D] = []
+    for group in _groups(masks):
+        if len(group) == 1:
+            merged.append(volumes[group[0]])
+            continue
+
+        merged.extend(_merge_group(
+            [volumes[segment] for segment in group],
+            masks[group].any(axis=0).reshape(rows, columns),
+            cell, x0, y0, lat0, lng0,
+        ))
+
+    return merged
+
+
+def in_window(
+    volumes: List[Volume4D],
+    time_start: datetime | None,
+    time_end: datetime | None,
+) -> List[int]:
+    """
+    Indices of the volumes active at some point of the window.
+    """
+    start = to_timestamp(time_start, -np.inf)
+    end = to_timestamp(time_end, np.inf)
+
+    return [
+        i for i, volume in enumerate(volumes)
+        if to_timestamp(
+            volume.time_start.value if volume.time_start else None, -np.inf
+        ) <= end
+        and to_timestamp(
+            volume.time_end.value if volume.time_end else None, np.inf
+        ) >= start
+    ]
+
+
+class FootprintService:
+    """
+    Aggregated footprints of long operational intents.
+
+    The consecutive segments of an intent that are active in the requested
+    window and overlap each other are merged into a few extruded polygons.
+    Footprints are cached per intent, OVN and set of segments in the window,
+    which only changes when a segment starts or ends.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        self._footprints = LRUCache(
+            "footprints.operational_intents",
+            get_settings().FOOTPRINT_CACHE_SIZE,
+        )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _merge(
+        self,
+        operational_intent: OperationalIntent,
+        field: str,
+        time_start: datetime | None,
+        time_end: datetime | None,
+        zoom: float | None,
+        tolerance: float | None,
+    ) -> List[Volume4D] | None:
+        volumes = getattr(operational_intent.details, field)
+        if not volumes:
+            return volumes
+
+        segments = in_window(volumes, time_start, time_end)
+        reference = operational_intent.reference
+        version = reference.ovn or reference.version
+        # Zooms within a level share the tolerance and the cached footprints
+        if tolerance is None and zoom is not None:
+            zoom = zoom_level(zoom)
+        key = (str(reference.id), version, field, tuple(segments),
+               zoom, tolerance)
+
+        footprints = self._footprints.get(key) if version else None
+        if footprints is None:
+            footprints = merge_volumes([volumes[i] for i in segments])
+            if zoom is not None or tolerance is not None:
+                footprints = [
+                    simplify_volume(footprint, zoom, tolerance)
+                    for footprint in footprints
+                ]
+            if version:
+                self._footprints.put(key, footprints)
+
+        return footprints
+
+    def aggregate(
+        self,
+        operational_intents: List[OperationalIntent],
+        time_start: Time | None = None,
+        time_end: Time | None = None,
+        zoom: float | None = None,
+        tolerance: float | None = None,
+    ) -> List[OperationalIntent]:
+        """
+        Returns copies of the operational intents with their nominal and
+        off-nominal volumes in the window merged into footprints, simplified
+        for the zoom level or tolerance when given.
+        """
+        start = time_start.value if time_start else None
+        end = time_end.value if time_end else None
+
+        return [
+            operational_intent.model_copy(update={
+                "details": operational_intent.details.model_copy(update={
+                    "volumes": self._merge(
+                        operational_intent, "volumes",
+                        start, end, zoom, tolerance),
+                    "off_nominal_volumes": self._merge(
+                        operational_intent, "off_nominal_volumes",
+                        start, end, zoom, tolerance),
+                }),
+            })
+            for operational_intent in operational_intents
+        ]
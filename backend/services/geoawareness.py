@@ -3,7 +3,7 @@ from datetime import time
 from uuid import UUID
 from schemas.common.base import Time
 from schemas.common.enums import Audition, Authority, TimeFormat
-from config.config import Settings
+from config.config import get_settings
 from httpx import AsyncClient
 from services.dss.remoteid import DSSRemoteIDService
 from services.uss.remoteid import USSRemoteIDService
@@ -22,7 +22,7 @@ RESOURCES_PATH = "/geoawareness"
 
 class GeoawarenessService:
     def __init__(self):
-        settings = Settings()
+        settings = get_settings()
 
         base_url = settings.BRUTM_BASE_URL
 
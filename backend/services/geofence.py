@@ -0,0 +1,207 @@
+import time
+from typing import Dict, FrozenSet, List, Tuple
+from uuid import UUID
+from threading import Lock
+import numpy as np
+
+from config.config import get_settings
+from services.cache import register_cache
+from schemas.common.enums import AlertType
+from schemas.common.geo import Volume4D
+from schemas.flights import Flight
+from schemas.uss.common import Constraint
+from services.alerts import AlertFeed
+from services.spatial import VolumeIndex, to_timestamp
+
+
+class GeofenceService:
+    """
+    Streaming spatial join between live flight positions and the volumes
+    of the known constraints.
+
+    The service keeps, per flight, the last evaluated position and the set
+    of constraints it is inside of. Each tick only re-evaluates the flights
+    that moved, and the whole fleet only when the constraint index changes
+    or a volume starts or ends. Enter and exit transitions are published to
+    the alert feed.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        settings = get_settings()
+
+        self._constraint_ttl = settings.GEOFENCE_CONSTRAINT_TTL
+        self._flight_ttl = settings.GEOFENCE_FLIGHT_TTL
+
+        self._constraints: Dict[UUID, Constraint] = {}
+        self._last_seen: Dict[UUID, float] = {}
+        self._index: VolumeIndex | None = None
+        self._volume_constraint = np.zeros(0, dtype=np.int64)
+        self._constraint_ids: List[UUID] = []
+        self._next_boundary = np.inf
+
+        self._positions: Dict[str, Tuple[float, float, float]] = {}
+        self._inside: Dict[str, FrozenSet[UUID]] = {}
+        self._flight_seen: Dict[str, float] = {}
+
+        register_cache(
+            "geofence.constraints",
+            lambda: len(self._constraints),
+            lambda: (self._constraints, self._last_seen,
+                     self._index, self._constraint_ids),
+        )
+        register_cache(
+            "geofence.flights",
+            lambda: len(self._flight_seen),
+            lambda: (self._positions, self._inside, self._flight_seen),
+        )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __len__(self) -> int:
+        return len(self._inside)
+
+    def update_constraints(self, constraints: List[Constraint]) -> None:
+        """
+        Upserts the constraints returned by a volumes query. The index is
+        only rebuilt when a constraint was added, changed or expired.
+        """
+        now = time.time()
+        changed = False
+
+        for constraint in constraints:
+            entity_id = constraint.reference.id
+            if entity_id is None:
+                continue
+
+            known = self._constraints.get(entity_id)
+            if known is None or known.reference.ovn != constraint.reference.ovn:
+                self._constraints[entity_id] = constraint
+                changed = True
+            self._last_seen[entity_id] = now
+
+        for entity_id, last_seen in list(self._last_seen.items()):
+            if now - last_seen > self._constraint_ttl:
+                del self._last_seen[entity_id]
+                del self._constraints[entity_id]
+                changed = True
+
+        if changed:
+            self._index = None
+
+    def process(self, flights: List[Flight]) -> None:
+        """
+        Evaluates a tick of live flights and publishes the enter/exit
+        transitions against the constraint volumes.
+        """
+        now = time.time()
+
+        full = self._index is None or now >= self._next_boundary
+        if self._index is None:
+            self._build_index()
+        if full:
+            self._positions = {}
+            self._next_boundary = self._boundary_after(now)
+
+        moved: List[Flight] = []
+        for flight in flights:
+            if not flight.current_state:
+                continue
+
+            self._flight_seen[flight.id] = now
+
+            position = flight.current_state.position
+            key = (position.lat, position.lng, position.alt)
+            if self._positions.get(flight.id) == key:
+                continue
+
+            self._positions[flight.id] = key
+            moved.append(flight)
+
+        if moved:
+            self._evaluate(moved, now)
+
+        for flight_id, seen in list(self._flight_seen.items()):
+            if now - seen > self._flight_ttl:
+                del self._flight_seen[flight_id]
+                self._positions.pop(flight_id, None)
+                self._inside.pop(flight_id, None)
+
+    def _build_index(self) -> None:
+        volumes: List[Volume4D] = []
+        volume_constraint: List[int] = []
+
+        self._constraint_ids = list(self._constraints.keys())
+
+        for row, entity_id in enumerate(self._constraint_ids):
+            constraint_volumes = self._constraints[entity_id].details.volumes
+            volumes += constraint_volumes
+            volume_constraint += [row] * len(constraint_volumes)
+
+        self._index = VolumeIndex(volumes)
+        self._volume_constraint = np.array(volume_constraint, dtype=np.int64)
+
+    def _boundary_after(self, now: float) -> float:
+        boundaries = np.concatenate(
+            [self._index.time_start, self._index.time_end])
+        boundaries = boundaries[boundaries > now]
+        return boundaries.min() if boundaries.size else np.inf
+
+    def _evaluate(self, flights: List[Flight], now: float) -> None:
+        lat = np.array([f.current_state.position.lat for f in flights])
+        lng = np.array([f.current_state.position.lng for f in flights])
+        alt = np.array([
+            np.nan if f.current_state.position.alt is None
+            else f.current_state.position.alt
+            for f in flights
+        ])
+        t = np.array([
+            to_timestamp(f.current_state.timestamp.value, now)
+            for f in flights
+        ])
+
+        point, volume = self._index.contains(lat, lng, alt, t)
+        row = self._volume_constraint[volume]
+
+        inside: List[set] = [set() for _ in flights]
+        for p, r in zip(point.tolist(), row.tolist()):
+            inside[p].add(self._constraint_ids[r])
+
+        feed = AlertFeed.get_instance()
+        for flight, current in zip(flights, inside):
+            previous = self._inside.get(flight.id, frozenset())
+            self._inside[flight.id] = frozenset(current)
+
+            for entity_id in current - previous:
+                self._publish(feed, AlertType.GEOFENCE_ENTER, flight, entity_id)
+            for entity_id in previous - current:
+                self._publish(feed, AlertType.GEOFENCE_EXIT, flight, entity_id)
+
+    def _publish(
+        self,
+        feed: AlertFeed,
+        alert_type: AlertType,
+        flight: Flight,
+        entity_id: UUID,
+    ) -> None:
+        constraint = self._constraints.get(entity_id)
+        geozone = constraint.details.geozone if constraint else None
+        name = geozone.name or geozone.identifier if geozone else str(entity_id)
+
+        action = "entered" if alert_type == AlertType.GEOFENCE_ENTER \
+            else "exited"
+
+        feed.publish(
+            alert_type,
+            f"Flight {flight.id} {action} constraint {name}",
+            flight_id=flight.id,
+            constraint_id=entity_id,
+            geozone=geozone.identifier if geozone else None,
+        )
@@ -0,0 +1,296 @@
+import asyncio
+import functools
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from threading import Lock
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Spans of the request being served, (name, seconds) in completion order
+_request_spans: ContextVar[List[Tuple[str, float]] | None] = ContextVar(
+    "request_spans", default=None)
+
+
+def _labels(**labels: str) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels, **extra: str) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        name + '="' + value.replace("\\", "\\\\").replace('"', '\\"')
+        .replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    In-process aggregation of latency histograms and counters, rendered in
+    the Prometheus text exposition format.
+    """
+    _instance = None
+    _lock = Lock()
+
+    HELP = {
+        "observer_request_duration_seconds":
+            "Duration of the API requests.",
+        "observer_span_duration_seconds":
+            "Duration of the instrumented request phases.",
+        "observer_upstream_request_duration_seconds":
+            "Duration of the requests to the DSS and USS APIs.",
+        "observer_upstream_errors_total":
+            "Failed requests to the DSS and USS APIs.",
+        "observer_cache_requests_total":
+            "Lookups of the internal caches.",
+        "observer_cache_hit_ratio":
+            "Fraction of the lookups of the internal caches that were hits.",
+        "observer_event_loop_lag_seconds":
+            "Delay of the event loop in waking up the lag monitor.",
+        "observer_event_loop_stalls_total":
+            "Event loop lags above the stall threshold.",
+        "observer_compression_input_bytes_total":
+            "Response bytes before compression.",
+        "observer_compression_output_bytes_total":
+            "Response bytes after compression.",
+        "observer_filtered_references_total":
+            "DSS references skipped by the volume filters before fetching "
+            "their details for the response.",
+        "observer_duplicate_flights_total":
+            "Flight reports merged into another report of the same aircraft.",
+    }
+
+    def __init__(self):
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = \
+            defaultdict(lambda: defaultdict(_Histogram))
+        self._counters: Dict[str, Dict[Labels, float]] = \
+            defaultdict(lambda: defaultdict(float))
+        self._update_lock = Lock()
+
+        # Imported here, the cache module is instrumented with metrics
+        from services.cache import register_cache
+        register_cache(
+            "metrics.series",
+            lambda: sum(len(series) for series in self._histograms.values())
+            + sum(len(series) for series in self._counters.values()),
+            lambda: (self._histograms, self._counters),
+        )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        with self._update_lock:
+            self._histograms[name][_labels(**labels)].observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        with self._update_lock:
+            self._counters[name][_labels(**labels)] += amount
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        self.increment(
+            "observer_cache_requests_total",
+            cache=cache,
+            result="hit" if hit else "miss",
+        )
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        with self._update_lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {self.HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(
+                        LATENCY_BUCKETS, histogram.buckets
+                    ):
+                        cumulative += count
+                        lines.append(
+                            f"{name}_bucket"
+                            f"{_format_labels(labels, le=str(bound))} "
+                            f"{cumulative}"
+                        )
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labels, le='+Inf')} "
+                        f"{histogram.count}"
+                    )
+                    lines.append(
+                        f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(
+                        f"{name}_count{_format_labels(labels)} "
+                        f"{histogram.count}"
+                    )
+
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {self.HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+
+            lookups: Dict[str, List[float]] = defaultdict(lambda: [0, 0])
+            for labels, value in self._counters.get(
+                "observer_cache_requests_total", {}
+            ).items():
+                fields = dict(labels)
+                lookups[fields["cache"]][fields["result"] == "hit"] += value
+
+        if lookups:
+            name = "observer_cache_hit_ratio"
+            lines.append(f"# HELP {name} {self.HELP[name]}")
+            lines.append(f"# TYPE {name} gauge")
+            for cache, (misses, hits) in sorted(lookups.items()):
+                lines.append(
+                    f"{name}{_format_labels(_labels(cache=cache))} "
+                    f"{hits / (hits + misses)}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+def start_request() -> List[Tuple[str, float]]:
+    """
+    Starts collecting the spans of the current request and returns them.
+    Tasks spawned while serving the request share the same list.
+    """
+    spans: List[Tuple[str, float]] = []
+    _request_spans.set(spans)
+    return spans
+
+
+def record_span(name: str, seconds: float) -> None:
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+    MetricsRegistry.get_instance().observe(
+        "observer_span_duration_seconds", seconds, span=name)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Times the enclosed block as a phase of the current request.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def server_timing(spans: List[Tuple[str, float]], total: float) -> str:
+    """
+    Formats the spans of a request as a Server-Timing header, adding up the
+    spans with the same name. Spans of concurrent tasks overlap, so their
+    sum can exceed the total.
+    """
+    durations: Dict[str, float] = {}
+    counts: Dict[str, int] = defaultdict(int)
+    for name, seconds in spans:
+        durations[name] = durations.get(name, 0) + seconds
+        counts[name] += 1
+
+    entries = [
+        f'{name};dur={seconds * 1000:.1f};desc="{counts[name]}x"'
+        for name, seconds in durations.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # Routes are created again when their router is included
+    if getattr(endpoint, "_timed", False):
+        return endpoint
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            with span("handler"):
+                return await endpoint(*args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            with span("handler"):
+                return endpoint(*args, **kwargs)
+
+    timed._timed = True
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """
+    Route that times its endpoint as the "handler" span. The rest of the
+    time spent in the route, request parsing and response model validation,
+    is recorded as the "validate" span, "encode" being reported by
+    TimedJSONResponse.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request):
+            spans = _request_spans.get()
+            first = len(spans) if spans is not None else 0
+            start = time.perf_counter()
+
+            response = await handler(request)
+
+            measured = sum(
+                seconds for name, seconds in (spans or [])[first:]
+                if name in ("handler", "encode")
+            )
+            record_span(
+                "validate", max(time.perf_counter() - start - measured, 0))
+            return response
+
+        return timed_handler
+
+
+class TimedJSONResponse(JSONResponse):
+    """
+    JSON response that times its encoding as the "encode" span.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with span("encode"):
+            return super().render(content)
@@ -0,0 +1,285 @@
+import asyncio
+import cProfile
+import gc
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from collections import Counter, deque
+from typing import Deque, List, Tuple
+from threading import Lock
+import httpx
+from pydantic import BaseModel
+
+from config.config import get_settings
+from services.cache import register_cache
+from services.metrics import MetricsRegistry
+
+
+class LoopMonitor:
+    """
+    Measures how late the event loop wakes up a periodic task.
+
+    A watchdog thread checks the heartbeat of that task, and when it is
+    older than the threshold it captures the stack the loop thread is
+    executing, which is the code blocking the loop. The stall is logged
+    and kept once the loop runs again and its duration is known.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        settings = get_settings()
+
+        self.threshold = settings.LOOP_LAG_THRESHOLD_MS / 1000
+        self.interval = settings.LOOP_MONITOR_INTERVAL_MS / 1000
+        self.stalls: Deque[Tuple[float, float, List[str]]] = deque(
+            maxlen=settings.LOOP_STALL_HISTORY)
+        self.stall_count = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._loop_thread: int | None = None
+        self._heartbeat = time.monotonic()
+        self._stack: List[str] | None = None
+
+        register_cache(
+            "profiling.loop_stalls",
+            lambda: len(self.stalls),
+            lambda: self.stalls,
+        )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+
+        self._stopped.clear()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._watchdog.join()
+        self._task = None
+        self._watchdog = None
+
+    async def _run(self) -> None:
+        metrics = MetricsRegistry.get_instance()
+
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            lag = max(now - start - self.interval, 0)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            metrics.observe("observer_event_loop_lag_seconds", lag)
+
+            if lag >= self.threshold:
+                self._report(lag)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            blocked = time.monotonic() - self._heartbeat
+            if blocked < self.threshold + self.interval \
+                    or self._stack is not None:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._stack = traceback.format_stack(frame)
+
+    def _report(self, lag: float) -> None:
+        stack = self._stack or ["Stall shorter than the watchdog period, \
+no stack captured.\n"]
+        self._stack = None
+
+        self.stall_count += 1
+        self.stalls.append((time.time() - lag, lag, stack))
+        MetricsRegistry.get_instance().increment(
+            "observer_event_loop_stalls_total")
+
+        print(f"Event loop blocked for {lag * 1000:.0f} ms in:")
+        print("".join(stack))
+
+
+class ProfilerService:
+    """
+    Captures CPU profiles of the event loop thread, one at a time.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        settings = get_settings()
+
+        self.max_seconds = settings.PROFILE_MAX_SECONDS
+        self._profiling = asyncio.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def running(self) -> bool:
+        return self._profiling.locked()
+
+    async def profile(self, seconds: float) -> pstats.Stats:
+        """
+        Profiles everything the event loop runs during `seconds`.
+        """
+        async with self._profiling:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profiler.disable()
+
+        return pstats.Stats(profiler)
+
+    @staticmethod
+    def to_text(stats: pstats.Stats, sort: str, limit: int) -> str:
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    @staticmethod
+    def to_pstats(stats: pstats.Stats) -> bytes:
+        """
+        Serializes the profile in the format read by pstats and snakeviz.
+        """
+        return marshal.dumps(stats.stats)
+
+
+class HeapService:
+    """
+    Allocation tracing with tracemalloc and live object accounting.
+
+    Snapshots are numbered and the last HEAP_SNAPSHOTS are kept, so the
+    growth between two moments of a session can be attributed to the
+    source lines that allocated it.
+    """
+    _instance = None
+    _lock = Lock()
+
+    # Allocations of the tracing machinery itself
+    FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def __init__(self):
+        settings = get_settings()
+
+        self._snapshots: Deque[Tuple[int, float, tracemalloc.Snapshot]] = \
+            deque(maxlen=settings.HEAP_SNAPSHOTS)
+        self._next_id = 1
+
+        register_cache(
+            "profiling.heap_snapshots",
+            lambda: len(self._snapshots),
+            lambda: [snapshot for _, _, snapshot in self._snapshots],
+        )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def snapshots(self) -> List[Tuple[int, float, tracemalloc.Snapshot]]:
+        return list(self._snapshots)
+
+    def start(self, frames: int) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._snapshots.clear()
+
+    def take_snapshot(self) -> Tuple[int, float, tracemalloc.Snapshot]:
+        snapshot = tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+        entry = (self._next_id, time.time(), snapshot)
+        self._next_id += 1
+        self._snapshots.append(entry)
+        return entry
+
+    def get_snapshot(self, snapshot_id: int) -> tracemalloc.Snapshot | None:
+        for entry_id, _, snapshot in self._snapshots:
+            if entry_id == snapshot_id:
+                return snapshot
+        return None
+
+    @staticmethod
+    def top(
+        snapshot: tracemalloc.Snapshot, group_by: str, limit: int
+    ) -> List[tracemalloc.Statistic]:
+        return snapshot.statistics(group_by)[:limit]
+
+    @staticmethod
+    def diff(
+        base: tracemalloc.Snapshot,
+        current: tracemalloc.Snapshot,
+        group_by: str,
+        limit: int,
+    ) -> List[tracemalloc.StatisticDiff]:
+        return current.compare_to(base, group_by)[:limit]
+
+    @staticmethod
+    def object_counts(limit: int) -> List[Tuple[str, int]]:
+        """
+        Counts the live pydantic models and HTTP clients by type.
+        """
+        counts: Counter = Counter()
+        for obj in gc.get_objects():
+            if isinstance(obj, (BaseModel, httpx.AsyncClient)):
+                cls = type(obj)
+                counts[f"{cls.__module__}.{cls.__qualname__}"] += 1
+
+        return counts.most_common(limit)
@@ -0,0 +1,211 @@
+import time
+from typing import Dict, List, Tuple
+from threading import Lock
+import numpy as np
+
+from config.config import get_settings
+from services.cache import register_cache
+from schemas.alerts import ProximityPair
+from schemas.common.enums import AlertType
+from schemas.flights import Flight
+from services.alerts import AlertFeed
+from services.spatial import UNKNOWN_ALTITUDE, to_local_xy
+
+# Half of the 3x3 neighborhood, every pair of adjacent cells is visited once
+NEIGHBOR_OFFSETS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def _expand_ranges(
+    starts: np.ndarray, ends: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For every i, yields the pairs (i, k) with k in range(starts[i], ends[i]).
+    """
+    counts = np.maximum(ends - starts, 0)
+    owner = np.repeat(np.arange(starts.size), counts)
+    first = np.cumsum(counts) - counts
+    other = starts[owner] + np.arange(owner.size) - first[owner]
+    return owner, other
+
+
+def find_close_pairs(
+    x: np.ndarray,
+    y: np.ndarray,
+    z: np.ndarray,
+    horizontal: float,
+    vertical: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the index pairs (i < j) of points whose horizontal distance is
+    within `horizontal` and vertical distance within `vertical`, using a
+    uniform grid with cells of the horizontal threshold size. Only points in
+    the same or adjacent cells are compared, so the cost grows with the
+    number of points and close neighbors instead of quadratically. NaN
+    altitudes are considered vertically close to everything.
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if x.size < 2:
+        return empty, empty
+
+    cx = np.floor(x / horizontal).astype(np.int64)
+    cy = np.floor(y / horizontal).astype(np.int64)
+    cx -= cx.min()
+    cy -= cy.min() - 1
+    width = cy.max() + 2
+    key = cx * width + cy
+
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+    cells, cell_start, cell_count = np.unique(
+        sorted_key, return_index=True, return_counts=True)
+
+    position = np.arange(x.size)
+    cell_of = np.searchsorted(cells, sorted_key)
+
+    firsts: List[np.ndarray] = []
+    seconds: List[np.ndarray] = []
+
+    for dx, dy in NEIGHBOR_OFFSETS:
+        if dx == 0 and dy == 0:
+            starts = position + 1
+            ends = cell_start[cell_of] + cell_count[cell_of]
+        else:
+            neighbor = sorted_key + dx * width + dy
+            found = np.searchsorted(cells, neighbor)
+            found = np.minimum(found, cells.size - 1)
+            exists = cells[found] == neighbor
+            starts = np.where(exists, cell_start[found], 0)
+            ends = np.where(exists, cell_start[found] + cell_count[found], 0)
+
+        a, b = _expand_ranges(starts, ends)
+        firsts.append(order[a])
+        seconds.append(order[b])
+
+    i = np.concatenate(firsts)
+    j = np.concatenate(seconds)
+
+    dxy = (x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2
+    dz = np.abs(z[i] - z[j])
+    close = (dxy <= horizontal ** 2) & ~(dz > vertical)
+
+    i, j = i[close], j[close]
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+class ProximityService:
+    """
+    Detects loss of separation between live aircraft on every tick and
+    publishes the new and cleared conflicts to the alert feed.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        settings = get_settings()
+
+        self._horizontal = settings.PROXIMITY_HORIZONTAL_M
+        self._vertical = settings.PROXIMITY_VERTICAL_M
+        self._flight_ttl = settings.PROXIMITY_FLIGHT_TTL
+
+        self._pairs: Dict[Tuple[str, str], ProximityPair] = {}
+        self._flight_seen: Dict[str, float] = {}
+
+        register_cache(
+            "proximity.pairs", lambda: len(self._pairs), lambda: self._pairs)
+        register_cache(
+            "proximity.flights",
+            lambda: len(self._flight_seen),
+            lambda: self._flight_seen,
+        )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    @property
+    def pairs(self) -> List[ProximityPair]:
+        return list(self._pairs.values())
+
+    def process(self, flights: List[Flight]) -> List[ProximityPair]:
+        now = time.time()
+
+        flights = [flight for flight in flights if flight.current_state]
+        for flight in flights:
+            self._flight_seen[flight.id] = now
+
+        lat = np.array([f.current_state.position.lat for f in flights])
+        lng = np.array([f.current_state.position.lng for f in flights])
+        alt = np.array([
+            np.nan if f.current_state.position.alt in (None, UNKNOWN_ALTITUDE)
+            else f.current_state.position.alt
+            for f in flights
+        ])
+
+        current: Dict[Tuple[str, str], ProximityPair] = {}
+        if flights:
+            x, y = to_local_xy(lat, lng, lat.mean(), lng.mean())
+            i, j = find_close_pairs(
+                x, y, alt, self._horizontal, self._vertical)
+
+            horizontal = np.hypot(x[i] - x[j], y[i] - y[j])
+            vertical = np.abs(alt[i] - alt[j])
+
+            for k, (a, b) in enumerate(zip(i.tolist(), j.tolist())):
+                first, second = sorted((flights[a].id, flights[b].id))
+                if first == second:
+                    continue
+                current[(first, second)] = ProximityPair(
+                    flight_id=first,
+                    other_flight_id=second,
+                    horizontal_distance=float(horizontal[k]),
+                    vertical_distance=None if np.isnan(vertical[k])
+                    else float(vertical[k]),
+                )
+
+        feed = AlertFeed.get_instance()
+        reported = {flight.id for flight in flights}
+
+        for key, pair in current.items():
+            if key not in self._pairs:
+                feed.publish(
+                    AlertType.PROXIMITY,
+                    f"Loss of separation between flights {pair.flight_id} \
+and {pair.other_flight_id} ({pair.horizontal_distance:.0f} m)",
+                    flight_id=pair.flight_id,
+                    other_flight_id=pair.other_flight_id,
+                )
+
+        for key, pair in self._pairs.items():
+            if key in current:
+                continue
+
+            if key[0] in reported and key[1] in reported:
+                feed.publish(
+                    AlertType.PROXIMITY_CLEARED,
+                    f"Separation restored between flights {pair.flight_id} \
+and {pair.other_flight_id}",
+                    flight_id=pair.flight_id,
+                    other_flight_id=pair.other_flight_id,
+                )
+            elif all(
+                now - self._flight_seen.get(flight_id, 0) <= self._flight_ttl
+                for flight_id in key
+            ):
+                # One of the aircraft is outside of this tick area, keep the
+                # conflict until it is reported again or expires
+                current[key] = pair
+
+        self._pairs = current
+
+        for flight_id, seen in list(self._flight_seen.items()):
+            if now - seen > self._flight_ttl:
+                del self._flight_seen[flight_id]
+
+        return self.pairs
@@ -0,0 +1,399 @@
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Tuple
+from threading import Lock
+import numpy as np
+
+from config.config import get_settings
+from schemas.flights import Flight
+from schemas.uss.common import Constraint, OperationalIntent
+from services.cache import register_cache
+from services.spatial import UNKNOWN_ALTITUDE, to_timestamp
+from services.tracks import UNKNOWN_SPEED, UNKNOWN_TRACK
+
+# Segment layout, every file is append only:
+#   <name>.ticks       TICK_RECORD per flight position
+#   <name>.ticks.idx   TICK_INDEX per tick, pointing into .ticks
+#   <name>.ids         flight ids, one per line, referenced by TICK_RECORD.flight
+#   <name>.events      JSON encoded volume changes
+#   <name>.events.idx  EVENT_INDEX per volume change, pointing into .events
+TICK_RECORD = np.dtype([
+    ("t", "<f8"),
+    ("flight", "<u4"),
+    ("lat", "<f8"),
+    ("lng", "<f8"),
+    ("alt", "<f4"),
+    ("speed", "<f4"),
+    ("track", "<f4"),
+])
+
+TICK_INDEX = np.dtype([
+    ("t", "<f8"),
+    ("offset", "<u8"),
+    ("count", "<u4"),
+])
+
+EVENT_INDEX = np.dtype([
+    ("t", "<f8"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+])
+
+
+def _memmap(path: str, dtype: np.dtype) -> np.ndarray:
+    """
+    Maps the complete records of an append only file, ignoring a trailing
+    partially written record.
+    """
+    if not os.path.exists(path):
+        return np.zeros(0, dtype)
+
+    count = os.path.getsize(path) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype)
+
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+
+class _Segment:
+    """
+    Files of the segment currently being written.
+    """
+
+    def __init__(self, directory: str, start: float):
+        self.start = start
+        self.name = os.path.join(directory, f"{int(start * 1000):015d}")
+        self.flights: Dict[str, int] = {}
+        self.records = 0
+        self.events_size = 0
+
+        self.ticks = open(f"{self.name}.ticks", "ab")
+        self.ticks_index = open(f"{self.name}.ticks.idx", "ab")
+        self.ids = open(f"{self.name}.ids", "a", encoding="utf-8")
+        self.events = open(f"{self.name}.events", "ab")
+        self.events_index = open(f"{self.name}.events.idx", "ab")
+
+    def close(self) -> None:
+        for file in (
+            self.ticks, self.ticks_index, self.ids,
+            self.events, self.events_index,
+        ):
+            file.close()
+
+    def write_tick(self, t: float, flights: List[Flight]) -> None:
+        records = np.zeros(len(flights), TICK_RECORD)
+
+        new_ids: List[str] = []
+        for i, flight in enumerate(flights):
+            index = self.flights.get(flight.id)
+            if index is None:
+                index = self.flights[flight.id] = len(self.flights)
+                new_ids.append(flight.id)
+
+            state = flight.current_state
+            position = state.position
+            records[i] = (
+                to_timestamp(state.timestamp.value, t),
+                index,
+                position.lat,
+                position.lng,
+                np.nan if position.alt in (None, UNKNOWN_ALTITUDE)
+                else position.alt,
+                np.nan if state.speed in (None, UNKNOWN_SPEED)
+                else state.speed,
+                np.nan if state.track in (None, UNKNOWN_TRACK)
+                else state.track,
+            )
+
+        if new_ids:
+            self.ids.write("".join(f"{flight_id}\n" for flight_id in new_ids))
+            self.ids.flush()
+
+        # Records are flushed before the index entry that references them
+        self.ticks.write(records.tobytes())
+        self.ticks.flush()
+
+        index = np.array([(t, self.records, records.size)], TICK_INDEX)
+        self.ticks_index.write(index.tobytes())
+        self.ticks_index.flush()
+
+        self.records += records.size
+
+    def write_event(self, t: float, event: dict) -> None:
+        data = json.dumps(event, separators=(",", ":")).encode("utf-8")
+
+        self.events.write(data)
+        self.events.flush()
+
+        index = np.array([(t, self.events_size, len(data))], EVENT_INDEX)
+        self.events_index.write(index.tobytes())
+        self.events_index.flush()
+
+        self.events_size += len(data)
+
+
+class RecorderService:
+    """
+    Append only recording of the live flight ticks and volume changes.
+
+    The request handlers only enqueue what has to be recorded; encoding and
+    disk writes happen in a background thread, so recording never blocks the
+    event loop. When the queue is full the entry is dropped and counted.
+    Segments are rolled every RECORDING_SEGMENT_SECONDS.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        settings = get_settings()
+
+        self._directory = settings.RECORDING_PATH
+        self._segment_seconds = settings.RECORDING_SEGMENT_SECONDS
+        self._queue: queue.Queue = queue.Queue(
+            maxsize=settings.RECORDING_QUEUE_SIZE)
+        self._thread: threading.Thread | None = None
+        self._segment: _Segment | None = None
+        self._versions: Dict[Tuple[str, str], Tuple[str | None, float]] = {}
+        self.dropped = 0
+
+        register_cache(
+            "recorder.versions",
+            lambda: len(self._versions),
+            lambda: self._versions,
+        )
+        register_cache(
+            "recorder.queue",
+            lambda: self._queue.qsize(),
+            lambda: list(self._queue.queue),
+        )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if not self._directory or self._thread is not None:
+            return
+
+        os.makedirs(self._directory, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def record_flights(self, flights: List[Flight]) -> None:
+        if not self.enabled:
+            return
+
+        flights = [flight for flight in flights if flight.current_state]
+        self._enqueue(("tick", time.time(), flights))
+
+    def record_volumes(
+        self,
+        operational_intents: List[OperationalIntent],
+        constraints: List[Constraint],
+    ) -> None:
+        """
+        Records the operational intents and constraints that are new or
+        whose OVN changed since they were last recorded. Unchanged entities
+        are recorded again once per segment duration, so every segment holds
+        the volumes that were live during it.
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+
+        changed: List[Tuple[str, OperationalIntent | Constraint]] = []
+        for kind, entities in (
+            ("operational_intent", operational_intents),
+            ("constraint", constraints),
+        ):
+            for entity in entities:
+                key = (kind, str(entity.reference.id))
+                known = self._versions.get(key)
+                if known is not None \
+                        and known[0] == entity.reference.ovn \
+                        and now - known[1] < self._segment_seconds:
+                    continue
+                self._versions[key] = (entity.reference.ovn, now)
+                changed.append((kind, entity))
+
+        for key, (_, recorded) in list(self._versions.items()):
+            if now - recorded > 2 * self._segment_seconds:
+                del self._versions[key]
+
+        if changed:
+            self._enqueue(("volumes", now, changed))
+
+    def _enqueue(self, item: tuple) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            kind, t, payload = item
+            try:
+                segment = self._current_segment(t)
+                if kind == "tick":
+                    segment.write_tick(t, payload)
+                else:
+                    for entity_kind, entity in payload:
+                        segment.write_event(t, {
+                            "kind": entity_kind,
+                            "data": entity.model_dump(mode="json"),
+                        })
+            except Exception as e:
+                print("Error writing recording segment:", e)
+
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def _current_segment(self, t: float) -> _Segment:
+        if self._segment is not None \
+                and t - self._segment.start < self._segment_seconds:
+            return self._segment
+
+        if self._segment is not None:
+            self._segment.close()
+
+        self._segment = _Segment(self._directory, t)
+        return self._segment
+
+
+class RecordingReader:
+    """
+    Serves time windows of a recording by memory mapping its segments.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+
+        self._directory = settings.RECORDING_PATH
+
+    def segments(self) -> List[Tuple[str, float, float, int, int]]:
+        """
+        Returns (name, start, end, ticks, events) for every segment.
+        """
+        if not self._directory or not os.path.isdir(self._directory):
+            return []
+
+        segments = []
+        for file in sorted(os.listdir(self._directory)):
+            if not file.endswith(".ticks.idx"):
+                continue
+
+            name = file[:-len(".ticks.idx")]
+            path = os.path.join(self._directory, name)
+            ticks = _memmap(f"{path}.ticks.idx", TICK_INDEX)
+            events = _memmap(f"{path}.events.idx", EVENT_INDEX)
+
+            start = int(name) / 1000
+            times = [start]
+            if ticks.size:
+                times.append(float(ticks["t"][-1]))
+            if events.size:
+                times.append(float(events["t"][-1]))
+
+            segments.append(
+                (name, start, max(times), int(ticks.size), int(events.size)))
+
+        return segments
+
+    def flights(
+        self, start: float, end: float, limit: int
+    ) -> Tuple[np.ndarray, List[str], bool]:
+        """
+        Returns the TICK_RECORD positions recorded in [start, end], the
+        flight ids they reference and whether the result was truncated.
+        """
+        records: List[np.ndarray] = []
+        flight_ids: List[str] = []
+        size = 0
+
+        for name, segment_start, segment_end, _, _ in self.segments():
+            if segment_end < start or segment_start > end:
+                continue
+
+            path = os.path.join(self._directory, name)
+            index = _memmap(f"{path}.ticks.idx", TICK_INDEX)
+            ticks = _memmap(f"{path}.ticks", TICK_RECORD)
+
+            first = np.searchsorted(index["t"], start, "left")
+            last = np.searchsorted(index["t"], end, "right")
+            if first >= last:
+                continue
+
+            offset = int(index["offset"][first])
+            stop = min(
+                int(index["offset"][last - 1] + index["count"][last - 1]),
+                ticks.size,
+            )
+            window = np.array(ticks[offset:stop])
+
+            with open(f"{path}.ids", encoding="utf-8") as file:
+                ids = file.read().splitlines()
+
+            window["flight"] += len(flight_ids)
+            flight_ids += ids
+            records.append(window)
+
+            size += window.size
+            if size >= limit:
+                break
+
+        if not records:
+            return np.zeros(0, TICK_RECORD), flight_ids, False
+
+        result = np.concatenate(records)
+        return result[:limit], flight_ids, result.size > limit
+
+    def volumes(self, start: float, end: float) -> List[Tuple[float, dict]]:
+        """
+        Returns the volume changes recorded in [start, end].
+        """
+        events: List[Tuple[float, dict]] = []
+
+        for name, segment_start, segment_end, _, _ in self.segments():
+            if segment_end < start or segment_start > end:
+                continue
+
+            path = os.path.join(self._directory, name)
+            index = _memmap(f"{path}.events.idx", EVENT_INDEX)
+            first = np.searchsorted(index["t"], start, "left")
+            last = np.searchsorted(index["t"], end, "right")
+            if first >= last:
+                continue
+
+            data = np.memmap(f"{path}.events", dtype=np.uint8, mode="r")
+            for entry in index[first:last]:
+                offset = int(entry["offset"])
+                raw = data[offset:offset + int(entry["length"])].tobytes()
+                events.append((float(entry["t"]), json.loads(raw)))
+
+        return events
@@ -0,0 +1,285 @@
+import math
+from typing import List, Tuple, TypeVar
+from threading import Lock
+import numpy as np
+
+from config.config import get_settings
+from schemas.common.geo import LatLngPoint, Polygon, Volume4D
+from services.cache import LRUCache
+from services.spatial import to_local_xy
+
+T = TypeVar("T")
+
+# Ground resolution of a 256 pixel web mercator tile at zoom 0 on the equator
+METERS_PER_PIXEL_ZOOM_0 = 156543.03392
+
+# Halvings of the tolerance tried before keeping the original outline
+MAX_ATTEMPTS = 8
+
+# Pairs of edges with overlapping bounds tested for a crossing, rings with
+# more candidate pairs are not checked and keep their original outline
+MAX_CHECKED_PAIRS = 1 << 18
+
+
+def zoom_level(zoom: float) -> int:
+    """
+    Integer zoom level deciding the tolerance of a fractional zoom. Rounded
+    up, so the tolerance never exceeds a pixel at the requested zoom.
+    """
+    return math.ceil(zoom)
+
+
+def zoom_tolerance(zoom: float, lat: float) -> float:
+    """
+    Size in meters of a screen pixel at the given zoom level and latitude.
+    """
+    return METERS_PER_PIXEL_ZOOM_0 * math.cos(math.radians(lat)) / 2 ** zoom
+
+
+def _douglas_peucker(
+    x: np.ndarray, y: np.ndarray, keep: np.ndarray,
+    start: int, end: int, tolerance: float,
+) -> None:
+    pending = [(start, end)]
+
+    while pending:
+        first, last = pending.pop()
+        if last <= first + 1:
+            continue
+
+        dx = x[last] - x[first]
+        dy = y[last] - y[first]
+        px = x[first + 1:last] - x[first]
+        py = y[first + 1:last] - y[first]
+
+        norm = math.hypot(dx, dy)
+        if norm == 0:
+            distances = np.hypot(px, py)
+        else:
+            distances = np.abs(px * dy - py * dx) / norm
+
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = first + 1 + farthest
+            keep[index] = True
+            pending.append((first, index))
+            pending.append((index, last))
+
+
+def simplify_ring(x: np.ndarray, y: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Indices of the vertices of an open ring kept by Douglas-Peucker. The
+    ring is split at its first vertex and the vertex farthest from it.
+    """
+    size = len(x)
+    closed_x = np.append(x, x[0])
+    closed_y = np.append(y, y[0])
+    split = int(np.argmax(np.hypot(x - x[0], y - y[0])))
+
+    keep = np.zeros(size + 1, dtype=bool)
+    keep[0] = keep[split] = keep[size] = True
+    _douglas_peucker(closed_x, closed_y, keep, 0, split, tolerance)
+    _douglas_peucker(closed_x, closed_y, keep, split, size, tolerance)
+
+    return np.flatnonzero(keep[:size])
+
+
+def is_simple(x: np.ndarray, y: np.ndarray) -> bool | None:
+    """
+    Whether the edges of a closed ring only meet their neighbours.
+
+    Edges are swept by their horizontal extent, so only the pairs whose
+    bounding boxes overlap are tested. A ring with more than
+    MAX_CHECKED_PAIRS candidate pairs is not checked and gives None, which
+    keeps the memory and time of the check bounded.
+    """
+    size = len(x)
+    if size < 3:
+        return False
+
+    ax, ay = x, y
+    bx, by = np.roll(x, -1), np.roll(y, -1)
+    min_x, max_x = np.minimum(ax, bx), np.maximum(ax, bx)
+    min_y, max_y = np.minimum(ay, by), np.maximum(ay, by)
+
+    # Edges after each edge in the sweep order that start before it ends
+    order = np.argsort(min_x, kind="stable")
+    ends = np.searchsorted(min_x[order], max_x[order], side="right")
+    counts = ends - np.arange(size) - 1
+    total = int(counts.sum())
+    if total > MAX_CHECKED_PAIRS:
+        return None
+
+    first = np.repeat(np.arange(size), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    i = order[first]
+    j = order[first + 1 + offsets]
+
+    # Adjacent edges share a vertex and are allowed to touch there
+    gap = np.abs(i - j)
+    candidate = (gap > 1) & (gap != size - 1) \
+        & (min_y[i] <= max_y[j]) & (min_y[j] <= max_y[i])
+    i, j = i[candidate], j[candidate]
+
+    def orientation(px, py, qx, qy, rx, ry):
+        return np.sign((qx - px) * (ry - py) - (qy - py) * (rx - px))
+
+    o1 = orientation(ax[i], ay[i], bx[i], by[i], ax[j], ay[j])
+    o2 = orientation(ax[i], ay[i], bx[i], by[i], bx[j], by[j])
+    o3 = orientation(ax[j], ay[j], bx[j], by[j], ax[i], ay[i])
+    o4 = orientation(ax[j], ay[j], bx[j], by[j], bx[i], by[i])
+
+    return not np.any((o1 * o2 < 0) & (o3 * o4 < 0))
+
+
+def simplify_polygon(polygon: Polygon, tolerance: float) -> Polygon:
+    """
+    Removes the vertices closer than `tolerance` meters to the simplified
+    outline. The tolerance is halved while the result crosses itself, and
+    the original polygon is kept when no simpler valid outline is found or
+    the result is too large to be checked.
+    """
+    vertices = polygon.vertices
+    if vertices[0] == vertices[-1]:
+        vertices = vertices[:-1]
+    if len(vertices) <= 3:
+        return polygon
+
+    lat = np.array([vertex.lat for vertex in vertices])
+    lng = np.array([vertex.lng for vertex in vertices])
+    x, y = to_local_xy(lat, lng, lat[0], lng[0])
+
+    kept = simplified_indices(x, y, tolerance)
+    if kept is None:
+        return polygon
+
+    return Polygon(vertices=[
+        LatLngPoint(lat=vertices[i].lat, lng=vertices[i].lng)
+        for i in kept
+    ])
+
+
+def simplified_indices(
+    x: np.ndarray, y: np.ndarray, tolerance: float
+) -> np.ndarray | None:
+    """
+    Indices of the vertices of an open ring in meters kept by
+    simplify_polygon, None when no simpler valid ring is found.
+    """
+    for _ in range(MAX_ATTEMPTS):
+        kept = simplify_ring(x, y, tolerance)
+        if len(kept) >= len(x):
+            return None
+
+        simple = is_simple(x[kept], y[kept])
+        if simple is None:
+            # Too large to be checked, a lower tolerance only adds edges
+            return None
+        if simple:
+            return kept
+        tolerance /= 2
+
+    return None
+
+
+def simplify_volume(
+    volume4d: Volume4D,
+    zoom: float | None,
+    tolerance: float | None,
+) -> Volume4D:
+    # A circle is already a center and a radius, Cesium picks its
+    # tessellation, so only polygon outlines are simplified
+    polygon = volume4d.volume.outline_polygon
+    if polygon is None:
+        return volume4d
+
+    if tolerance is None:
+        tolerance = zoom_tolerance(zoom, polygon.vertices[0].lat)
+
+    simplified = simplify_polygon(polygon, tolerance)
+    if simplified is polygon:
+        return volume4d
+
+    return volume4d.model_copy(update={
+        "volume": volume4d.volume.model_copy(
+            update={"outline_polygon": simplified}),
+    })
+
+
+class SimplificationService:
+    """
+    Level of detail of the volume outlines sent to the viewer.
+
+    Simplified details are cached per entity, version and resolution, so an
+    outline is only simplified again when its owner publishes a new version.
+    The monitoring services always keep the full precision volumes.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        self._details = LRUCache(
+            "simplification.details",
+            get_settings().SIMPLIFICATION_CACHE_SIZE,
+        )
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _simplify_details(self, details, zoom, tolerance):
+        update = {
+            "volumes": [
+                simplify_volume(volume, zoom, tolerance)
+                for volume in details.volumes
+            ],
+        }
+        if getattr(details, "off_nominal_volumes", None):
+            update["off_nominal_volumes"] = [
+                simplify_volume(volume, zoom, tolerance)
+                for volume in details.off_nominal_volumes
+            ]
+        return details.model_copy(update=update)
+
+    def simplify(
+        self,
+        entities: List[T],
+        zoom: float | None = None,
+        tolerance: float | None = None,
+    ) -> List[T]:
+        """
+        Returns copies of the operational intents, constraints or service
+        areas with their outlines simplified for a zoom level or a
+        tolerance in meters. The tolerance takes precedence.
+        """
+        if zoom is None and tolerance is None:
+            return entities
+
+        # Zooms within a level share the tolerance and the cached outlines
+        if tolerance is None:
+            zoom = zoom_level(zoom)
+        resolution: Tuple[str, float] = \
+            ("tolerance", tolerance) if tolerance is not None \
+            else ("zoom", zoom)
+        simplified = []
+
+        for entity in entities:
+            reference = entity.reference
+            version = getattr(reference, "ovn", None) or reference.version
+            key = (type(entity).__name__, str(reference.id), version,
+                   resolution)
+
+            details = self._details.get(key) if version else None
+            if details is None:
+                details = self._simplify_details(
+                    entity.details, zoom, tolerance)
+                if version:
+                    self._details.put(key, details)
+
+            simplified.append(entity.model_copy(update={"details": details}))
+
+        return simplified
@@ -0,0 +1,270 @@
+from typing import List, Sequence, Tuple
+from datetime import datetime
+import numpy as np
+
+from schemas.common.geo import Volume4D
+
+EARTH_RADIUS_M = 6371008.8
+
+# RID reports -1000 when the altitude of the aircraft is unknown
+UNKNOWN_ALTITUDE = -1000
+
+# Upper bound of boolean cells evaluated at once, keeps the working set small
+CHUNK_CELLS = 1 << 22
+
+
+def to_timestamp(value: datetime | None, default: float) -> float:
+    """
+    Converts an optional datetime into a POSIX timestamp.
+    """
+    if value is None:
+        return default
+    return value.timestamp()
+
+
+def to_local_xy(
+    lat: np.ndarray, lng: np.ndarray, lat0: float, lng0: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Projects lat/lng degrees into a local equirectangular plane in meters
+    centered at (lat0, lng0). Accurate enough for distances of a few tens
+    of kilometers, which is the scale of a viewer area.
+    """
+    scale = np.pi / 180.0 * EARTH_RADIUS_M
+    x = (lng - lng0) * scale * np.cos(np.radians(lat0))
+    y = (lat - lat0) * scale
+    return x, y
+
+
+def from_local_xy(
+    x: np.ndarray, y: np.ndarray, lat0: float, lng0: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inverse of to_local_xy, from meters back into lat/lng degrees.
+    """
+    scale = np.pi / 180.0 * EARTH_RADIUS_M
+    lat = y / scale + lat0
+    lng = x / (scale * np.cos(np.radians(lat0))) + lng0
+    return lat, lng
+
+
+class VolumeIndex:
+    """
+    Packed representation of a set of 4D volumes that answers vectorized
+    point containment queries.
+
+    Every volume is flattened into numpy arrays (bounding boxes, altitude and
+    time bounds, polygon edges and circles) so a query over thousands of
+    points is evaluated with array operations instead of per-object loops.
+    """
+
+    def __init__(self, volumes: Sequence[Volume4D]):
+        size = len(volumes)
+
+        self.size = size
+        self.min_lat = np.empty(size)
+        self.max_lat = np.empty(size)
+        self.min_lng = np.empty(size)
+        self.max_lng = np.empty(size)
+        self.alt_lower = np.empty(size)
+        self.alt_upper = np.empty(size)
+        self.time_start = np.empty(size)
+        self.time_end = np.empty(size)
+
+        self.is_circle = np.zeros(size, dtype=bool)
+        self.center_lat = np.zeros(size)
+        self.center_lng = np.zeros(size)
+        self.radius = np.zeros(size)
+
+        self.edge_start = np.zeros(size, dtype=np.int64)
+        self.edge_count = np.zeros(size, dtype=np.int64)
+
+        edges: List[np.ndarray] = []
+        offset = 0
+
+        for i, volume4d in enumerate(volumes):
+            volume = volume4d.volume
+
+            self.alt_lower[i] = volume.altitude_lower.value
+            self.alt_upper[i] = volume.altitude_upper.value
+            self.time_start[i] = to_timestamp(
+                volume4d.time_start.value if volume4d.time_start else None,
+                -np.inf,
+            )
+            self.time_end[i] = to_timestamp(
+                volume4d.time_end.value if volume4d.time_end else None,
+                np.inf,
+            )
+
+            if volume.outline_polygon is not None:
+                ring = np.array(
+                    [[v.lng, v.lat] for v in volume.outline_polygon.vertices],
+                    dtype=float,
+                )
+                closed = np.vstack([ring, ring[:1]])
+                edges.append(np.hstack([closed[:-1], closed[1:]]))
+
+                self.edge_start[i] = offset
+                self.edge_count[i] = len(ring)
+                offset += len(ring)
+
+                self.min_lng[i], self.min_lat[i] = ring.min(axis=0)
+                self.max_lng[i], self.max_lat[i] = ring.max(axis=0)
+                continue
+
+            circle = volume.outline_circle
+            if circle is None or circle.center is None or circle.radius is None:
+                # Degenerated volume, never matches anything
+                self.min_lat[i] = self.min_lng[i] = np.inf
+                self.max_lat[i] = self.max_lng[i] = -np.inf
+                continue
+
+            self.is_circle[i] = True
+            self.center_lat[i] = circle.center.lat
+            self.center_lng[i] = circle.center.lng
+            self.radius[i] = circle.radius.value
+
+            dlat = np.degrees(circle.radius.value / EARTH_RADIUS_M)
+            dlng = dlat / max(np.cos(np.radians(circle.center.lat)), 1e-6)
+            self.min_lat[i] = circle.center.lat - dlat
+            self.max_lat[i] = circle.center.lat + dlat
+            self.min_lng[i] = circle.center.lng - dlng
+            self.max_lng[i] = circle.center.lng + dlng
+
+        self.edges = np.vstack(edges) if edges else np.zeros((0, 4))
+
+    def contains(
+        self,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        alt: np.ndarray,
+        t: np.ndarray | float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the (point, volume) index pairs for every volume that
+        contains a point. Unknown altitudes (NaN or -1000) are only checked
+        horizontally.
+        """
+        lat = np.asarray(lat, dtype=float)
+        lng = np.asarray(lng, dtype=float)
+        alt = np.asarray(alt, dtype=float)
+        t = np.broadcast_to(np.asarray(t, dtype=float), lat.shape)
+
+        alt = np.where(alt == UNKNOWN_ALTITUDE, np.nan, alt)
+
+        if self.size == 0 or lat.size == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        points: List[np.ndarray] = []
+        volumes: List[np.ndarray] = []
+
+        step = max(1, CHUNK_CELLS // self.size)
+        for start in range(0, lat.size, step):
+            end = min(start + step, lat.size)
+            p, v = self._candidates(
+                lat[start:end], lng[start:end], alt[start:end], t[start:end]
+            )
+            p += start
+
+            inside = self._inside(lat[p], lng[p], v)
+            points.append(p[inside])
+            volumes.append(v[inside])
+
+        return np.concatenate(points), np.concatenate(volumes)
+
+    def contains_horizontally(
+        self, lat: np.ndarray, lng: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the (point, volume) index pairs for every volume whose
+        outline contains a point, regardless of altitude and time.
+        """
+        lat = np.asarray(lat, dtype=float)
+        lng = np.asarray(lng, dtype=float)
+
+        if self.size == 0 or lat.size == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        points: List[np.ndarray] = []
+        volumes: List[np.ndarray] = []
+
+        step = max(1, CHUNK_CELLS // self.size)
+        for start in range(0, lat.size, step):
+            end = min(start + step, lat.size)
+            chunk_lat = lat[start:end, None]
+            chunk_lng = lng[start:end, None]
+            p, v = np.nonzero(
+                (chunk_lat >= self.min_lat) & (chunk_lat <= self.max_lat)
+                & (chunk_lng >= self.min_lng) & (chunk_lng <= self.max_lng)
+            )
+            p += start
+
+            inside = self._inside(lat[p], lng[p], v)
+            points.append(p[inside])
+            volumes.append(v[inside])
+
+        return np.concatenate(points), np.concatenate(volumes)
+
+    def _candidates(
+        self, lat: np.ndarray, lng: np.ndarray, alt: np.ndarray, t: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        lat = lat[:, None]
+        lng = lng[:, None]
+        alt = alt[:, None]
+        t = t[:, None]
+
+        mask = (lat >= self.min_lat) & (lat <= self.max_lat) \
+            & (lng >= self.min_lng) & (lng <= self.max_lng) \
+            & (t >= self.time_start) & (t <= self.time_end) \
+            & (np.isnan(alt) | ((alt >= self.alt_lower) & (alt <= self.alt_upper)))
+
+        return np.nonzero(mask)
+
+    def _inside(
+        self, lat: np.ndarray, lng: np.ndarray, volume: np.ndarray
+    ) -> np.ndarray:
+        inside = np.zeros(volume.size, dtype=bool)
+
+        circles = self.is_circle[volume]
+        if circles.any():
+            v = volume[circles]
+            x, y = to_local_xy(
+                lat[circles], lng[circles],
+                self.center_lat[v], self.center_lng[v],
+            )
+            inside[circles] = x * x + y * y <= self.radius[v] ** 2
+
+        polygons = ~circles
+        if polygons.any():
+            inside[polygons] = self._inside_polygons(
+                lat[polygons], lng[polygons], volume[polygons]
+            )
+
+        return inside
+
+    def _inside_polygons(
+        self, lat: np.ndarray, lng: np.ndarray, volume: np.ndarray
+    ) -> np.ndarray:
+        """
+        Even-odd ray casting over every (candidate, edge) combination.
+        """
+        counts = self.edge_count[volume]
+        pair = np.repeat(np.arange(volume.size), counts)
+
+        first = np.cumsum(counts) - counts
+        edge = self.edge_start[volume][pair] + \
+            np.arange(pair.size) - first[pair]
+
+        x1, y1, x2, y2 = self.edges[edge].T
+        px = lng[pair]
+        py = lat[pair]
+
+        straddles = (y1 > py) != (y2 > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cross_x = (x2 - x1) * (py - y1) / (y2 - y1) + x1
+        crossing = straddles & (px < cross_x)
+
+        hits = np.bincount(pair, weights=crossing, minlength=volume.size)
+        return (hits.astype(np.int64) % 2) == 1
@@ -0,0 +1,289 @@
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Set
+from threading import Lock
+import numpy as np
+
+from config.config import get_settings
+from services.cache import register_cache
+from schemas.common.base import Time
+from schemas.common.enums import TimeFormat
+from schemas.flights import Flight
+from schemas.uss.remoteid import RIDAircraftPosition, RIDRecentAircraftPosition
+from services.spatial import UNKNOWN_ALTITUDE, to_timestamp
+
+# RID placeholders for unknown speed and track
+UNKNOWN_SPEED = 255
+UNKNOWN_TRACK = 361
+
+# Packed layout of a track point, 36 bytes per position
+TRACK_POINT = np.dtype([
+    ("t", "<f8"),
+    ("lat", "<f8"),
+    ("lng", "<f8"),
+    ("alt", "<f4"),
+    ("speed", "<f4"),
+    ("track", "<f4"),
+])
+
+
+def optional_values(values: np.ndarray) -> List[float | None]:
+    """
+    Values of a track column with the unknown ones, stored as NaN, as None.
+    """
+    return [None if value != value else value for value in values.tolist()]
+
+
+class TrackStore:
+    """
+    Fixed size ring buffers with the recent positions of every live flight.
+
+    All buffers live in a single preallocated structured array sized from
+    TRACK_MEMORY_MB, so the memory used by the history never grows past the
+    configured cap. Flights that stopped reporting for TRACK_IDLE_TIMEOUT
+    seconds release their slot, and when every slot is taken the least
+    recently seen flight is evicted. Recent positions reported with a flight
+    are merged into its track, so a poll only adds the points the track did
+    not have yet.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self):
+        settings = get_settings()
+
+        self._length = settings.TRACK_POINTS_PER_FLIGHT
+        self._idle_timeout = settings.TRACK_IDLE_TIMEOUT
+        self._capacity = max(
+            1,
+            int(settings.TRACK_MEMORY_MB * 1024 * 1024)
+            // (self._length * TRACK_POINT.itemsize),
+        )
+
+        self._points = np.zeros((self._capacity, self._length), TRACK_POINT)
+        self._head = np.zeros(self._capacity, dtype=np.int64)
+        self._count = np.zeros(self._capacity, dtype=np.int64)
+        self._last_t = np.full(self._capacity, -np.inf)
+        self._last_seen = np.full(self._capacity, np.inf)
+
+        self._slots: Dict[str, int] = {}
+        self._flight_ids: List[str | None] = [None] * self._capacity
+        self._free: List[int] = list(range(self._capacity - 1, -1, -1))
+
+        register_cache("tracks", lambda: len(self), lambda: self)
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def nbytes(self) -> int:
+        return self._points.nbytes + self._head.nbytes + self._count.nbytes \
+            + self._last_t.nbytes + self._last_seen.nbytes
+
+    def append_flights(self, flights: List[Flight]) -> int:
+        """
+        Appends the recent positions and the current state of every flight
+        to its track. Positions older than or equal to the last stored one
+        are ignored, as are the new flights beyond the capacity of the
+        store. Returns the number of stored points.
+        """
+        now = time.time()
+
+        latest: Dict[str, Flight] = {}
+        for flight in flights:
+            if not flight.current_state:
+                continue
+            known = latest.get(flight.id)
+            if known is None or to_timestamp(
+                flight.current_state.timestamp.value, now
+            ) > to_timestamp(known.current_state.timestamp.value, now):
+                latest[flight.id] = flight
+
+        self._evict_idle(now)
+
+        # Slots of the flights in this batch are never recycled for another
+        # flight of the same batch
+        taken = {
+            self._slots[flight_id]
+            for flight_id in latest if flight_id in self._slots
+        }
+
+        rows = []
+        slots = []
+        for flight_id, flight in latest.items():
+            slot = self._slot(flight_id, now, taken)
+            if slot is None:
+                continue
+
+            # The current state goes first, the merge keeps the first of the
+            # points sharing a timestamp and only it has speed and track
+            state = flight.current_state
+            position = state.position
+            rows.append((
+                to_timestamp(state.timestamp.value, now),
+                position.lat,
+                position.lng,
+                np.nan if position.alt in (None, UNKNOWN_ALTITUDE)
+                else position.alt,
+                np.nan if state.speed in (None, UNKNOWN_SPEED)
+                else state.speed,
+                np.nan if state.track in (None, UNKNOWN_TRACK)
+                else state.track,
+            ))
+            slots.append(slot)
+
+            for recent in flight.recent_positions or []:
+                position = recent.position
+                rows.append((
+                    to_timestamp(recent.time.value, now),
+                    position.lat,
+                    position.lng,
+                    np.nan if position.alt in (None, UNKNOWN_ALTITUDE)
+                    else position.alt,
+                    np.nan,
+                    np.nan,
+                ))
+                slots.append(slot)
+
+        return self.append_points(
+            np.array(slots, dtype=np.int64),
+            np.array(rows, dtype=TRACK_POINT),
+            now,
+        )
+
+    def append_points(
+        self, slots: np.ndarray, records: np.ndarray, now: float
+    ) -> int:
+        """
+        Merges points into the tracks of their slots in chronological order.
+        Points not newer than the last stored point of their track, or
+        repeating the timestamp of an earlier point of the batch, are
+        ignored. Returns the number of stored points.
+        """
+        self._last_seen[slots] = now
+
+        order = np.lexsort((records["t"], slots))
+        slots = slots[order]
+        records = records[order]
+
+        fresh = records["t"] > self._last_t[slots]
+        fresh[1:] &= (slots[1:] != slots[:-1]) \
+            | (records["t"][1:] != records["t"][:-1])
+        slots = slots[fresh]
+        records = records[fresh]
+        if not slots.size:
+            return 0
+
+        starts = np.r_[0, np.nonzero(slots[1:] != slots[:-1])[0] + 1]
+        counts = np.diff(np.r_[starts, slots.size])
+        rank = np.arange(slots.size) - np.repeat(starts, counts)
+
+        # Only the newest points are kept when more arrive than a track holds
+        fits = rank >= np.repeat(counts, counts) - self._length
+        written = slots[fits]
+        self._points[written, (self._head[written] + rank[fits])
+                     % self._length] = records[fits]
+
+        tracks = slots[starts]
+        self._head[tracks] = (self._head[tracks] + counts) % self._length
+        self._count[tracks] = np.minimum(
+            self._count[tracks] + counts, self._length)
+        self._last_t[tracks] = records["t"][starts + counts - 1]
+
+        return int(np.count_nonzero(fits))
+
+    def trail(self, flight_id: str, since: float | None = None) -> np.ndarray:
+        """
+        Returns the stored positions of a flight in chronological order,
+        optionally only the ones after the given timestamp.
+        """
+        slot = self._slots.get(flight_id)
+        if slot is None:
+            return np.zeros(0, TRACK_POINT)
+
+        count = self._count[slot]
+        index = (self._head[slot] - count + np.arange(count)) % self._length
+        points = self._points[slot, index]
+
+        if since is not None:
+            points = points[points["t"] > since]
+
+        return points
+
+    def positions_since(
+        self, flight_id: str, since: float, until: float | None = None
+    ) -> List[RIDRecentAircraftPosition]:
+        """
+        Stored positions of a flight after `since` and before `until`, as
+        RID recent positions.
+        """
+        points = self.trail(flight_id, since=since)
+        if until is not None:
+            points = points[points["t"] < until]
+
+        return [
+            RIDRecentAircraftPosition(
+                time=Time(
+                    value=datetime.fromtimestamp(t, timezone.utc),
+                    format=TimeFormat.RFC3339,
+                ),
+                position=RIDAircraftPosition(
+                    lat=lat,
+                    lng=lng,
+                    alt=UNKNOWN_ALTITUDE if alt != alt else alt,
+                ),
+            )
+            for t, lat, lng, alt in zip(
+                points["t"].tolist(),
+                points["lat"].tolist(),
+                points["lng"].tolist(),
+                points["alt"].tolist(),
+            )
+        ]
+
+    def _slot(self, flight_id: str, now: float, taken: Set[int]) -> int | None:
+        slot = self._slots.get(flight_id)
+        if slot is not None:
+            return slot
+
+        if not self._free:
+            # Every slot is in use, recycle the least recently seen flight
+            # outside of the batch, or drop the flight when there is none
+            last_seen = self._last_seen.copy()
+            last_seen[list(taken)] = np.inf
+            oldest = int(np.argmin(last_seen))
+            if last_seen[oldest] == np.inf:
+                return None
+            self._release(oldest)
+
+        slot = self._free.pop()
+        self._slots[flight_id] = slot
+        self._flight_ids[slot] = flight_id
+        self._last_seen[slot] = now
+        taken.add(slot)
+        return slot
+
+    def _release(self, slot: int) -> None:
+        flight_id = self._flight_ids[slot]
+        if flight_id is not None:
+            del self._slots[flight_id]
+
+        self._flight_ids[slot] = None
+        self._head[slot] = 0
+        self._count[slot] = 0
+        self._last_t[slot] = -np.inf
+        self._last_seen[slot] = np.inf
+        self._free.append(slot)
+
+    def _evict_idle(self, now: float) -> None:
+        idle = np.nonzero(now - self._last_seen > self._idle_timeout)[0]
+        for slot in idle.tolist():
+            self._release(slot)
@@ -0,0 +1,239 @@
+import asyncio
+import base64
+import hashlib
+import json
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+from threading import Lock
+import httpx
+
+from config.config import get_settings
+from services.cache import register_cache
+
+# Query parameters holding credentials, never written to an archive
+REDACTED_PARAMS = ("apikey",)
+
+# Paths answering with credentials, exchanged but never written to an archive
+CREDENTIAL_PATHS = ("/token",)
+
+# Exchanges waiting to be written before new ones are dropped
+ARCHIVE_QUEUE_SIZE = 1024
+
+# Headers describing the wire encoding, the archive stores decoded bodies
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def _url(request: httpx.Request) -> str:
+    url = request.url
+    for param in REDACTED_PARAMS:
+        if param in url.params:
+            url = url.copy_set_param(param, "REDACTED")
+    return str(url)
+
+
+def _exact_key(request: httpx.Request) -> Tuple[str, str, str]:
+    digest = hashlib.sha1(request.content).hexdigest()
+    return request.method, _url(request), digest
+
+
+def _route_key(request: httpx.Request) -> Tuple[str, str, str]:
+    return request.method, request.url.host, request.url.path
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Forwards the requests to the network and appends every exchange to a
+    JSON lines archive, with the time the upstream took to answer.
+    Authorization headers, credentials and the token exchanges are not
+    recorded.
+
+    Exchanges are queued and written by a background thread, so recording
+    never blocks the event loop. When the queue is full the exchange is
+    dropped and counted.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._queue: queue.Queue = queue.Queue(maxsize=ARCHIVE_QUEUE_SIZE)
+        self._thread_lock = Lock()
+        self._thread: threading.Thread | None = None
+        self._transport = httpx.AsyncHTTPTransport()
+        self.dropped = 0
+
+    async def handle_async_request(
+        self, request: httpx.Request
+    ) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        content = await response.aread()
+        elapsed = time.perf_counter() - start
+
+        headers = [
+            [name, value] for name, value in response.headers.items()
+            if name.lower() not in DROPPED_HEADERS
+        ]
+
+        if request.url.path not in CREDENTIAL_PATHS:
+            self._start()
+            try:
+                self._queue.put_nowait({
+                    "method": request.method,
+                    "url": _url(request),
+                    "body_sha1": hashlib.sha1(request.content).hexdigest(),
+                    "status": response.status_code,
+                    "headers": headers,
+                    "content": content,
+                    "elapsed": elapsed,
+                    "recorded_at": time.time(),
+                })
+            except queue.Full:
+                self.dropped += 1
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            content=content,
+            request=request,
+        )
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="upstream-recorder", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        with open(self._path, "a", encoding="utf-8") as file:
+            while True:
+                entry = self._queue.get()
+                try:
+                    entry["content"] = base64.b64encode(
+                        entry["content"]).decode("ascii")
+                    file.write(
+                        json.dumps(entry, separators=(",", ":")) + "\n")
+                    file.flush()
+                except Exception as e:
+                    print("Error writing upstream archive:", e)
+
+    async def aclose(self) -> None:
+        # Shared by every upstream client, lives as long as the process
+        pass
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves the responses of an archive written by RecordingTransport.
+
+    A request is matched on method, URL and body first, then on method,
+    host and path only, since DSS queries carry the current time. Matching
+    entries are served in the recorded order, wrapping around, each one
+    delayed by its recorded duration divided by `speed`. Requests without
+    any recorded match get a 404.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self._speed = speed
+        self._exact: Dict[Tuple[str, str, str], List[dict]] = defaultdict(list)
+        self._routes: Dict[Tuple[str, str, str], List[dict]] = \
+            defaultdict(list)
+        self._served: Counter = Counter()
+        self.requests: Counter = Counter()
+        self.missing: Counter = Counter()
+
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                request = httpx.Request(entry["method"], entry["url"])
+                self._exact[(
+                    entry["method"], entry["url"], entry["body_sha1"]
+                )].append(entry)
+                self._routes[_route_key(request)].append(entry)
+
+        register_cache(
+            "transport.replay",
+            lambda: len(self),
+            lambda: (self._exact, self._routes),
+        )
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._routes.values())
+
+    async def handle_async_request(
+        self, request: httpx.Request
+    ) -> httpx.Response:
+        await request.aread()
+
+        key = _exact_key(request)
+        entries = self._exact.get(key)
+        if not entries:
+            key = _route_key(request)
+            entries = self._routes.get(key)
+
+        route = f"{request.method} {request.url.path}"
+        self.requests[route] += 1
+
+        if not entries:
+            self.missing[route] += 1
+            return httpx.Response(
+                status_code=404,
+                json={"message": "No recorded response for this request."},
+                request=request,
+            )
+
+        entry = entries[self._served[key] % len(entries)]
+        self._served[key] += 1
+
+        if self._speed > 0:
+            await asyncio.sleep(entry["elapsed"] / self._speed)
+
+        return httpx.Response(
+            status_code=entry["status"],
+            headers=entry["headers"],
+            content=base64.b64decode(entry["content"]),
+            request=request,
+        )
+
+    def reset(self) -> None:
+        self._served.clear()
+        self.requests.clear()
+        self.missing.clear()
+
+
+_transport: httpx.AsyncBaseTransport | None = None
+_transport_lock = Lock()
+_transport_loaded = False
+
+
+def upstream_transport() -> httpx.AsyncBaseTransport | None:
+    """
+    Returns the transport shared by the upstream clients when recording or
+    replay is configured, None to use the default network transport.
+    """
+    global _transport, _transport_loaded
+
+    if not _transport_loaded:
+        with _transport_lock:
+            if not _transport_loaded:
+                settings = get_settings()
+
+                if settings.UPSTREAM_REPLAY_PATH:
+                    _transport = ReplayTransport(
+                        settings.UPSTREAM_REPLAY_PATH,
+                        settings.UPSTREAM_REPLAY_SPEED,
+                    )
+                elif settings.UPSTREAM_RECORD_PATH:
+                    _transport = RecordingTransport(
+                        settings.UPSTREAM_RECORD_PATH)
+
+                _transport_loaded = True
+
+    return _transport
@@ -41,11 +41,6 @@ class USSOperationalIntentsService:
             raise ValueError(
                 "No response received from USS Operational Intents Service.")
 
-        print("=== Requesting USS Operational Intent Details ===")
-        print("Response status code:", response.status_code)
-        print("Response headers:", response.headers)
-        print("Response body:", response.text)
-
         if response.status_code != 200:
             raise ValueError(
                 f"Error getting operational intent details: {response.text}"
@@ -0,0 +1,294 @@
+import json
+import struct
+from typing import Any, Dict, List, Tuple
+from fastapi import Request
+from fastapi.responses import Response as HTTPResponse
+import numpy as np
+
+from schemas.fetch import QueryVolumesResponseData
+from schemas.flights import QueryFlightsResponse
+from schemas.response import Response
+from services.metrics import span
+
+# Media type of the columnar encoding, requested through the Accept header
+COLUMNAR_MEDIA_TYPE = "application/vnd.utm-observer.columnar"
+
+MAGIC = b"UTMC"
+VERSION = 1
+
+# Buffers start at multiples of 8 bytes, so typed arrays can view them
+ALIGNMENT = 8
+
+# Code of a missing value in the dictionary encoded columns
+NULL_CODE = 0xFFFFFFFF
+
+# Reference fields of the volumes sent as codes into the string table
+DICTIONARY_FIELDS = ("manager", "owner", "uss_base_url")
+
+
+def accepts_columnar(request: Request) -> bool:
+    return COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % ALIGNMENT)
+
+
+class ColumnarWriter:
+    """
+    Builds a columnar payload: a JSON manifest with the document, the string
+    table and the column layout, followed by the little endian buffers of
+    the columns.
+
+        "UTMC" | version u8 | 3 zero bytes | manifest length u32 | manifest
+        | padding | buffers, each aligned to 8 bytes
+
+    Column offsets are relative to the first buffer.
+    """
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self.strings: List[str] = []
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def code(self, value: str | None) -> int:
+        if value is None:
+            return NULL_CODE
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def codes(self, values: List[str | None]) -> np.ndarray:
+        return np.array([self.code(value) for value in values],
+                        dtype="<u4")
+
+    def column(self, name: str, values: Any, dtype: str) -> None:
+        self._columns[name] = np.ascontiguousarray(values, dtype=dtype)
+
+    def encode(self, document: Any) -> bytes:
+        layout = {}
+        buffers = []
+        offset = 0
+        for name, values in self._columns.items():
+            data = values.tobytes()
+            layout[name] = {
+                "dtype": values.dtype.str,
+                "offset": offset,
+                "length": len(values),
+            }
+            buffers.append(data + _padding(len(data)))
+            offset += len(buffers[-1])
+
+        manifest = json.dumps({
+            "document": document,
+            "strings": self.strings,
+            "columns": layout,
+        }, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+        header = MAGIC + struct.pack("<B3xI", VERSION, len(manifest))
+        return b"".join(
+            [header, manifest, _padding(len(header) + len(manifest)),
+             *buffers])
+
+
+def read_columnar(payload: bytes) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """
+    Parses a columnar payload into its manifest and column arrays.
+    """
+    if payload[:4] != MAGIC:
+        raise ValueError("Not a columnar payload.")
+
+    version, size = struct.unpack_from("<B3xI", payload, 4)
+    if version != VERSION:
+        raise ValueError(f"Unsupported columnar version {version}.")
+
+    start = 12 + size
+    manifest = json.loads(payload[12:start])
+    start += -start % ALIGNMENT
+
+    columns = {
+        name: np.frombuffer(
+            payload, dtype=column["dtype"], count=column["length"],
+            offset=start + column["offset"],
+        )
+        for name, column in manifest["columns"].items()
+    }
+    return manifest, columns
+
+
+def _optional(values: List[float | None]) -> List[float]:
+    return [np.nan if value is None else value for value in values]
+
+
+def encode_flights(message: str | None, data: QueryFlightsResponse) -> bytes:
+    """
+    Flights as one row per flight: positions and kinematics as typed
+    arrays, ids, types, providers and accuracies as codes into the string
+    table, recent positions flattened with per-flight offsets. Service
+    areas are sent once and referenced by index, details stay in the
+    document.
+    """
+    writer = ColumnarWriter()
+    flights = data.flights
+    states = [flight.current_state for flight in flights]
+    positions = [state.position if state else None for state in states]
+
+    writer.column("id", writer.codes([f.id for f in flights]), "<u4")
+    writer.column("aircraft_type", writer.codes(
+        [f.aircraft_type.value for f in flights]), "<u4")
+    writer.column("simulated", [bool(f.simulated) for f in flights], "u1")
+
+    service_areas: Dict[str, int] = {}
+    service_area_documents = []
+    for flight in flights:
+        service_area = flight.identification_service_area
+        if service_area.id not in service_areas:
+            service_areas[service_area.id] = len(service_area_documents)
+            service_area_documents.append(
+                service_area.model_dump(mode="json"))
+    writer.column("service_area", [
+        service_areas[f.identification_service_area.id] for f in flights
+    ], "<u4")
+    writer.column("provider", writer.codes(
+        [f.identification_service_area.owner for f in flights]), "<u4")
+
+    writer.column("timestamp", _optional([
+        state.timestamp.value.timestamp() if state else None
+        for state in states
+    ]), "<f8")
+    writer.column("timestamp_accuracy", _optional([
+        state.timestamp_accuracy if state else None for state in states
+    ]), "<f4")
+    writer.column("lat", _optional(
+        [p.lat if p else None for p in positions]), "<f8")
+    writer.column("lng", _optional(
+        [p.lng if p else None for p in positions]), "<f8")
+    writer.column("alt", _optional(
+        [p.alt if p else None for p in positions]), "<f4")
+    writer.column("pressure_altitude", _optional(
+        [p.pressure_altitude if p else None for p in positions]), "<f4")
+    writer.column("extrapolated", [
+        bool(p and p.extrapolated) for p in positions], "u1")
+    writer.column("accuracy_h", writer.codes([
+        p.accuracy_h.value if p and p.accuracy_h else None
+        for p in positions
+    ]), "<u4")
+    writer.column("accuracy_v", writer.codes([
+        p.accuracy_v.value if p and p.accuracy_v else None
+        for p in positions
+    ]), "<u4")
+    writer.column("speed_accuracy", writer.codes([
+        state.speed_accuracy.value if state else None for state in states
+    ]), "<u4")
+    writer.column("operational_status", writer.codes([
+        state.operational_status.value
+        if state and state.operational_status else None
+        for state in states
+    ]), "<u4")
+    for field in ("track", "speed", "vertical_speed"):
+        writer.column(field, _optional([
+            getattr(state, field) if state else None for state in states
+        ]), "<f4")
+
+    recent = [f.recent_positions or [] for f in flights]
+    writer.column(
+        "recent_offset",
+        np.concatenate([[0], np.cumsum([len(r) for r in recent])]),
+        "<u4",
+    )
+    points = [point for positions in recent for point in positions]
+    writer.column("recent_time", [
+        point.time.value.timestamp() for point in points], "<f8")
+    writer.column("recent_lat", [point.position.lat for point in points],
+                  "<f8")
+    writer.column("recent_lng", [point.position.lng for point in points],
+                  "<f8")
+    writer.column("recent_alt", _optional(
+        [point.position.alt for point in points]), "<f4")
+
+    document = data.model_dump(
+        mode="json", exclude={"flights"}, exclude_none=True)
+    document["flights"] = {
+        "count": len(flights),
+        "service_areas": service_area_documents,
+        "details": [
+            f.details.model_dump(mode="json") if f.details else None
+            for f in flights
+        ],
+        "operating_areas": [
+            f.operating_area.model_dump(mode="json")
+            if f.operating_area else None
+            for f in flights
+        ],
+    }
+
+    return writer.encode({"message": message, "data": document})
+
+
+def _pack_volumes(node: Any, writer: ColumnarWriter,
+                  lat: List[float], lng: List[float]) -> None:
+    """
+    Moves the polygon vertices found in a dumped document into the vertex
+    columns, leaving their offset and count, and replaces the dictionary
+    fields with their codes.
+    """
+    if isinstance(node, list):
+        for item in node:
+            _pack_volumes(item, writer, lat, lng)
+        return
+    if not isinstance(node, dict):
+        return
+
+    for field in DICTIONARY_FIELDS:
+        if isinstance(node.get(field), str):
+            node[field] = writer.code(node[field])
+
+    polygon = node.get("outline_polygon")
+    if isinstance(polygon, dict) and isinstance(polygon.get("vertices"), list):
+        vertices = polygon["vertices"]
+        polygon["vertices"] = {"offset": len(lat), "count": len(vertices)}
+        lat.extend(vertex["lat"] for vertex in vertices)
+        lng.extend(vertex["lng"] for vertex in vertices)
+
+    for value in node.values():
+        _pack_volumes(value, writer, lat, lng)
+
+
+def encode_volumes(
+    message: str | None, data: QueryVolumesResponseData
+) -> bytes:
+    """
+    Volumes as the JSON document with every polygon outline replaced by a
+    range of the vertex columns, and the managers, owners and USS base URLs
+    replaced by codes into the string table.
+    """
+    writer = ColumnarWriter()
+    document = data.model_dump(mode="json")
+    lat: List[float] = []
+    lng: List[float] = []
+
+    _pack_volumes(document, writer, lat, lng)
+    writer.column("vertex_lat", lat, "<f8")
+    writer.column("vertex_lng", lng, "<f8")
+
+    return writer.encode({"message": message, "data": document})
+
+
+ENCODERS = {
+    QueryFlightsResponse: encode_flights,
+    QueryVolumesResponseData: encode_volumes,
+}
+
+
+class ColumnarResponse(HTTPResponse):
+    """
+    Columnar encoding of an API response, timed as the "encode" span.
+    """
+    media_type = COLUMNAR_MEDIA_TYPE
+
+    def render(self, content: Response) -> bytes:
+        with span("encode"):
+            encoder = ENCODERS[type(content.data)]
+            return encoder(content.message, content.data)
@@ -0,0 +1,437 @@
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+
+from schemas.common.base import Time
+from schemas.common.enums import (
+    FlightType,
+    HorizontalAccuracy,
+    OperationalIntentState,
+    RIDOperationalStatus,
+    SpeedAccuracy,
+    TimeFormat,
+    UAType,
+    UssAvailabilityState,
+    VerticalAccuracy,
+)
+from schemas.common.geo import GeoZone, Volume4D
+from schemas.dss.common import ConstraintReference, OperationalIntentReference
+from schemas.dss.remoteid import IdentificationServiceArea
+from schemas.uss.common import (
+    Constraint,
+    ConstraintDetails,
+    OperationalIntent,
+    OperationalIntentDetails,
+)
+from schemas.uss.remoteid import (
+    UASID,
+    RIDAircraftPosition,
+    RIDAircraftState,
+    RIDFlight,
+    RIDFlightDetails,
+    RIDRecentAircraftPosition,
+)
+from services.spatial import EARTH_RADIUS_M
+from simulator.config import SimulatorSettings
+
+# Validity of every generated entity around the generation time
+ENTITY_LIFETIME = timedelta(hours=12)
+
+ACTIVE_STATES = (
+    OperationalIntentState.ACTIVATED,
+    OperationalIntentState.NONCONFORMING,
+    OperationalIntentState.CONTINGENT,
+)
+
+
+def _time(value: datetime) -> Time:
+    return Time(value=value, format=TimeFormat.RFC3339)
+
+
+@dataclass
+class SimulatedFlight:
+    """
+    Aircraft orbiting a center point, its state is a closed form of time.
+    """
+    id: str
+    uss: int
+    registration_id: str
+    operational_intent_id: UUID | None
+    x: float
+    y: float
+    radius: float
+    angular_speed: float
+    phase: float
+    alt: float
+
+
+class Airspace:
+    """
+    Seeded synthetic airspace served by the simulator: operational intents,
+    constraints, identification service areas and live flights spread over
+    the configured USS origins.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __init__(self, settings: SimulatorSettings):
+        self.settings = settings
+        self.generated_at = datetime.now(timezone.utc)
+
+        self.operational_intents: Dict[UUID, OperationalIntent] = {}
+        self.operational_intent_uss: Dict[UUID, int] = {}
+        self.constraints: Dict[UUID, Constraint] = {}
+        self.constraint_uss: Dict[UUID, int] = {}
+        self.service_areas: Dict[str, Tuple[IdentificationServiceArea, Volume4D]] = {}
+        self.flights: Dict[str, SimulatedFlight] = {}
+
+        self._rng = random.Random(settings.SEED)
+        self._generate()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls(SimulatorSettings())
+        return cls._instance
+
+    @classmethod
+    def reset(cls, settings: SimulatorSettings) -> "Airspace":
+        with cls._lock:
+            cls._instance = cls(settings)
+        return cls._instance
+
+    def uss_base_url(self, uss: int) -> str:
+        return f"{self.settings.BASE_URL.rstrip('/')}/uss/{uss}"
+
+    def manager(self, uss: int) -> str:
+        return f"uss{uss}"
+
+    # Geometry helpers
+
+    def to_lat_lng(self, x: float, y: float) -> Tuple[float, float]:
+        lat0 = self.settings.CENTER_LAT
+        lat = lat0 + math.degrees(y / EARTH_RADIUS_M)
+        lng = self.settings.CENTER_LNG + math.degrees(
+            x / (EARTH_RADIUS_M * math.cos(math.radians(lat0))))
+        return lat, lng
+
+    def _random_point(self, margin: float = 0) -> Tuple[float, float]:
+        radius = (self.settings.RADIUS_M - margin) * \
+            math.sqrt(self._rng.random())
+        angle = self._rng.uniform(0, 2 * math.pi)
+        return radius * math.cos(angle), radius * math.sin(angle)
+
+    def _polygon(
+        self, x: float, y: float, radius: float
+    ) -> List[Dict[str, float]]:
+        sides = self._rng.randint(6, 12)
+        vertices = []
+        for i in range(sides):
+            angle = 2 * math.pi * i / sides
+            r = radius * self._rng.uniform(0.8, 1.0)
+            lat, lng = self.to_lat_lng(
+                x + r * math.cos(angle), y + r * math.sin(angle))
+            vertices.append({"lat": lat, "lng": lng})
+        return vertices
+
+    def _volume(
+        self, outline: dict, lower: float, upper: float
+    ) -> Volume4D:
+        return Volume4D.model_validate({
+            "volume": {
+                **outline,
+                "altitude_lower": {
+                    "value": lower, "reference": "W84", "units": "M"},
+                "altitude_upper": {
+                    "value": upper, "reference": "W84", "units": "M"},
+            },
+            "time_start": _time(self.generated_at - ENTITY_LIFETIME),
+            "time_end": _time(self.generated_at + ENTITY_LIFETIME),
+        })
+
+    # Generation
+
+    def _generate(self) -> None:
+        settings = self.settings
+        uss_count = max(1, settings.USS_COUNT)
+
+        centers: List[Tuple[UUID, int, float, float, float, float]] = []
+
+        for i in range(settings.OPERATIONAL_INTENTS):
+            uss = i % uss_count
+            entity_id = UUID(int=self._rng.getrandbits(128), version=4)
+            x, y = self._random_point(margin=2000)
+            radius = self._rng.uniform(300, 1500)
+            lower = self._rng.uniform(600, 700)
+            upper = lower + self._rng.uniform(60, 150)
+
+            # Consecutive overlapping segments along a corridor
+            heading = self._rng.uniform(0, 2 * math.pi)
+            volumes = []
+            for segment in range(self._rng.randint(1, 4)):
+                offset = segment * radius
+                volumes.append(self._volume(
+                    {"outline_polygon": {"vertices": self._polygon(
+                        x + offset * math.cos(heading),
+                        y + offset * math.sin(heading),
+                        radius,
+                    )}},
+                    lower,
+                    upper,
+                ))
+
+            state = self._rng.choices(
+                list(OperationalIntentState), weights=[4, 10, 1, 1])[0]
+
+            self.operational_intents[entity_id] = OperationalIntent(
+                reference=OperationalIntentReference(
+                    id=entity_id,
+                    flight_type=self._rng.choice(
+                        [FlightType.VLOS, FlightType.EVLOS, FlightType.BVLOS]),
+                    manager=self.manager(uss),
+                    uss_availability=UssAvailabilityState.NORMAL,
+                    version=1,
+                    state=state,
+                    ovn=f"ovn-{entity_id.hex[:12]}",
+                    time_start=volumes[0].time_start,
+                    time_end=volumes[0].time_end,
+                    uss_base_url=self.uss_base_url(uss),
+                ),
+                details=OperationalIntentDetails(
+                    volumes=volumes,
+                    priority=0,
+                ),
+            )
+            self.operational_intent_uss[entity_id] = uss
+
+            if state in ACTIVE_STATES:
+                centers.append((entity_id, uss, x, y, radius, lower))
+
+        for i in range(settings.CONSTRAINTS):
+            uss = i % uss_count
+            entity_id = UUID(int=self._rng.getrandbits(128), version=4)
+            x, y = self._random_point()
+            radius = self._rng.uniform(200, 3000)
+
+            if self._rng.random() < 0.3:
+                lat, lng = self.to_lat_lng(x, y)
+                outline = {"outline_circle": {
+                    "center": {"lat": lat, "lng": lng},
+                    "radius": {"value": radius, "units": "M"},
+                }}
+            else:
+                outline = {"outline_polygon": {
+                    "vertices": self._polygon(x, y, radius)}}
+
+            volume = self._volume(outline, 0, self._rng.uniform(700, 1200))
+            identifier = f"SIM{i:04d}"
+
+            self.constraints[entity_id] = Constraint(
+                reference=ConstraintReference(
+                    id=entity_id,
+                    manager=self.manager(uss),
+                    uss_availability=UssAvailabilityState.NORMAL,
+                    version=1,
+                    ovn=f"ovn-{entity_id.hex[:12]}",
+                    time_start=volume.time_start,
+                    time_end=volume.time_end,
+                    uss_base_url=self.uss_base_url(uss),
+                ),
+                details=ConstraintDetails(
+                    volumes=[volume],
+                    type="GeoZone",
+                    geozone=GeoZone(
+                        identifier=identifier,
+                        country="BRA",
+                        zone_authority=[],
+                        type="COMMON",
+                        restriction="REQ_AUTHORISATION",
+                        name=f"Simulated zone {identifier}",
+                    ),
+                ),
+            )
+            self.constraint_uss[entity_id] = uss
+
+        # Every USS declares one ISA over the whole simulated area
+        for uss in range(uss_count):
+            service_area_id = str(
+                UUID(int=self._rng.getrandbits(128), version=4))
+            extents = self._volume(
+                {"outline_polygon": {"vertices": self._polygon(
+                    0, 0, settings.RADIUS_M * 1.2)}},
+                0,
+                3000,
+            )
+            service_area = IdentificationServiceArea(
+                id=service_area_id,
+                uss_base_url=self.uss_base_url(uss),
+                owner=self.manager(uss),
+                version="1",
+                time_start=extents.time_start,
+                time_end=extents.time_end,
+            )
+            self.service_areas[service_area_id] = (service_area, extents)
+
+        for i in range(settings.FLIGHTS):
+            flight_id = str(UUID(int=self._rng.getrandbits(128), version=4))
+
+            if centers:
+                entity_id, uss, x, y, radius, lower = centers[i % len(centers)]
+                # A few aircraft fly outside of their operational intent
+                orbit = radius * (
+                    1.5 if self._rng.random() < 0.05
+                    else self._rng.uniform(0.1, 0.6))
+                alt = lower + 30
+            else:
+                entity_id, uss = None, i % uss_count
+                x, y = self._random_point()
+                orbit = self._rng.uniform(100, 1000)
+                alt = self._rng.uniform(650, 750)
+
+            self.flights[flight_id] = SimulatedFlight(
+                id=flight_id,
+                uss=uss,
+                registration_id=f"BR-{flight_id[:8].upper()}",
+                operational_intent_id=entity_id,
+                x=x,
+                y=y,
+                radius=orbit,
+                angular_speed=self._rng.uniform(5, 20) / max(orbit, 1),
+                phase=self._rng.uniform(0, 2 * math.pi),
+                alt=alt,
+            )
+
+    # Flight state
+
+    def flight_state(
+        self, flight: SimulatedFlight, t: float
+    ) -> Tuple[float, float, float, float, float]:
+        """
+        Returns (lat, lng, alt, speed, track) of a flight at time t.
+        """
+        angle = flight.phase + flight.angular_speed * t
+        lat, lng = self.to_lat_lng(
+            flight.x + flight.radius * math.cos(angle),
+            flight.y + flight.radius * math.sin(angle),
+        )
+        speed = flight.radius * flight.angular_speed
+        track = (90 - math.degrees(angle + math.pi / 2)) % 360
+        return lat, lng, flight.alt, speed, track
+
+    def _aircraft_state(
+        self, flight: SimulatedFlight, t: float
+    ) -> RIDAircraftState:
+        lat, lng, alt, speed, track = self.flight_state(flight, t)
+        return RIDAircraftState(
+            timestamp=_time(datetime.fromtimestamp(t, timezone.utc)),
+            timestamp_accuracy=0.0,
+            operational_status=RIDOperationalStatus.Airborne,
+            position=RIDAircraftPosition(
+                lat=lat,
+                lng=lng,
+                alt=alt,
+                accuracy_h=HorizontalAccuracy.HA10m,
+                accuracy_v=VerticalAccuracy.VA10m,
+                extrapolated=False,
+                pressure_altitude=-1000,
+            ),
+            track=track,
+            speed=speed,
+            speed_accuracy=SpeedAccuracy.SA1mps,
+            vertical_speed=0.0,
+        )
+
+    def search_flights(
+        self,
+        uss: int,
+        bounds: Tuple[float, float, float, float],
+        recent_positions_duration: float = 0,
+    ) -> List[RIDFlight]:
+        """
+        Returns the flights of a USS inside (min_lat, min_lng, max_lat,
+        max_lng), with one recent position per second of the duration.
+        """
+        min_lat, min_lng, max_lat, max_lng = bounds
+        now = time.time()
+
+        flights = []
+        for flight in self.flights.values():
+            if flight.uss != uss:
+                continue
+
+            state = self._aircraft_state(flight, now)
+            position = state.position
+            if not (min_lat <= position.lat <= max_lat
+                    and min_lng <= position.lng <= max_lng):
+                continue
+
+            recent_positions = []
+            for age in range(int(recent_positions_duration), 0, -1):
+                recent_state = self._aircraft_state(flight, now - age)
+                recent_positions.append(RIDRecentAircraftPosition(
+                    time=recent_state.timestamp,
+                    position=recent_state.position,
+                ))
+
+            flights.append(RIDFlight(
+                id=flight.id,
+                aircraft_type=UAType.HybridLift,
+                current_state=state,
+                simulated=True,
+                recent_positions=recent_positions,
+            ))
+
+        return flights
+
+    def flight_details(self, flight: SimulatedFlight) -> RIDFlightDetails:
+        return RIDFlightDetails(
+            id=flight.id,
+            uas_id=UASID(registration_id=flight.registration_id),
+            operator_id=f"OP-{flight.uss:03d}",
+            operation_description="Simulated flight",
+        )
+
+
+def volume_bounds(volume: Volume4D) -> Tuple[float, float, float, float]:
+    volume3d = volume.volume
+    if volume3d.outline_polygon is not None:
+        lats = [v.lat for v in volume3d.outline_polygon.vertices]
+        lngs = [v.lng for v in volume3d.outline_polygon.vertices]
+        return min(lats), min(lngs), max(lats), max(lngs)
+
+    circle = volume3d.outline_circle
+    dlat = math.degrees(circle.radius.value / EARTH_RADIUS_M)
+    dlng = dlat / max(math.cos(math.radians(circle.center.lat)), 1e-6)
+    return circle.center.lat - dlat, circle.center.lng - dlng, \
+        circle.center.lat + dlat, circle.center.lng + dlng
+
+
+def bounds_overlap(
+    a: Tuple[float, float, float, float],
+    b: Tuple[float, float, float, float],
+) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def intersects(volume: Volume4D, area: Volume4D) -> bool:
+    """
+    Bounding box test between two volumes, which is enough for a stand-in
+    of the DSS area queries.
+    """
+    return bounds_overlap(volume_bounds(volume), volume_bounds(area))
+
+
+def parse_area(area: str) -> Tuple[float, float, float, float]:
+    """
+    Bounds of a "lat,lng,lat,lng,..." area string.
+    """
+    values = [float(value) for value in area.split(",")]
+    lats, lngs = values[0::2], values[1::2]
+    return min(lats), min(lngs), max(lats), max(lngs)
@@ -0,0 +1,44 @@
+import asyncio
+import random
+from fastapi import FastAPI, Request
+
+from simulator.airspace import Airspace
+from simulator.routes.auth import router as AuthRouter
+from simulator.routes.control import router as ControlRouter, request_counts
+from simulator.routes.dss import router as DSSRouter
+from simulator.routes.uss import router as USSRouter
+
+app = FastAPI(
+    title="UTM Observer Simulator",
+    description="Local stand-in of the BR-UTM DSS and USS APIs with a \
+    seeded synthetic airspace, for load and integration testing",
+    version="1.0.0",
+)
+
+
+@app.middleware("http")
+async def upstream_latency_middleware(request: Request, call_next):
+    """
+    Counts the served requests and adds the configured latency to every
+    endpoint except the simulator controls.
+    """
+    if not request.url.path.startswith("/_sim"):
+        settings = Airspace.get_instance().settings
+        latency = settings.LATENCY_MS + random.uniform(
+            -settings.LATENCY_JITTER_MS, settings.LATENCY_JITTER_MS)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    response = await call_next(request)
+
+    route = request.scope.get("route")
+    if route is not None and not request.url.path.startswith("/_sim"):
+        request_counts[f"{request.method} {route.path}"] += 1
+
+    return response
+
+
+app.include_router(AuthRouter, tags=["Auth"])
+app.include_router(DSSRouter, tags=["DSS"])
+app.include_router(USSRouter, tags=["USS"], prefix="/uss")
+app.include_router(ControlRouter, tags=["Simulator"], prefix="/_sim")
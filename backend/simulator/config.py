@@ -0,0 +1,26 @@
+from pydantic_settings import BaseSettings
+
+
+class SimulatorSettings(BaseSettings):
+    """
+    Size and behaviour of the synthetic airspace, read from SIM_* variables.
+    """
+    BASE_URL: str = "http://localhost:8090"
+    SEED: int = 0
+
+    USS_COUNT: int = 3
+    OPERATIONAL_INTENTS: int = 100
+    CONSTRAINTS: int = 20
+    FLIGHTS: int = 200
+
+    # Area covered by the airspace, around São José dos Campos by default
+    CENTER_LAT: float = -23.208718442978252
+    CENTER_LNG: float = -45.87002908222274
+    RADIUS_M: float = 20000
+
+    # Latency added to every upstream response, in milliseconds
+    LATENCY_MS: float = 0
+    LATENCY_JITTER_MS: float = 0
+
+    class Config:
+        env_prefix = "SIM_"
@@ -0,0 +1,41 @@
+import time
+import jwt
+from http import HTTPStatus
+from fastapi import APIRouter, Query
+
+from schemas.token import TokenResponse
+
+router = APIRouter()
+
+TOKEN_LIFETIME = 3600
+
+
+@router.get(
+    "/token",
+    response_model=TokenResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_token(
+    intended_audience: str = Query(),
+    scope: str = Query(),
+    apikey: str | None = Query(None),
+):
+    """
+    Issues an unsigned-equivalent token accepted by the observer, which
+    never verifies signatures.
+    """
+    now = int(time.time())
+
+    access_token = jwt.encode(
+        {
+            "aud": intended_audience,
+            "exp": now + TOKEN_LIFETIME,
+            "iss": "utm-observer-simulator",
+            "scope": scope,
+            "sub": apikey or "simulator",
+        },
+        "simulator",
+        algorithm="HS256",
+    )
+
+    return TokenResponse(access_token=access_token)
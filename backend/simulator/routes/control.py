@@ -0,0 +1,79 @@
+from collections import Counter
+from http import HTTPStatus
+from typing import Dict
+from fastapi import APIRouter
+
+from schemas.response import Response
+from simulator.airspace import Airspace
+from simulator.config import SimulatorSettings
+
+router = APIRouter()
+
+# Requests served per "<METHOD> <route>" since the last reset
+request_counts: Counter = Counter()
+
+
+@router.get(
+    "/stats",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_stats():
+    airspace = Airspace.get_instance()
+
+    return Response(
+        message="Simulator statistics",
+        data={
+            "requests": dict(request_counts),
+            "total_requests": sum(request_counts.values()),
+            "operational_intents": len(airspace.operational_intents),
+            "constraints": len(airspace.constraints),
+            "service_areas": len(airspace.service_areas),
+            "flights": len(airspace.flights),
+        },
+    )
+
+
+@router.delete(
+    "/stats",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def reset_stats():
+    request_counts.clear()
+
+    return Response(message="Simulator statistics reset")
+
+
+@router.get(
+    "/config",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_config():
+    return Response(
+        message="Simulator configuration",
+        data=Airspace.get_instance().settings,
+    )
+
+
+@router.put(
+    "/config",
+    response_model=Response,
+    status_code=HTTPStatus.OK.value,
+)
+async def update_config(changes: Dict[str, float | int | str]):
+    """
+    Regenerates the airspace with the given settings overrides.
+    """
+    current = Airspace.get_instance().settings
+    settings = SimulatorSettings.model_validate(
+        {**current.model_dump(), **changes})
+
+    airspace = Airspace.reset(settings)
+    request_counts.clear()
+
+    return Response(
+        message="Simulator airspace regenerated",
+        data=airspace.settings,
+    )
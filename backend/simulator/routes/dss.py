@@ -0,0 +1,87 @@
+from http import HTTPStatus
+from fastapi import APIRouter, Query
+
+from schemas.dss.constraints import (
+    QueryConstraintReferenceParameters,
+    QueryConstraintReferencesResponse,
+)
+from schemas.dss.operational_intents import (
+    QueryOperationalIntentReferenceParameters,
+    QueryOperationalIntentReferenceResponse,
+)
+from schemas.dss.remoteid import SearchIdentificationServiceAreasResponse
+from simulator.airspace import (
+    Airspace,
+    bounds_overlap,
+    intersects,
+    parse_area,
+    volume_bounds,
+)
+
+router = APIRouter()
+
+
+@router.post(
+    "/dss/v1/operational_intent_references/query",
+    response_model=QueryOperationalIntentReferenceResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def query_operational_intent_references(
+    params: QueryOperationalIntentReferenceParameters,
+):
+    airspace = Airspace.get_instance()
+
+    return QueryOperationalIntentReferenceResponse(
+        operational_intent_references=[
+            operational_intent.reference
+            for operational_intent in airspace.operational_intents.values()
+            if params.area_of_interest is None or any(
+                intersects(volume, params.area_of_interest)
+                for volume in operational_intent.details.volumes
+            )
+        ],
+    )
+
+
+@router.post(
+    "/dss/v1/constraint_references/query",
+    response_model=QueryConstraintReferencesResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def query_constraint_references(
+    params: QueryConstraintReferenceParameters,
+):
+    airspace = Airspace.get_instance()
+
+    return QueryConstraintReferencesResponse(
+        constraint_references=[
+            constraint.reference
+            for constraint in airspace.constraints.values()
+            if params.area_of_interest is None or any(
+                intersects(volume, params.area_of_interest)
+                for volume in constraint.details.volumes
+            )
+        ],
+    )
+
+
+@router.get(
+    "/rid/v2/dss/identification_service_areas",
+    response_model=SearchIdentificationServiceAreasResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def search_identification_service_areas(
+    area: str = Query(),
+    earliest_time: str | None = Query(None),
+    latest_time: str | None = Query(None),
+):
+    airspace = Airspace.get_instance()
+    bounds = parse_area(area)
+
+    return SearchIdentificationServiceAreasResponse(
+        service_areas=[
+            service_area
+            for service_area, extents in airspace.service_areas.values()
+            if bounds_overlap(volume_bounds(extents), bounds)
+        ],
+    )
@@ -0,0 +1,152 @@
+import time
+from http import HTTPStatus
+from uuid import UUID
+from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException, Query
+
+from schemas.common.base import Time
+from schemas.common.enums import TimeFormat, VelocityUnitsSpeed
+from schemas.common.geo import Altitude, Position
+from schemas.uss.constraints import GetConstraintDetailsResponse
+from schemas.uss.operational_intents import GetOperationalIntentDetailsResponse
+from schemas.uss.remoteid import (
+    GetFlightDetailsResponse,
+    GetFlightsResponse,
+    GetIdentificationServiceAreaDetailsResponse,
+)
+from schemas.uss.telemetry import (
+    GetOperationalIntentTelemetryResponse,
+    Velocity,
+    VehicleTelemetry,
+)
+from simulator.airspace import Airspace, parse_area
+
+router = APIRouter()
+
+
+def _now() -> Time:
+    return Time(value=datetime.now(timezone.utc), format=TimeFormat.RFC3339)
+
+
+@router.get(
+    "/{uss}/uss/v1/operational_intents/{entity_id}",
+    response_model=GetOperationalIntentDetailsResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_operational_intent_details(uss: int, entity_id: UUID):
+    airspace = Airspace.get_instance()
+
+    if airspace.operational_intent_uss.get(entity_id) != uss:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND.value)
+
+    return GetOperationalIntentDetailsResponse(
+        operational_intent=airspace.operational_intents[entity_id],
+    )
+
+
+@router.get(
+    "/{uss}/uss/v1/operational_intents/{entity_id}/telemetry",
+    response_model=GetOperationalIntentTelemetryResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_operational_intent_telemetry(uss: int, entity_id: UUID):
+    airspace = Airspace.get_instance()
+
+    if airspace.operational_intent_uss.get(entity_id) != uss:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND.value)
+
+    flight = next(
+        (
+            flight for flight in airspace.flights.values()
+            if flight.operational_intent_id == entity_id
+        ),
+        None,
+    )
+    if flight is None:
+        return GetOperationalIntentTelemetryResponse(
+            operational_intent_id=entity_id,
+        )
+
+    lat, lng, alt, speed, track = airspace.flight_state(flight, time.time())
+
+    return GetOperationalIntentTelemetryResponse(
+        operational_intent_id=entity_id,
+        telemetry=VehicleTelemetry(
+            time_measured=_now(),
+            position=Position(
+                latitude=lat,
+                longitude=lng,
+                altitude=Altitude(value=alt, reference="W84", units="M"),
+            ),
+            velocity=Velocity(
+                speed=speed,
+                units_speed=VelocityUnitsSpeed.METERS_PER_SECOND,
+                track=track,
+            ),
+        ),
+    )
+
+
+@router.get(
+    "/{uss}/uss/v1/constraints/{entity_id}",
+    response_model=GetConstraintDetailsResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_constraint_details(uss: int, entity_id: UUID):
+    airspace = Airspace.get_instance()
+
+    if airspace.constraint_uss.get(entity_id) != uss:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND.value)
+
+    return GetConstraintDetailsResponse(
+        constraint=airspace.constraints[entity_id],
+    )
+
+
+@router.get(
+    "/{uss}/uss/flights",
+    response_model=GetFlightsResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def search_flights(
+    uss: int,
+    view: str = Query(),
+    recent_positions_duration: float = Query(0, ge=0, le=60),
+):
+    airspace = Airspace.get_instance()
+
+    return GetFlightsResponse(
+        timestamp=_now(),
+        flights=airspace.search_flights(
+            uss, parse_area(view), recent_positions_duration),
+    )
+
+
+@router.get(
+    "/{uss}/uss/flights/{flight_id}/details",
+    response_model=GetFlightDetailsResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_flight_details(uss: int, flight_id: str):
+    airspace = Airspace.get_instance()
+
+    flight = airspace.flights.get(flight_id)
+    if flight is None or flight.uss != uss:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND.value)
+
+    return GetFlightDetailsResponse(details=airspace.flight_details(flight))
+
+
+@router.get(
+    "/{uss}/uss/identification_service_areas/{area_id}",
+    response_model=GetIdentificationServiceAreaDetailsResponse,
+    status_code=HTTPStatus.OK.value,
+)
+async def get_identification_service_area_details(uss: int, area_id: str):
+    airspace = Airspace.get_instance()
+
+    entry = airspace.service_areas.get(area_id)
+    if entry is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND.value)
+
+    return GetIdentificationServiceAreaDetailsResponse(extents=entry[1])
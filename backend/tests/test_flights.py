@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from services.flights import resolve_flights
+
+
+def report(flight_id, owner, t=None, registration_id=None, sources=()):
+    details = None
+    if registration_id is not None:
+        details = SimpleNamespace(
+            uas_id=SimpleNamespace(registration_id=registration_id))
+    state = None
+    if t is not None:
+        state = SimpleNamespace(timestamp=SimpleNamespace(
+            value=datetime.fromtimestamp(t, timezone.utc)))
+    return SimpleNamespace(
+        id=flight_id,
+        current_state=state,
+        details=details,
+        identification_service_area=SimpleNamespace(owner=owner),
+        sources=list(sources),
+    )
+
+
+def test_distinct_flights_are_kept_in_order():
+    flights = [report("b", "uss1", 1), report("a", "uss2", 1)]
+
+    merged, aliases = resolve_flights(flights)
+
+    assert [flight.id for flight in merged] == ["b", "a"]
+    assert [flight.sources for flight in merged] == [["uss1"], ["uss2"]]
+    assert aliases == {"b": "b", "a": "a"}
+
+
+def test_same_id_keeps_the_freshest_report():
+    older, newer = report("a", "uss1", 1), report("a", "uss2", 2)
+
+    merged, aliases = resolve_flights([older, newer])
+
+    assert merged == [newer]
+    assert newer.sources == ["uss1", "uss2"]
+    assert aliases == {"a": "a"}
+
+
+def test_report_without_state_is_never_fresher():
+    stateless, located = report("a", "uss1"), report("a", "uss2", 1)
+
+    merged, _ = resolve_flights([located, stateless])
+
+    assert merged == [located]
+
+
+def test_same_registration_id_is_one_aircraft():
+    flights = [
+        report("a", "uss1", 2, registration_id="R"),
+        report("b", "uss2", 1, registration_id="R"),
+    ]
+
+    merged, aliases = resolve_flights(flights)
+
+    assert [flight.id for flight in merged] == ["a"]
+    assert aliases == {"a": "a", "b": "a"}
+
+
+def test_bridging_report_joins_two_aircraft():
+    flights = [
+        report("a", "uss1", 1, registration_id="R1"),
+        report("b", "uss2", 2, registration_id="R2"),
+        report("c", "uss3", 3),
+        report("a", "uss3", 0, registration_id="R2"),
+    ]
+
+    merged, aliases = resolve_flights(flights)
+
+    assert [flight.id for flight in merged] == ["b", "c"]
+    assert sorted(merged[0].sources) == ["uss1", "uss2", "uss3"]
+    assert aliases == {"a": "b", "b": "b", "c": "c"}
+
+
+def test_fresher_report_inherits_details():
+    detailed = report("a", "uss1", 1, registration_id="R")
+    bare = report("a", "uss2", 2)
+
+    merged, _ = resolve_flights([detailed, bare])
+
+    assert merged == [bare]
+    assert bare.details is detailed.details
+
+
+def test_previous_sources_are_kept():
+    flights = [
+        report("a", "uss1", 1, sources=["uss0"]),
+        report("a", "uss2", 2),
+    ]
+
+    merged, _ = resolve_flights(flights)
+
+    assert merged[0].sources == ["uss0", "uss1", "uss2"]
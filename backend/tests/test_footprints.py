@@ -0,0 +1,198 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from schemas.common.base import Time
+from schemas.common.enums import (
+    AltitudeReference,
+    AltitudeUnits,
+    RadiusUnits,
+    TimeFormat,
+)
+from schemas.common.geo import (
+    Altitude,
+    Circle,
+    LatLngPoint,
+    Polygon,
+    Radius,
+    Volume3D,
+    Volume4D,
+)
+from services.footprints import merge_volumes, trace_outlines
+from services.spatial import to_local_xy
+
+
+def ring_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y) / 2
+
+
+def raster(*rows):
+    return np.array([[cell == "#" for cell in row] for row in rows])
+
+
+def test_single_cell():
+    rings = trace_outlines(raster("#"))
+
+    assert len(rings) == 1
+    assert sorted(map(tuple, rings[0].tolist())) == [
+        (0, 0), (0, 1), (1, 0), (1, 1)]
+    assert ring_area(rings[0]) == 1
+
+
+def test_empty_raster():
+    assert trace_outlines(np.zeros((3, 3), dtype=bool)) == []
+
+
+def test_concave_region():
+    mask = raster(
+        "###",
+        "#..",
+        "###",
+    )
+
+    rings = trace_outlines(mask)
+
+    assert len(rings) == 1
+    assert ring_area(rings[0]) == mask.sum()
+
+
+def test_holes_are_filled():
+    rings = trace_outlines(raster(
+        "###",
+        "#.#",
+        "###",
+    ))
+
+    assert len(rings) == 1
+    assert ring_area(rings[0]) == 9
+
+
+def test_regions_touching_at_a_corner_are_separate():
+    rings = trace_outlines(raster(
+        "#.",
+        ".#",
+    ))
+
+    assert sorted(ring_area(ring) for ring in rings) == [1, 1]
+
+
+def test_separate_regions():
+    mask = raster(
+        "##..#",
+        "##..#",
+    )
+
+    rings = trace_outlines(mask)
+
+    assert sorted(ring_area(ring) for ring in rings) == [2, 4]
+
+
+def at(hour):
+    return Time(
+        value=datetime(2026, 1, 1, hour, tzinfo=timezone.utc),
+        format=TimeFormat.RFC3339,
+    )
+
+
+def altitude(value):
+    return Altitude(
+        value=value, reference=AltitudeReference.W84, units=AltitudeUnits.M)
+
+
+def volume(outline, lower=0, upper=100, start=1, end=2):
+    return Volume4D(
+        volume=Volume3D(
+            altitude_lower=altitude(lower),
+            altitude_upper=altitude(upper),
+            **outline,
+        ),
+        time_start=at(start),
+        time_end=at(end),
+    )
+
+
+def square(lat, lng, side, **bounds):
+    corners = [(lat, lng), (lat, lng + side),
+               (lat + side, lng + side), (lat + side, lng)]
+    return volume({"outline_polygon": Polygon(vertices=[
+        LatLngPoint(lat=vertex_lat, lng=vertex_lng)
+        for vertex_lat, vertex_lng in corners
+    ])}, **bounds)
+
+
+def circle(lat, lng, radius, **bounds):
+    return volume({"outline_circle": Circle(
+        center=LatLngPoint(lat=lat, lng=lng),
+        radius=Radius(value=radius, units=RadiusUnits.M),
+    )}, **bounds)
+
+
+def outline_area(volume4d):
+    vertices = volume4d.volume.outline_polygon.vertices
+    x, y = to_local_xy(
+        np.array([vertex.lat for vertex in vertices]),
+        np.array([vertex.lng for vertex in vertices]),
+        0.0, 0.0,
+    )
+    return abs(ring_area(np.column_stack([x, y])))
+
+
+def test_single_volume_is_unchanged():
+    volumes = [square(0, 0, 0.01)]
+
+    assert merge_volumes(volumes) is volumes
+
+
+def test_disjoint_volumes_are_unchanged():
+    volumes = [square(0, 0, 0.01), square(0, 0.02, 0.01)]
+
+    merged = merge_volumes(volumes)
+
+    assert len(merged) == 2
+    assert all(a is b for a, b in zip(merged, volumes))
+
+
+def test_overlapping_squares_are_unioned():
+    first = square(0, 0, 0.01, lower=10, upper=50, start=1, end=3)
+    second = square(0.005, 0.005, 0.01, lower=20, upper=80, start=2, end=4)
+
+    merged = merge_volumes([first, second])
+
+    assert len(merged) == 1
+    footprint = merged[0]
+    assert footprint.volume.altitude_lower.value == 10
+    assert footprint.volume.altitude_upper.value == 80
+    assert footprint.time_start.value == at(1).value
+    assert footprint.time_end.value == at(4).value
+    assert outline_area(footprint) == pytest.approx(
+        1.75 * outline_area(first), rel=0.02)
+
+
+def test_overlap_chains_merge_transitively():
+    volumes = [
+        square(0, 0, 0.01),
+        square(0, 0.008, 0.01),
+        square(0, 0.016, 0.01),
+        square(0.05, 0.05, 0.01),
+    ]
+
+    merged = merge_volumes(volumes)
+
+    assert len(merged) == 2
+    assert merged[1] is volumes[3]
+    assert outline_area(merged[0]) == pytest.approx(
+        2.6 * outline_area(volumes[0]), rel=0.02)
+
+
+def test_circle_and_square_are_unioned():
+    first = square(0, 0, 0.01)
+    second = circle(0.005, 0.01, 300)
+
+    merged = merge_volumes([first, second])
+
+    assert len(merged) == 1
+    half_disc = np.pi * 300 ** 2 / 2
+    assert outline_area(merged[0]) == pytest.approx(
+        outline_area(first) + half_disc, rel=0.02)
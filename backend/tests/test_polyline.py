@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from schemas.common.enums import GeometryEncoding
+from schemas.common.geo import encode_outlines
+from schemas.common.polyline import decode_polyline, encode_polyline
+
+# Reference example of the Google polyline format
+GOOGLE_LAT = np.array([38.5, 40.7, 43.252])
+GOOGLE_LNG = np.array([-120.2, -120.95, -126.453])
+GOOGLE_ENCODED = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+
+def test_reference_encoding():
+    assert encode_polyline(GOOGLE_LAT, GOOGLE_LNG, 5) == GOOGLE_ENCODED
+
+
+def test_reference_decoding():
+    lat, lng = decode_polyline(GOOGLE_ENCODED, 5)
+
+    np.testing.assert_allclose(lat, GOOGLE_LAT)
+    np.testing.assert_allclose(lng, GOOGLE_LNG)
+
+
+def test_empty():
+    assert encode_polyline(np.array([]), np.array([])) == ""
+    lat, lng = decode_polyline("")
+    assert lat.size == lng.size == 0
+
+
+@pytest.mark.parametrize("precision", [5, 6, 7])
+def test_round_trip_is_quantized(precision):
+    rng = np.random.default_rng(precision)
+    lat = rng.uniform(-90, 90, 500)
+    lng = rng.uniform(-180, 180, 500)
+
+    decoded_lat, decoded_lng = decode_polyline(
+        encode_polyline(lat, lng, precision), precision)
+
+    np.testing.assert_allclose(decoded_lat, np.round(lat, precision), atol=1e-9)
+    np.testing.assert_allclose(decoded_lng, np.round(lng, precision), atol=1e-9)
+
+
+def test_large_deltas():
+    lat = np.array([0.0, 89.999999, -89.999999, 0.0])
+    lng = np.array([-179.999999, 179.999999, -179.999999, 0.0])
+
+    decoded_lat, decoded_lng = decode_polyline(encode_polyline(lat, lng, 9), 9)
+
+    np.testing.assert_allclose(decoded_lat, lat, atol=1e-9)
+    np.testing.assert_allclose(decoded_lng, lng, atol=1e-9)
+
+
+def test_encoded_outlines():
+    vertices = [
+        {"lat": float(lat), "lng": float(lng)}
+        for lat, lng in zip(GOOGLE_LAT, GOOGLE_LNG)
+    ]
+    document = {"items": [{"outline_polygon": {"vertices": vertices}}]}
+
+    encoded = encode_outlines(document, GeometryEncoding.POLYLINE, 5)
+
+    assert encoded["items"][0]["outline_polygon"] == {
+        "encoding": "polyline", "precision": 5, "points": GOOGLE_ENCODED}
+
+
+def test_vertices_encoding_leaves_outlines():
+    document = {"outline_polygon": {"vertices": [{"lat": 1.0, "lng": 2.0}]}}
+
+    encode_outlines(document, GeometryEncoding.VERTICES)
+
+    assert document["outline_polygon"] == {
+        "vertices": [{"lat": 1.0, "lng": 2.0}]}
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from services.proximity import find_close_pairs
+
+
+def brute_force(x, y, z, horizontal, vertical):
+    pairs = set()
+    for i in range(x.size):
+        for j in range(i + 1, x.size):
+            dxy = (x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2
+            dz = abs(z[i] - z[j])
+            if dxy <= horizontal ** 2 and not dz > vertical:
+                pairs.add((i, j))
+    return pairs
+
+
+def as_set(i, j):
+    pairs = list(zip(i.tolist(), j.tolist()))
+    assert len(pairs) == len(set(pairs)), "pairs are reported once"
+    return set(pairs)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    size = 300
+    x = rng.uniform(-2000, 2000, size)
+    y = rng.uniform(-2000, 2000, size)
+    z = rng.uniform(0, 120, size)
+    z[rng.random(size) < 0.1] = np.nan
+
+    i, j = find_close_pairs(x, y, z, horizontal=150, vertical=20)
+
+    assert np.all(i < j)
+    assert as_set(i, j) == brute_force(x, y, z, 150, 20)
+
+
+def test_clustered_points_match_brute_force():
+    rng = np.random.default_rng(42)
+    x = np.concatenate([rng.normal(0, 30, 100), rng.normal(500, 5, 50)])
+    y = np.concatenate([rng.normal(0, 30, 100), rng.normal(-500, 5, 50)])
+    z = rng.uniform(0, 50, 150)
+
+    i, j = find_close_pairs(x, y, z, horizontal=50, vertical=10)
+
+    assert as_set(i, j) == brute_force(x, y, z, 50, 10)
+
+
+def test_neighbours_across_cell_boundaries():
+    # Both sides of a cell boundary, and diagonal neighbours
+    x = np.array([49.0, 51.0, 99.0, 101.0])
+    y = np.array([0.0, 0.0, 49.0, 51.0])
+    z = np.zeros(4)
+
+    i, j = find_close_pairs(x, y, z, horizontal=50, vertical=10)
+
+    assert as_set(i, j) == {(0, 1), (2, 3)}
+
+
+def test_thresholds_are_inclusive():
+    x = np.array([0.0, 50.0, -1.0])
+    y = np.array([0.0, 0.0, 0.0])
+    z = np.array([0.0, 20.0, 20.5])
+
+    i, j = find_close_pairs(x, y, z, horizontal=50, vertical=20)
+
+    assert as_set(i, j) == {(0, 1)}
+
+
+def test_unknown_altitude_is_vertically_close():
+    x = np.array([0.0, 10.0])
+    y = np.array([0.0, 0.0])
+    z = np.array([np.nan, 500.0])
+
+    i, j = find_close_pairs(x, y, z, horizontal=50, vertical=20)
+
+    assert as_set(i, j) == {(0, 1)}
+
+
+@pytest.mark.parametrize("size", [0, 1])
+def test_fewer_than_two_points(size):
+    points = np.zeros(size)
+
+    i, j = find_close_pairs(points, points, points, 50, 20)
+
+    assert i.size == 0 and j.size == 0
@@ -0,0 +1,171 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from config.config import get_settings
+from services.tracks import TRACK_POINT, UNKNOWN_SPEED, TrackStore
+
+
+def make_store(monkeypatch, capacity=4, length=4, idle_timeout=120):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "TRACK_POINTS_PER_FLIGHT", length)
+    monkeypatch.setattr(settings, "TRACK_IDLE_TIMEOUT", idle_timeout)
+    monkeypatch.setattr(
+        settings, "TRACK_MEMORY_MB",
+        capacity * length * TRACK_POINT.itemsize / (1024 * 1024),
+    )
+    store = TrackStore()
+    assert store._capacity == capacity
+    return store
+
+
+def points(*times):
+    records = np.zeros(len(times), TRACK_POINT)
+    records["t"] = times
+    records["lat"] = times
+    return records
+
+
+def at(t):
+    return SimpleNamespace(value=datetime.fromtimestamp(t, timezone.utc))
+
+
+def flight(flight_id, t, recent=(), speed=10.0):
+    position = SimpleNamespace(lat=t, lng=0.0, alt=100.0)
+    return SimpleNamespace(
+        id=flight_id,
+        current_state=SimpleNamespace(
+            timestamp=at(t), position=position, speed=speed, track=90.0,
+        ),
+        recent_positions=[
+            SimpleNamespace(
+                time=at(r), position=SimpleNamespace(lat=r, lng=0.0, alt=100.0)
+            )
+            for r in recent
+        ],
+    )
+
+
+def test_points_are_stored_in_chronological_order(monkeypatch):
+    store = make_store(monkeypatch)
+    slot = store._slot("a", 0.0, set())
+
+    stored = store.append_points(
+        np.full(3, slot), points(3.0, 1.0, 2.0), 0.0)
+
+    assert stored == 3
+    assert store.trail("a")["t"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_stale_and_repeated_points_are_ignored(monkeypatch):
+    store = make_store(monkeypatch)
+    slot = store._slot("a", 0.0, set())
+    store.append_points(np.full(2, slot), points(1.0, 2.0), 0.0)
+
+    records = points(2.0, 1.5, 3.0, 3.0)
+    records["lat"][2] = 30.0
+    stored = store.append_points(np.full(4, slot), records, 0.0)
+
+    assert stored == 1
+    trail = store.trail("a")
+    assert trail["t"].tolist() == [1.0, 2.0, 3.0]
+    assert trail["lat"][-1] == 30.0
+
+
+def test_only_the_newest_points_fit_a_track(monkeypatch):
+    store = make_store(monkeypatch, length=4)
+    slot = store._slot("a", 0.0, set())
+    store.append_points(np.full(3, slot), points(1.0, 2.0, 3.0), 0.0)
+
+    stored = store.append_points(
+        np.full(6, slot), points(9.0, 4.0, 5.0, 6.0, 7.0, 8.0), 0.0)
+
+    assert stored == 4
+    assert store.trail("a")["t"].tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert store.trail("a", since=7.0)["t"].tolist() == [8.0, 9.0]
+
+
+def test_tracks_of_a_batch_are_independent(monkeypatch):
+    store = make_store(monkeypatch)
+    a = store._slot("a", 0.0, set())
+    b = store._slot("b", 0.0, set())
+
+    store.append_points(
+        np.array([b, a, b, a]), points(2.0, 2.0, 1.0, 1.0), 0.0)
+    store.append_points(np.array([a, b]), points(3.0, 1.5), 0.0)
+
+    assert store.trail("a")["t"].tolist() == [1.0, 2.0, 3.0]
+    assert store.trail("b")["t"].tolist() == [1.0, 2.0]
+
+
+def test_current_state_wins_over_recent_position(monkeypatch):
+    store = make_store(monkeypatch)
+
+    store.append_flights([flight("a", 10.0, recent=(8.0, 9.0, 10.0))])
+
+    trail = store.trail("a")
+    assert trail["t"].tolist() == [8.0, 9.0, 10.0]
+    assert trail["speed"][-1] == 10.0
+    assert np.isnan(trail["speed"][:-1]).all()
+
+
+def test_unknown_speed_is_stored_as_nan(monkeypatch):
+    store = make_store(monkeypatch)
+
+    store.append_flights([flight("a", 10.0, speed=UNKNOWN_SPEED)])
+
+    assert np.isnan(store.trail("a")["speed"]).all()
+
+
+def test_newest_report_of_a_flight_is_used(monkeypatch):
+    store = make_store(monkeypatch)
+
+    store.append_flights([flight("a", 5.0), flight("a", 7.0), flight("a", 6.0)])
+
+    assert store.trail("a")["t"].tolist() == [7.0]
+
+
+def test_slots_of_a_batch_are_not_recycled(monkeypatch):
+    store = make_store(monkeypatch, capacity=2)
+    store.append_flights([flight("a", 1.0), flight("b", 1.0)])
+
+    store.append_flights([flight("a", 2.0), flight("c", 2.0), flight("d", 2.0)])
+
+    assert store.trail("a")["t"].tolist() == [1.0, 2.0]
+    assert len(store) == 2
+    assert "b" not in store._slots
+    assert store.trail("c")["t"].tolist() == [2.0]
+    assert store.trail("d").size == 0
+
+
+def test_new_flights_beyond_capacity_are_dropped(monkeypatch):
+    store = make_store(monkeypatch, capacity=2)
+
+    stored = store.append_flights(
+        [flight("a", 1.0), flight("b", 1.0), flight("c", 1.0)])
+
+    assert stored == 2
+    assert len(store) == 2
+
+
+def test_idle_flights_release_their_slot(monkeypatch):
+    store = make_store(monkeypatch, idle_timeout=-1)
+    store.append_flights([flight("a", 1.0)])
+
+    store.append_flights([flight("b", 1.0)])
+
+    assert store.trail("a").size == 0
+    assert store.trail("b")["t"].tolist() == [1.0]
+
+
+def test_positions_since_is_bounded_on_both_sides(monkeypatch):
+    store = make_store(monkeypatch)
+    store.append_flights([flight("a", 4.0, recent=(1.0, 2.0, 3.0))])
+
+    positions = store.positions_since("a", 1.0, until=4.0)
+
+    assert [p.time.value.timestamp() for p in positions] == [2.0, 3.0]
+    assert [p.position.lat for p in positions] == [2.0, 3.0]
+    assert store.positions_since("unknown", 0.0) == []